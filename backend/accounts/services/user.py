@@ -70,15 +70,15 @@ class UserAuthService:
         with transaction.atomic():
             user = User.objects.create_user(**user_data)
             UserInfo.objects.create(user=user, phone_number=phone_number)
-        # Send active email
-        uidb64, token = self._generate_token(user)
-        self._mail_service.send_email_template_by_type(
-            email_type_enum=MailTemplateEnum.VERIFY_EMAIL,
-            recipient_mails=[user.email],
-            context={
-                "callback_url": f"{settings.WEBSITE_URL}/verify-email?uidb64={uidb64}&token={token}",
-            },
-        )
+            # Send active email (queued with the user, sent by the task worker)
+            uidb64, token = self._generate_token(user)
+            self._mail_service.enqueue_email_template_by_type(
+                email_type_enum=MailTemplateEnum.VERIFY_EMAIL,
+                recipient_mails=[user.email],
+                context={
+                    "callback_url": f"{settings.WEBSITE_URL}/verify-email?uidb64={uidb64}&token={token}",
+                },
+            )
         return user
 
     def active_account(self, uidb64):
@@ -7,6 +7,7 @@ from agents.services.pscd_users import PSCDUsersService
 from agents.services.pscd_requests import PSCDRequestsService
 from agents.services.pscd_logtime import PSCDLogTimeService
 from common.services.llm_service import get_llm_service, LLMProvider
+from common.services.llm_metrics import LLMMetricsCallbackHandler
 from queue import Queue
 class PscdAgent:
     def __init__(self, callbacks=None, queue: Queue = None, llm_provider: LLMProvider = LLMProvider.OPENAI):
@@ -18,9 +19,13 @@ class PscdAgent:
             provider=llm_provider,
             model="gpt-4o-mini" if llm_provider == LLMProvider.OPENAI else "claude-3-sonnet-20240229",
             streaming=True,
+            stream_usage=True,
             callbacks=self.callbacks
         )
 
+        # Đo latency/token/tool của mỗi lượt chạy agent
+        self.metrics_handler = LLMMetricsCallbackHandler("pscd_agent")
+
         self.tools = self._create_tools()
         self.agent = self._create_agent()
 
@@ -35,6 +40,7 @@ class PscdAgent:
             provider=provider,
             model="gpt-4o-mini" if provider == LLMProvider.OPENAI else "claude-3-sonnet-20240229",
             streaming=True,
+            stream_usage=True,
             callbacks=self.callbacks
         )
         # Recreate agent with new LLM
@@ -96,8 +102,8 @@ Lưu ý: Khi sử dụng tools, luôn kiểm tra kết quả và cung cấp ph
         """Create comprehensive list of tools using StructuredTool with Pydantic input models"""
         return [
             *PSCDProjectsService(self.queue).create_tools(),
-            *PSCDUsersService().create_tools(),
-            *PSCDRequestsService().create_tools(),
+            *PSCDUsersService(self.queue).create_tools(),
+            *PSCDRequestsService(self.queue).create_tools(),
             *PSCDLogTimeService().create_tools(),
         ]
 
@@ -110,4 +110,25 @@ class ProjectFilterInput(BaseModel):
 
 class ProjectChartInput(BaseModel):
     """Input for getting project chart"""
-    project_id: int = Field(description="ID of the project")
\ No newline at end of file
+    project_id: int = Field(description="ID of the project")
+
+
+class PageInput(BaseModel):
+    """Input for list operations returning paged results"""
+    page_token: Optional[str] = Field(default=None, description="next_page_token of the previous result, to get the next page")
+
+
+class UserIdPageInput(UserIdInput, PageInput):
+    """Input for paged list operations by user ID"""
+
+
+class UserFilterPageInput(UserFilterInput, PageInput):
+    """Input for paged list operations by user"""
+
+
+class ProjectFilterPageInput(ProjectFilterInput, PageInput):
+    """Input for paged list operations by project"""
+
+
+class DateRangePageInput(DateRangeInput, PageInput):
+    """Input for paged list operations in a date range"""
@@ -0,0 +1,178 @@
+"""
+Name resolution for PSCD users and projects
+
+Tools receive names the way people type them: without diacritics, with
+typos, or only part of a full name. Candidates are ranked in one query
+against pg_trgm GIN indexes over pscds_fold(name) (lowercase, unaccented;
+see pscds migration 0005), plus the lower(email) index for users, and the
+ranked lists of recent lookups are kept in a small in-process cache.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+from common.cache.local import MISSING, LocalCache
+from common.utils.keyword_matcher import fold_diacritics
+from pscds.models import Project, User
+
+# `<%` is word similarity: the query matched against the best part of the name,
+# so "lan" finds "Nguyễn Thị Lan" and "nguyen van ahn" finds "Nguyễn Văn Anh".
+# Its cut-off is a session setting, set once per database connection.
+THRESHOLD_SQL = "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)"
+
+# word_similarity is 1.0 for every name containing the query as a word
+# ("Alpha" in "Alpha 2"), so similarity and an exact flag (folded name equals
+# the folded query, or the email matches) are returned to tell them apart
+USER_CANDIDATES_SQL = """
+    SELECT id, full_name, email,
+           CASE WHEN lower(email) = lower(%(query)s) THEN 1.0
+                ELSE word_similarity(pscds_fold(%(query)s), pscds_fold(full_name)) END AS score,
+           similarity(pscds_fold(%(query)s), pscds_fold(full_name)),
+           lower(email) = lower(%(query)s) OR pscds_fold(full_name) = pscds_fold(%(query)s)
+    FROM pscds_users
+    WHERE lower(email) = lower(%(query)s)
+       OR pscds_fold(%(query)s) <%% pscds_fold(full_name)
+    ORDER BY score DESC, similarity(pscds_fold(%(query)s), pscds_fold(full_name)) DESC, id
+    LIMIT %(limit)s
+"""
+
+PROJECT_CANDIDATES_SQL = """
+    SELECT id, name, NULL, word_similarity(pscds_fold(%(query)s), pscds_fold(name)) AS score,
+           similarity(pscds_fold(%(query)s), pscds_fold(name)),
+           pscds_fold(name) = pscds_fold(%(query)s)
+    FROM pscds_projects
+    WHERE pscds_fold(%(query)s) <%% pscds_fold(name)
+    ORDER BY score DESC, similarity(pscds_fold(%(query)s), pscds_fold(name)) DESC, id
+    LIMIT %(limit)s
+"""
+
+
+@dataclass(frozen=True)
+class NameCandidate:
+    id: int
+    name: str
+    score: float
+    email: Optional[str] = None
+    # Whole-name trigram similarity, and whether the name (or email) is the query itself
+    similarity: float = 0.0
+    exact: bool = False
+
+
+class NameResolver:
+    """
+    Ranked, accent- and typo-tolerant lookup of users and projects.
+
+    `users()`/`projects()` return candidates best first. `resolve_*()`
+    return the record when one candidate is the query itself (folded name or
+    email), or when the best candidate is a clear match (score >=
+    NAME_MATCH_MIN_SCORE and NAME_MATCH_MARGIN ahead of the next one), else
+    None with the candidates to offer instead.
+    """
+
+    def __init__(self, limit: Optional[int] = None, cache_size: Optional[int] = None, cache_ttl: Optional[float] = None):
+        self.limit = limit or settings.NAME_MATCH_LIMIT
+        self.cache = LocalCache(
+            max_entries=cache_size if cache_size is not None else settings.NAME_RESOLVER_CACHE_SIZE,
+            ttl=cache_ttl if cache_ttl is not None else settings.NAME_RESOLVER_CACHE_TTL,
+        )
+
+    @staticmethod
+    def _set_threshold(cursor):
+        # connection.connection is the DB-API connection: it changes on reconnect or pool checkout
+        raw_connection = connection.connection
+        if getattr(connection, "_name_match_threshold_set_on", None) is not raw_connection:
+            cursor.execute(THRESHOLD_SQL, [str(settings.NAME_MATCH_CANDIDATE_SCORE)])
+            connection._name_match_threshold_set_on = raw_connection
+
+    def _candidates(self, kind: str, sql: str, query: str, limit: Optional[int]) -> List[NameCandidate]:
+        query = " ".join((query or "").split())
+        if not query:
+            return []
+        limit = limit or self.limit
+        key = f"{kind}:{limit}:{fold_diacritics(query)}"
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+        with connection.cursor() as cursor:
+            self._set_threshold(cursor)
+            cursor.execute(sql, {"query": query, "limit": limit})
+            candidates = [
+                NameCandidate(
+                    id=row[0], name=row[1], email=row[2], score=round(float(row[3]), 3),
+                    similarity=round(float(row[4]), 3), exact=bool(row[5]),
+                )
+                for row in cursor.fetchall()
+            ]
+        self.cache.set(key, candidates)
+        return candidates
+
+    def users(self, query: str, limit: Optional[int] = None) -> List[NameCandidate]:
+        """Users whose name (or exact email) matches `query`, best first"""
+        return self._candidates("user", USER_CANDIDATES_SQL, query, limit)
+
+    def projects(self, query: str, limit: Optional[int] = None) -> List[NameCandidate]:
+        """Projects whose name matches `query`, best first"""
+        return self._candidates("project", PROJECT_CANDIDATES_SQL, query, limit)
+
+    @staticmethod
+    def best(candidates: List[NameCandidate]) -> Optional[NameCandidate]:
+        exact = [candidate for candidate in candidates if candidate.exact or candidate.similarity >= 1.0]
+        if exact:
+            # Two people with the same name are still ambiguous
+            return exact[0] if len(exact) == 1 else None
+        if not candidates or candidates[0].score < settings.NAME_MATCH_MIN_SCORE:
+            return None
+        if len(candidates) > 1 and candidates[0].score - candidates[1].score < settings.NAME_MATCH_MARGIN:
+            return None
+        return candidates[0]
+
+    def resolve_user(
+        self, user_id: int = None, email: str = None, full_name: str = None
+    ) -> Tuple[Optional[User], List[NameCandidate]]:
+        if user_id:
+            return User.objects.filter(id=user_id).first(), []
+        candidates = self.users(email or full_name)
+        match = self.best(candidates)
+        return (User.objects.filter(id=match.id).first() if match else None), candidates
+
+    def resolve_project(
+        self, project_id: int = None, project_name: str = None
+    ) -> Tuple[Optional[Project], List[NameCandidate]]:
+        if project_id:
+            return Project.objects.filter(id=project_id).first(), []
+        candidates = self.projects(project_name)
+        match = self.best(candidates)
+        return (Project.objects.filter(id=match.id).first() if match else None), candidates
+
+    def clear(self):
+        self.cache.clear()
+
+
+def describe_candidates(what: str, query, candidates: List[NameCandidate]) -> str:
+    """Tool message for an unresolved name: the closest matches to pick from"""
+    if not candidates:
+        return f"{what} not found: {query}"
+    rows = "\n".join(
+        f"{candidate.id}|{candidate.name}|{candidate.email or ''}|{candidate.score}" for candidate in candidates
+    )
+    return f"{what} not found exactly: {query}. Closest matches, ask the user or retry with the id:\nid|name|email|score\n{rows}"
+
+
+# Global instance
+_name_resolver = None
+_name_resolver_lock = threading.Lock()
+
+
+def get_name_resolver() -> NameResolver:
+    """Get singleton NameResolver (shares its cache across agents)"""
+    global _name_resolver
+
+    with _name_resolver_lock:
+        if _name_resolver is None:
+            _name_resolver = NameResolver()
+    return _name_resolver
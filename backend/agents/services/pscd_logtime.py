@@ -3,6 +3,7 @@ from langchain_core.tools import StructuredTool
 from agents.services.io_models.input import UserIdInput, DateRangeInputByUser
 from django.utils import timezone
 from datetime import timedelta, datetime
+from common.utils.tool_tracing import trace_tools
 
 
 class PSCDLogTimeService:
@@ -140,7 +141,7 @@ class PSCDLogTimeService:
         )
 
     def create_tools(self):
-        return [
+        return trace_tools([
             StructuredTool.from_function(
                 func=self._statistics_logtime_by_user_in_date_range,
                 name="statistics_logtime_by_user_in_date_range",
@@ -183,4 +184,4 @@ class PSCDLogTimeService:
                 description="Statistics logtime by user ID last month",
                 args_schema=UserIdInput
             ),
-        ]
\ No newline at end of file
+        ])
\ No newline at end of file
@@ -1,17 +1,38 @@
-from pscds.models import Project, Task, TaskUser, ProjectUser, User
-from langchain_core.tools import StructuredTool, Tool
-from agents.services.io_models.input import ProjectIdInput, UserFilterInput, ProjectFilterInput, TaskIdInput, ProjectChartInput
-import matplotlib.pyplot as plt
-import io
-import base64
-from common.services.storage_service import StorageService
+from pscds.models import Project, Task, TaskUser, ProjectUser
+from langchain_core.tools import StructuredTool
+from agents.services.io_models.input import (
+    ProjectIdInput, UserFilterPageInput, ProjectFilterPageInput, TaskIdInput, ProjectChartInput, PageInput
+)
+from django.db.models import Sum
+from agents.services.name_resolver import describe_candidates, get_name_resolver
+from common.services.chart_service import ChartSpec, get_chart_service
 from queue import Queue
 import json
 from common.utils.strings import get_str_time_now
+from common.utils.tool_output import ToolOutputFormatter
+from common.utils.tool_tracing import trace_tools
 class PSCDProjectsService:
     def __init__(self, queue: Queue):
-        self.storage_service = StorageService()
         self.queue = queue
+        self.output = ToolOutputFormatter(queue)
+
+    def _find_user(self, user_id: int = None, email: str = None, full_name: str = None):
+        """(user, None), or (None, message listing the closest matches)"""
+        user, candidates = get_name_resolver().resolve_user(user_id, email, full_name)
+        if user:
+            return user, None
+        if user_id:
+            return None, f"User not found with ID: {user_id}"
+        return None, describe_candidates("User", email or full_name, candidates)
+
+    def _find_project(self, project_id: int = None, project_name: str = None):
+        """(project, None), or (None, message listing the closest matches)"""
+        project, candidates = get_name_resolver().resolve_project(project_id, project_name)
+        if project:
+            return project, None
+        if project_id:
+            return None, f"Project not found with ID: {project_id}"
+        return None, describe_candidates("Project", project_name, candidates)
 
     # Project-related methods
     def _mapping_role_id_to_name(self, role_id: int) -> str:
@@ -51,28 +72,31 @@ class PSCDProjectsService:
         except Project.DoesNotExist:
             return "Project not found"
 
-    def _get_all_projects(self) -> str:
-        """Get list of all projects"""
-        projects = Project.objects.all()
-        if not projects:
-            return "No projects found"
-        
-        result = "All Projects:\n"
-        for project in projects:
-            result += f"- ID: {project.id}, Name: {project.name}, Status: {project.status}, Start: {project.start_date}, End: {project.end_date}\n"
-        return result
+    def _get_all_projects(self, page_token: str = None) -> str:
+        """Get list of all projects (paged)"""
+        projects = Project.objects.order_by("id").values_list("id", "name", "status", "start_date", "end_date")
+        return self.output.table(
+            "All projects",
+            ["id", "name", "status", "start", "end"],
+            projects,
+            page_token,
+            ui_columns=["ID", "Tên dự án", "Trạng thái", "Bắt đầu", "Kết thúc"],
+        )
 
-    def _get_projects_by_user(self, user_id: int = None, email: str = None, full_name: str = None) -> str:
+    def _get_projects_by_user(
+        self, user_id: int = None, email: str = None, full_name: str = None, page_token: str = None
+    ) -> str:
         """
-        Get all projects assigned to a specific user.
+        Get all projects assigned to a specific user (paged).
         
         Args:
             user_id (int, optional): User ID
             email (str, optional): User email address
             full_name (str, optional): User full name
+            page_token (str, optional): next_page_token of the previous page
             
         Returns:
-            str: Formatted string with project information
+            str: Compact table of the user's projects
             
         Note: At least one parameter must be provided.
         """
@@ -81,81 +105,51 @@ class PSCDProjectsService:
         if not any([user_id, email, full_name]):
             return "Error: At least one of user_id, email, or full_name must be provided."
 
-        user = None
-
-        if user_id:
-            user = User.objects.filter(id=user_id).first()
-            if not user:
-                return f"User not found with ID: {user_id}"
-        elif email:
-            user = User.objects.filter(email__iexact=email.strip()).first()
-            if not user:
-                return f"User not found with email: {email}"
-        elif full_name:
-            user = User.objects.filter(full_name__iexact=full_name.strip()).first()
-            if not user:
-                return f"User not found with full name: {full_name}"
-
+        user, error = self._find_user(user_id, email, full_name)
         if not user:
-            return "User not found with the provided identifier."
+            return error
 
         try:
-            # Get all project assignments for this user
-            project_users = ProjectUser.objects.filter(user_id=user.id).select_related('project')
-            
-            if not project_users:
-                return f"📋 **KHÔNG CÓ DỰ ÁN**\n────────────────────────────\nNgười dùng '{user.full_name}' (ID: {user.id}) chưa được gán vào dự án nào."
-            
-            # Format the result with better structure
-            result = (
-                f"📋 **DỰ ÁN CỦA NGƯỜI DÙNG**\n"
-                f"────────────────────────────\n"
-                f"👤 **Người dùng:** {user.full_name}\n"
-                f"🆔 **ID:** {user.id}\n"
-                f"📧 **Email:** {user.email}\n"
-                f"📊 **Tổng số dự án:** {project_users.count()}\n"
-                f"────────────────────────────\n"
+            project_users = (
+                ProjectUser.objects.filter(user_id=user.id)
+                .order_by("project_id")
+                .values_list("project_id", "project__name", "project__status", "role_id", "project__start_date", "project__end_date")
+            )
+            return self.output.table(
+                f"Projects of {user.full_name} (user {user.id}, {user.email})",
+                ["id", "name", "status", "role", "start", "end"],
+                project_users,
+                page_token,
+                transform=lambda row: (*row[:3], self._mapping_role_id_to_name(row[3]), *row[4:]),
+                ui_columns=["ID", "Tên dự án", "Trạng thái", "Vai trò", "Bắt đầu", "Kết thúc"],
             )
-            
-            for i, pu in enumerate(project_users, 1):
-                project = pu.project
-                role_name = self._mapping_role_id_to_name(pu.role_id)
-                
-                result += (
-                    f"**{i}. {project.name}**\n"
-                    f"   🆔 ID: {project.id}\n"
-                    f"   📊 Trạng thái: {project.status}\n"
-                    f"   👤 Vai trò: {role_name}\n"
-                    f"   📅 Bắt đầu: {project.start_date}\n"
-                    f"   ⏳ Kết thúc: {project.end_date}\n"
-                    f"   📝 Mô tả: {project.description or 'Không có mô tả'}\n"
-                    f"   ────────────────────────────\n"
-                )
-            
-            return result
             
         except Exception as e:
             return f"❌ **LỖI**\n────────────────────────────\nKhông thể lấy thông tin dự án: {str(e)}"
 
-    def _get_project_members(self, project_name: str = None, project_id: int = None) -> str:
-        """Get all members of a specific project"""
+    def _get_project_members(self, project_name: str = None, project_id: int = None, page_token: str = None) -> str:
+        """Get all members of a specific project (paged)"""
         try:
-            if project_name:
-                project = Project.objects.get(name=project_name)
-                project_id = project.id
-            elif project_id:
-                project = Project.objects.get(id=project_id)
-            else:
+            if not project_id and not project_name:
                 return "Error: At least one of project_name or project_id must be provided."
+            project, error = self._find_project(project_id, project_name)
+            if not project:
+                return error
+            project_id = project.id
                 
-            project_users = ProjectUser.objects.filter(project_id=project_id).select_related('user')
-            if not project_users:
-                return f"No members found for project ID: {project_id}"
-            
-            result = f"Members for Project ID {project_id}:\n"
-            for pu in project_users:
-                result += f"- User ID: {pu.user_id}, Role ID: {self._mapping_role_id_to_name(pu.role_id)}, Full Name: {pu.user.full_name}\n"
-            return result
+            project_users = (
+                ProjectUser.objects.filter(project_id=project_id)
+                .order_by("user_id")
+                .values_list("user_id", "user__full_name", "role_id")
+            )
+            return self.output.table(
+                f"Members of project {project_id}",
+                ["user_id", "name", "role"],
+                project_users,
+                page_token,
+                transform=lambda row: (*row[:2], self._mapping_role_id_to_name(row[2])),
+                ui_columns=["ID", "Họ tên", "Vai trò"],
+            )
         except Exception as e:
             return f"Error retrieving project members: {str(e)}"
 
@@ -168,60 +162,55 @@ class PSCDProjectsService:
         except Task.DoesNotExist:
             return "Task not found"
 
-    def _get_tasks_by_project(self, project_name: str = None, project_id: int = None) -> str:
-        """Get all tasks for a specific project"""
+    def _get_tasks_by_project(self, project_name: str = None, project_id: int = None, page_token: str = None) -> str:
+        """Get all tasks for a specific project (paged)"""
         try:
-            if project_name:
-                project = Project.objects.get(name=project_name)
-                project_id = project.id
-            elif project_id:
-                project = Project.objects.get(id=project_id)
-            else:
+            if not project_id and not project_name:
                 return "Error: At least one of project_name or project_id must be provided."
+            project, error = self._find_project(project_id, project_name)
+            if not project:
+                return error
+            project_id = project.id
                 
-            tasks = Task.objects.filter(project_id=project_id)
-            if not tasks:
-                return f"No tasks found for project ID: {project_id}"
-            
-            result = f"Tasks for Project ID {project_id}:\n"
-            for task in tasks:
-                result += f"- ID: {task.id}, Name: {task.task_name}, Status: {task.status_id}, Work Time: {task.work_time}h, Due: {task.due_date}\n"
-            return result
+            tasks = (
+                Task.objects.filter(project_id=project_id)
+                .order_by("id")
+                .values_list("id", "task_name", "status_id", "work_time", "due_date")
+            )
+            return self.output.table(
+                f"Tasks of project {project_id}",
+                ["id", "name", "status_id", "work_time_h", "due"],
+                tasks,
+                page_token,
+                ui_columns=["ID", "Tên công việc", "Trạng thái", "Thời gian làm việc (h)", "Hạn"],
+            )
         except Exception as e:
             return f"Error retrieving tasks: {str(e)}"
 
-    def _get_tasks_by_user(self, user_id: int = None, email: str = None, full_name: str = None) -> str:
-        """Get all tasks assigned to a specific user"""
+    def _get_tasks_by_user(
+        self, user_id: int = None, email: str = None, full_name: str = None, page_token: str = None
+    ) -> str:
+        """Get all tasks assigned to a specific user (paged)"""
         try:
             if not any([user_id, email, full_name]):
                 return "Error: At least one of user_id, email, or full_name must be provided."
             
-            user = None
-            if user_id:
-                user = User.objects.filter(id=user_id).first()
-                if not user:
-                    return f"User not found with ID: {user_id}"
-            elif email:
-                user = User.objects.filter(email__iexact=email.strip()).first()
-                if not user:
-                    return f"User not found with email: {email}"
-            elif full_name:
-                user = User.objects.filter(full_name__iexact=full_name.strip()).first()
-                if not user:
-                    return f"User not found with full name: {full_name}"
-            
+            user, error = self._find_user(user_id, email, full_name)
             if not user:
-                return "User not found with the provided identifier."
+                return error
             
-            task_users = TaskUser.objects.filter(user_id=user_id)
-            if not task_users:
-                return f"No tasks found for user ID: {user_id}"
-            
-            result = f"Tasks for User ID {user_id}:\n"
-            for tu in task_users:
-                task = tu.task
-                result += f"- ID: {task.id}, Name: {task.task_name}, Status: {task.status_id}, Project: {task.project.name}, Due: {task.due_date}\n"
-            return result
+            task_users = (
+                TaskUser.objects.filter(user_id=user.id)
+                .order_by("task_id")
+                .values_list("task_id", "task__task_name", "task__status_id", "task__project__name", "task__due_date")
+            )
+            return self.output.table(
+                f"Tasks of {user.full_name} (user {user.id})",
+                ["id", "name", "status_id", "project", "due"],
+                task_users,
+                page_token,
+                ui_columns=["ID", "Tên công việc", "Trạng thái", "Dự án", "Hạn"],
+            )
         except Exception as e:
             return f"Error retrieving tasks for user: {str(e)}"
 
@@ -337,58 +326,47 @@ class PSCDProjectsService:
         except Exception as e:
             return f"Error calculating statistics: {str(e)}"
 
-    # def _get_project_tasks_chart(self, project_id: int) -> str:
-    #     """Get tasks chart for a specific project"""
-    #     try:
-    #         project = Project.objects.get(id=project_id)
-    #         user_work_time_dict = {}
-    #         task_users = TaskUser.objects.filter(task__project_id=project_id)
-    #         for tu in task_users:
-    #             user = tu.user
-    #             work_time = tu.task.work_time or 0
-    #             user_name = user.full_name
-    #             user_work_time_dict[user_name] = user_work_time_dict.get(user_name, 0) + work_time
-
-    #         user_names = list(user_work_time_dict.keys())
-    #         user_work_times = list(user_work_time_dict.values())
-    #         project_name = project.name
-
-    #         # Send data as table 
-    #         table_data = [
-    #             ["Thành viên", "Thời gian làm việc (h)"],
-    #             *zip(user_names, user_work_times)
-    #         ]
-    #         print(table_data)
-    #         self.queue.put({"type": "table", "content": json.dumps(table_data, default=str)})
+    def _get_project_tasks_chart(self, project_id: int) -> str:
+        """Get tasks chart for a specific project"""
+        try:
+            project = Project.objects.get(id=project_id)
+            # Tổng thời gian làm việc theo thành viên, tính trong DB
+            rows = (
+                TaskUser.objects.filter(task__project_id=project_id)
+                .values("user__full_name")
+                .annotate(work_time=Sum("task__work_time"))
+                .order_by("user__full_name")
+            )
+            user_names = [row["user__full_name"] for row in rows]
+            user_work_times = [row["work_time"] or 0 for row in rows]
 
-    #         if user_work_times and any(user_work_times):
-    #             plt.figure(figsize=(8, 4))
-    #             bars = plt.bar(user_names, user_work_times, color='skyblue')
-    #             plt.xlabel('Thành viên')
-    #             plt.ylabel('Thời gian làm việc (h)')
-    #             plt.title(f"Thời gian làm việc của thành viên trong dự án '{project_name}'")
-    #             plt.xticks(rotation=30, ha='right')
-    #             plt.tight_layout()
+            # Send data as table
+            table_data = [
+                ["Thành viên", "Thời gian làm việc (h)"],
+                *zip(user_names, user_work_times)
+            ]
+            self.queue.put({"type": "table", "content": json.dumps(table_data, default=str)})
 
-    #             # Annotate bars with values
-    #             for bar, value in zip(bars, user_work_times):
-    #                 plt.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), f'{value}', ha='center', va='bottom', fontsize=8)
+            if not user_work_times or not any(user_work_times):
+                return "No user work time data to plot."
 
-    #             buf = io.BytesIO()
-    #             plt.savefig(buf, format='png')
-    #             plt.close()
-    #             buf.seek(0)
-    #             image_base64 = base64.b64encode(buf.read()).decode('utf-8')
-    #             image_path = self.storage_service.save_base64_image(image_base64, folder="images")
-    #             self.queue.put({"type": "image", "content": image_path})
-    #             return ""
-    #         else:
-    #             return "No user work time data to plot."
-    #     except Exception as e:
-    #         return f"Error calculating statistics: {str(e)}"
+            # Vẽ trong process pool, cache theo dữ liệu: cùng dữ liệu thì dùng lại ảnh cũ
+            image_path = get_chart_service().render_to_storage(ChartSpec(
+                labels=user_names,
+                values=user_work_times,
+                title=f"Thời gian làm việc của thành viên trong dự án '{project.name}'",
+                xlabel="Thành viên",
+                ylabel="Thời gian làm việc (h)",
+            ))
+            self.queue.put({"type": "image", "content": image_path})
+            return ""
+        except Project.DoesNotExist:
+            return "Project not found"
+        except Exception as e:
+            return f"Error calculating statistics: {str(e)}"
 
     def create_tools(self):
-        return [
+        return trace_tools([
             StructuredTool.from_function(
                 func=self._get_project_info_by_id,
                 name="get_project_info_by_id",
@@ -396,24 +374,25 @@ class PSCDProjectsService:
                 args_schema=ProjectIdInput
             ),
             
-            Tool(
+            StructuredTool.from_function(
+                func=self._get_all_projects,
                 name="get_all_projects",
-                func=lambda *args, **kwargs: self._get_all_projects(),
-                description="Get list of all projects in the system. No input required."
+                description="Get list of all projects in the system, one page at a time. Pass next_page_token as page_token for the next page.",
+                args_schema=PageInput
             ),
             
             StructuredTool.from_function(
                 func=self._get_projects_by_user,
                 name="get_projects_by_user",
                 description="Get all projects assigned to a specific user. Can search by user_id, email, or full_name. At least one parameter must be provided.",
-                args_schema=UserFilterInput
+                args_schema=UserFilterPageInput
             ),
 
             StructuredTool.from_function(
                 func=self._get_project_members,
                 name="get_project_members",
                 description="Get all members of a specific project",
-                args_schema=ProjectFilterInput
+                args_schema=ProjectFilterPageInput
             ),
             
             StructuredTool.from_function(
@@ -427,13 +406,13 @@ class PSCDProjectsService:
                 func=self._get_tasks_by_project,
                 name="get_tasks_by_project",
                 description="Get all tasks for a specific project",
-                args_schema=ProjectFilterInput
+                args_schema=ProjectFilterPageInput
             ),
             StructuredTool.from_function(
                 func=self._get_tasks_by_user,
                 name="get_tasks_by_user",
                 description="Get all tasks assigned to a specific user",
-                args_schema=UserFilterInput
+                args_schema=UserFilterPageInput
             ),
             
             StructuredTool.from_function(
@@ -442,16 +421,16 @@ class PSCDProjectsService:
                 description="Get detailed task information by task ID",
                 args_schema=TaskIdInput
             ),
-            # StructuredTool.from_function(
-            #     func=self._get_project_tasks_chart,
-            #     name="get_project_tasks_chart",
-            #     description="Get tasks chart for a specific project. Return a chart of user work time in the project in image format",
-            #     args_schema=ProjectChartInput
-            # ),
+            StructuredTool.from_function(
+                func=self._get_project_tasks_chart,
+                name="get_project_tasks_chart",
+                description="Get tasks chart for a specific project. Return a chart of user work time in the project in image format",
+                args_schema=ProjectChartInput
+            ),
             StructuredTool.from_function(
                 func=self._get_project_working_time_statistics,
                 name="get_project_working_time_statistics",
                 description="Get working time statistics for a specific project. Return data in table format to display table in UI and string summary of the data.",
                 args_schema=ProjectIdInput
             ),
-        ]
\ No newline at end of file
+        ])
\ No newline at end of file
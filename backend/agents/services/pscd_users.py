@@ -1,8 +1,16 @@
 from pscds.models import User, Log, TaskUser, TimeInterval, ProjectUser
 from langchain_core.tools import StructuredTool, Tool
-from agents.services.io_models.input import UserIdInput, EmailInput
+from agents.services.io_models.input import UserIdInput, EmailInput, PageInput
+from agents.services.name_resolver import describe_candidates, get_name_resolver
+from common.utils.tool_output import ToolOutputFormatter
+from common.utils.tool_tracing import trace_tools
+from queue import Queue
 
 class PSCDUsersService:
+    def __init__(self, queue: Queue = None):
+        self.queue = queue
+        self.output = ToolOutputFormatter(queue)
+
     def _mapping_role_id_to_name(self, role_id: int) -> str:
         """Mapping role ID to role name"""
         if role_id == 1:
@@ -16,11 +24,10 @@ class PSCDUsersService:
     # User-related methods
     def _get_user_info_by_email(self, email: str) -> str:
         """Get user information by email address"""
-        try:
-            user = User.objects.get(email=email)
-            return f"User Info - Full name: {user.full_name}, Email: {user.email}, Role ID: {self._mapping_role_id_to_name(user.role_id)}, Phone: {user.phone}, Address: {user.address}, Date of birth: {user.datebirth}, Active: {user.active}, Created at: {user.created_at}"
-        except User.DoesNotExist:
-            return "User not found"
+        user, candidates = get_name_resolver().resolve_user(email=email)
+        if not user:
+            return describe_candidates("User", email, candidates)
+        return f"User Info - Full name: {user.full_name}, Email: {user.email}, Role ID: {self._mapping_role_id_to_name(user.role_id)}, Phone: {user.phone}, Address: {user.address}, Date of birth: {user.datebirth}, Active: {user.active}, Created at: {user.created_at}"
 
     def _get_user_info_by_id(self, user_id: int) -> str:
         """Get user information by user ID"""
@@ -30,16 +37,17 @@ class PSCDUsersService:
         except User.DoesNotExist:
             return "User not found"
 
-    def _get_all_users(self) -> str:
-        """Get list of all users"""
-        users = User.objects.all()
-        if not users:
-            return "No users found"
-        
-        result = "All Users:\n"
-        for user in users:
-            result += f"- ID: {user.id}, Name: {user.full_name}, Email: {user.email}, Role: {self._mapping_role_id_to_name(user.role_id)}, Active: {user.active}\n"
-        return result
+    def _get_all_users(self, page_token: str = None) -> str:
+        """Get list of all users (paged)"""
+        users = User.objects.order_by("id").values_list("id", "full_name", "email", "role_id", "active")
+        return self.output.table(
+            "All users",
+            ["id", "name", "email", "role", "active"],
+            users,
+            page_token,
+            transform=lambda row: (*row[:3], self._mapping_role_id_to_name(row[3]), row[4]),
+            ui_columns=["ID", "Họ tên", "Email", "Vai trò", "Hoạt động"],
+        )
 
     def _count_users(self) -> str:
         """Count total number of users"""
@@ -83,7 +91,7 @@ class PSCDUsersService:
             return f"Error calculating user statistics: {str(e)}"
         
     def create_tools(self):
-        return [
+        return trace_tools([
             StructuredTool.from_function(
                 func=self._get_user_info_by_email,
                 name="get_user_info_by_email",
@@ -96,10 +104,11 @@ class PSCDUsersService:
                 description="Get detailed user information by user ID",
                 args_schema=UserIdInput
             ),
-            Tool(
+            StructuredTool.from_function(
+                func=self._get_all_users,
                 name="get_all_users",
-                func=lambda *args, **kwargs: self._get_all_users(),
-                description="Get list of all users in the system. No input required."
+                description="Get list of all users in the system, one page at a time. Pass next_page_token as page_token for the next page.",
+                args_schema=PageInput
             ),
             Tool(
                 name="count_users",
@@ -118,4 +127,4 @@ class PSCDUsersService:
                 description="Get statistics for a specific user",
                 args_schema=UserIdInput
             ),
-        ]
\ No newline at end of file
+        ])
\ No newline at end of file
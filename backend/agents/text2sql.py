@@ -1,4 +1,6 @@
 from common.tools.sql_tool import connect_to_db, execute_sql_query
+from common.services.llm_metrics import RunMetrics
+from common.utils.middleware import get_req_uuid
 from openai import OpenAI
 from api_chat_bot import settings
 import yaml
@@ -11,7 +13,6 @@ class Text2SQL:
     """
 
     def __init__(self, model="gpt-4o-mini"):
-        self.conn = connect_to_db()
         self.database_metadata = self.load_database_metadata()
         self.SCHEMA = yaml.dump(
             {
@@ -24,6 +25,20 @@ class Text2SQL:
         )
         self.model = model
         self.llm = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # Metrics of the convert_text_to_sql call in progress
+        self.metrics = None
+
+    @property
+    def conn(self):
+        """Connection dùng chung của luồng hiện tại (không mở kết nối mới cho mỗi agent)"""
+        return connect_to_db()
+
+    def _complete(self, messages):
+        """Gọi chat completion và ghi nhận token vào metrics của lượt hiện tại"""
+        response = self.llm.chat.completions.create(model=self.model, messages=messages)
+        if self.metrics is not None:
+            self.metrics.add_openai_usage(response.usage)
+        return response.choices[0].message.content
 
     def routing_prompt(self, histories, text):
         """
@@ -43,11 +58,7 @@ class Text2SQL:
             f"Câu hỏi của người dùng: {text}"
         )
 
-        routing_query = self.llm.chat.completions.create(
-            model=self.model,
-            messages=[*histories, {"role": "user", "content": prompt}],
-        )
-        return routing_query.choices[0].message.content
+        return self._complete([*histories, {"role": "user", "content": prompt}])
 
     def load_database_metadata(self):
         """
@@ -64,6 +75,18 @@ class Text2SQL:
         return database_metadata
 
     def convert_text_to_sql(self, histories, text):
+        req_uuid = get_req_uuid()
+        self.metrics = RunMetrics("text2sql", str(req_uuid) if req_uuid else None, model=self.model)
+        try:
+            return self._convert_text_to_sql(histories, text)
+        except Exception:
+            self.metrics.status = "error"
+            raise
+        finally:
+            self.metrics.emit()
+            self.metrics = None
+
+    def _convert_text_to_sql(self, histories, text):
         routing_query = self.routing_prompt(histories, text)
 
         prompt = f"""
@@ -75,11 +98,7 @@ class Text2SQL:
         Câu truy vấn phải đúng cú pháp và tương thích với PostgreSQL.
         """
 
-        sql_query = self.llm.chat.completions.create(
-            model=self.model,
-            messages=[*histories, {"role": "user", "content": prompt}],
-        )
-        return sql_query.choices[0].message.content
+        return self._complete([*histories, {"role": "user", "content": prompt}])
     
     def general_query_prompt(self, text):
         """
@@ -155,8 +174,4 @@ class Text2SQL:
         - Tổng lương
         """
 
-        sql_query = self.llm.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-        )
-        return sql_query.choices[0].message.content
+        return self._complete([{"role": "user", "content": prompt}])
@@ -101,6 +101,17 @@ WSGI_APPLICATION = "api_chat_bot.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Seconds a worker thread keeps its connection open (0 = close after each request)
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+# psycopg 3 connection pool per worker process (needs psycopg[pool]); the ORM,
+# Text2SQL and the PGVector store all borrow from it, see common.services.db_pool
+DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", "false").lower() == "true"
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "8"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+# SQLAlchemy engine of the PGVector store when the pool is disabled
+DB_SQLALCHEMY_POOL_SIZE = int(os.getenv("DB_SQLALCHEMY_POOL_SIZE", "4"))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -109,6 +120,16 @@ DATABASES = {
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
+        # Keep connections across requests; checked before reuse after an error
+        "CONN_MAX_AGE": 0 if DB_POOL_ENABLED else DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "pool": {
+                "min_size": DB_POOL_MIN_SIZE,
+                "max_size": DB_POOL_MAX_SIZE,
+                "timeout": DB_POOL_TIMEOUT,
+            },
+        } if DB_POOL_ENABLED else {},
     },
 }
 
@@ -155,6 +176,15 @@ STATIC_ROOT = BASE_DIR / "static"
 # ---------------------------------------------------------------------------- #
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "media/"
+# Generated media (charts, images) is stored once per content hash, on local
+# disk ("local") or in the S3 bucket ("s3"). Files no record references are
+# purged daily once unused for MEDIA_ORPHAN_GRACE_HOURS; the providers below
+# yield every referenced media key
+MEDIA_STORE_BACKEND = os.getenv("MEDIA_STORE_BACKEND", "local")
+MEDIA_ORPHAN_GRACE_HOURS = int(os.getenv("MEDIA_ORPHAN_GRACE_HOURS", "24"))
+MEDIA_REFERENCE_PROVIDERS = [
+    "chat_service.services.turn_writer.iter_media_references",
+]
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -330,6 +360,18 @@ GOOGLE_OAUTH2_USER_INFO_URL = os.getenv("GOOGLE_OAUTH2_USER_INFO_URL")
 GOOGLE_SHEETS_SPREADSHEET_ID = os.getenv("GOOGLE_SHEETS_SPREADSHEET_ID")
 GOOGLE_SHEETS_WORKSHEET_NAME = os.getenv("GOOGLE_SHEETS_WORKSHEET_NAME", "Orders")
 
+# Order export outbox worker (python manage.py run_sheets_export_worker).
+# Orders are queued for export when SHEETS_EXPORT_ENABLED (default: a spreadsheet
+# is configured); set it to true locally to try the worker with --fake. Claimed
+# rows are leased for SHEETS_EXPORT_CLAIM_TIMEOUT seconds while the API is called
+SHEETS_EXPORT_ENABLED = os.getenv(
+    "SHEETS_EXPORT_ENABLED", "true" if GOOGLE_SHEETS_SPREADSHEET_ID else "false"
+).lower() == "true"
+SHEETS_EXPORT_CLAIM_TIMEOUT = int(os.getenv("SHEETS_EXPORT_CLAIM_TIMEOUT", "300"))
+SHEETS_EXPORT_INTERVAL = int(os.getenv("SHEETS_EXPORT_INTERVAL", "5"))
+SHEETS_EXPORT_BATCH_SIZE = int(os.getenv("SHEETS_EXPORT_BATCH_SIZE", "100"))
+SHEETS_EXPORT_MAX_ATTEMPTS = int(os.getenv("SHEETS_EXPORT_MAX_ATTEMPTS", "8"))
+
 # Google Service Account credentials (for Google Sheets API)
 GOOGLE_SERVICE_ACCOUNT = {
     'type': os.getenv("GOOGLE_SERVICE_ACCOUNT_TYPE"),
@@ -345,6 +387,48 @@ GOOGLE_SERVICE_ACCOUNT = {
     'universe_domain': os.getenv("GOOGLE_SERVICE_ACCOUNT_UNIVERSE_DOMAIN", "googleapis.com")
 }
 
+# ---------------------------------------------------------------------------- #
+#                                 CACHE                                        #
+# ---------------------------------------------------------------------------- #
+# Shared by every worker (OTPs, throttling, common.cache L2): Redis when REDIS_URL
+# is set, otherwise a database table (`manage.py createcachetable`). "locmem" is
+# per process and only meant for tests and single-process runs.
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "redis" if REDIS_URL else "db")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "api_chat_bot")
+
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": CACHE_KEY_PREFIX,
+        }
+    }
+elif CACHE_BACKEND == "db":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+            "KEY_PREFIX": CACHE_KEY_PREFIX,
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "100000"))},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": CACHE_KEY_PREFIX,
+        }
+    }
+
+# common.cache: L2 alias, and the in-process L1 (seconds an entry may be stale, size)
+TIERED_CACHE_ALIAS = os.getenv("TIERED_CACHE_ALIAS", "default")
+CACHE_L1_TTL = int(os.getenv("CACHE_L1_TTL", "10"))
+CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "1024"))
+# Seconds a session -> user id mapping is cached for the request logs
+SESSION_USER_CACHE_TTL = int(os.getenv("SESSION_USER_CACHE_TTL", "300"))
+
 # ---------------------------------------------------------------------------- #
 #                                 MAIL                                         #
 # ---------------------------------------------------------------------------- #
@@ -355,6 +439,11 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", "30"))
+# MailService keeps one SMTP connection per thread open for this many seconds
+# (0 = reconnect for every send) and sends bulk mail in batches of this size
+MAIL_CONNECTION_MAX_AGE = int(os.getenv("MAIL_CONNECTION_MAX_AGE", "60"))
+MAIL_BULK_BATCH_SIZE = int(os.getenv("MAIL_BULK_BATCH_SIZE", "100"))
 
 # ---------------------------------------------------------------------------- #
 #                                 AWS                                          #
@@ -373,9 +462,101 @@ AWS_S3_REGION_NAME = os.getenv("AWS_S3_REGION")
 AWS_S3_CUSTOM_DOMAIN = "%s.s3.amazonaws.com" % AWS_STORAGE_BUCKET_NAME
 AWS_S3_FILE_OVERWRITE = False
 AWS_DEFAULT_ACL = "public-read"
+# S3-compatible endpoint (MinIO, moto server); unset for AWS
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL") or None
+# Transfers: multipart above the threshold, in chunks of this size, with this
+# many concurrent parts (also the number of parallel copies when saving files)
+S3_MULTIPART_THRESHOLD_MB = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8"))
+S3_MULTIPART_CHUNKSIZE_MB = int(os.getenv("S3_MULTIPART_CHUNKSIZE_MB", "8"))
+S3_MAX_CONCURRENCY = int(os.getenv("S3_MAX_CONCURRENCY", "10"))
 
 
 # ---------------------------------------------------------------------------- #
 #                                 OPENAI                                       #
 # ---------------------------------------------------------------------------- #
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
\ No newline at end of file
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# ---------------------------------------------------------------------------- #
+#                                 ORDER BOT                                    #
+# ---------------------------------------------------------------------------- #
+# Product catalog cache lifetime in seconds (0 = until invalidated)
+PRODUCT_CATALOG_TTL = int(os.getenv("PRODUCT_CATALOG_TTL", "300"))
+
+# ---------------------------------------------------------------------------- #
+#                                 CHAT SERVICE                                 #
+# ---------------------------------------------------------------------------- #
+# Persist chat turns from a background writer instead of the streaming request
+CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "false").lower() == "true"
+CHAT_WRITE_BEHIND_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BEHIND_BATCH_SIZE", "50"))
+CHAT_WRITE_BEHIND_INTERVAL = int(os.getenv("CHAT_WRITE_BEHIND_INTERVAL", "1"))
+# Chunks embedded per OpenAI request when ingesting documents
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+# ---------------------------------------------------------------------------- #
+#                                 AGENT TOOLS                                  #
+# ---------------------------------------------------------------------------- #
+# List-style tool results (common.utils.tool_output): rows per page returned to
+# the LLM, "table" (pipe-separated) or "json", characters kept per cell, and
+# rows sent to the UI table through extra_data
+AGENT_TOOL_MAX_ROWS = int(os.getenv("AGENT_TOOL_MAX_ROWS", "20"))
+AGENT_TOOL_OUTPUT_FORMAT = os.getenv("AGENT_TOOL_OUTPUT_FORMAT", "table")
+AGENT_TOOL_MAX_CELL_CHARS = int(os.getenv("AGENT_TOOL_MAX_CELL_CHARS", "80"))
+AGENT_TOOL_RENDER_MAX_ROWS = int(os.getenv("AGENT_TOOL_RENDER_MAX_ROWS", "200"))
+# User/project name resolution (agents.services.name_resolver): candidates
+# returned and their minimum word similarity, the score and lead over the
+# runner-up needed to pick a match, and the in-process cache of recent lookups
+NAME_MATCH_LIMIT = int(os.getenv("NAME_MATCH_LIMIT", "5"))
+NAME_MATCH_CANDIDATE_SCORE = float(os.getenv("NAME_MATCH_CANDIDATE_SCORE", "0.4"))
+NAME_MATCH_MIN_SCORE = float(os.getenv("NAME_MATCH_MIN_SCORE", "0.75"))
+NAME_MATCH_MARGIN = float(os.getenv("NAME_MATCH_MARGIN", "0.1"))
+NAME_RESOLVER_CACHE_SIZE = int(os.getenv("NAME_RESOLVER_CACHE_SIZE", "512"))
+NAME_RESOLVER_CACHE_TTL = int(os.getenv("NAME_RESOLVER_CACHE_TTL", "60"))
+
+# ---------------------------------------------------------------------------- #
+#                                 CHARTS                                       #
+# ---------------------------------------------------------------------------- #
+# Chart rendering processes (0 = render in the request thread), seconds to wait
+# for a chart, how many chart paths are remembered in memory and for how long
+# (seconds, shared cache; keep it below MEDIA_ORPHAN_GRACE_HOURS)
+CHART_RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", "2"))
+CHART_RENDER_TIMEOUT = int(os.getenv("CHART_RENDER_TIMEOUT", "30"))
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "256"))
+CHART_CACHE_TTL = int(os.getenv("CHART_CACHE_TTL", "3600"))
+
+# ---------------------------------------------------------------------------- #
+#                                 TASK QUEUE                                   #
+# ---------------------------------------------------------------------------- #
+# Background jobs (python manage.py run_task_worker): seconds between polls,
+# jobs claimed per poll, retry backoff (base * 2^n up to max), seconds without a
+# heartbeat (sent every third of it while a job runs) before a job left RUNNING by
+# a dead worker is retried (or failed, once out of attempts), and how long
+# finished jobs are kept
+TASK_QUEUE_INTERVAL = int(os.getenv("TASK_QUEUE_INTERVAL", "1"))
+TASK_QUEUE_BATCH_SIZE = int(os.getenv("TASK_QUEUE_BATCH_SIZE", "1"))
+TASK_QUEUE_MAX_ATTEMPTS = int(os.getenv("TASK_QUEUE_MAX_ATTEMPTS", "5"))
+TASK_QUEUE_BACKOFF_BASE = int(os.getenv("TASK_QUEUE_BACKOFF_BASE", "10"))
+TASK_QUEUE_BACKOFF_MAX = int(os.getenv("TASK_QUEUE_BACKOFF_MAX", "3600"))
+TASK_QUEUE_LOCK_TIMEOUT = int(os.getenv("TASK_QUEUE_LOCK_TIMEOUT", "900"))
+TASK_QUEUE_RETENTION_HOURS = int(os.getenv("TASK_QUEUE_RETENTION_HOURS", "72"))
+# Run jobs inline when enqueued (local development without a worker)
+TASK_QUEUE_EAGER = os.getenv("TASK_QUEUE_EAGER", "false").lower() == "true"
+
+# ---------------------------------------------------------------------------- #
+#                                 MONITORING                                   #
+# ---------------------------------------------------------------------------- #
+# Expose /metrics for Prometheus (set PROMETHEUS_MULTIPROC_DIR under gunicorn).
+# Scrapes must come from a staff user, send "Authorization: Bearer <PROMETHEUS_METRICS_TOKEN>",
+# or connect from an address in PROMETHEUS_METRICS_ALLOWED_IPS (REMOTE_ADDR, not X-Forwarded-For)
+PROMETHEUS_METRICS_ENABLED = os.getenv("PROMETHEUS_METRICS_ENABLED", "false").lower() == "true"
+PROMETHEUS_METRICS_TOKEN = os.getenv("PROMETHEUS_METRICS_TOKEN", "")
+PROMETHEUS_METRICS_ALLOWED_IPS = [
+    *(filter(lambda x: len(x) > 0, os.getenv("PROMETHEUS_METRICS_ALLOWED_IPS", "").split(","))),
+]
+
+# Agent tool tracing: calls slower than this are logged as warnings, and every
+# call is appended to TOOL_TRACE_FILE when set (replay with `replay_tool_calls`)
+TOOL_TRACE_SLOW_MS = int(os.getenv("TOOL_TRACE_SLOW_MS", "1000"))
+TOOL_TRACE_FILE = os.getenv("TOOL_TRACE_FILE")
+
+# Import time budget of a worker cold start, enforced by `check_import_time`
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
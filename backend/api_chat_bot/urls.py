@@ -25,6 +25,7 @@ from drf_spectacular.views import (
 )
 from django.conf.urls.static import static
 from django.contrib import admin
+from common.views import metrics_view
 
 swagger_url = []
 
@@ -42,9 +43,15 @@ if settings.DISPLAY_SWAGGER:
         ),
     ]
 
+metrics_url = []
+
+if settings.PROMETHEUS_METRICS_ENABLED:
+    metrics_url = [path("metrics", metrics_view, name="prometheus-metrics")]
+
 
 urlpatterns = (
     swagger_url
+    + metrics_url
     + [
         path("api/", include("accounts.urls")),
         path("api/", include("chat_service.urls")),
@@ -0,0 +1,123 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from accounts.models.user import User
+from chat_service.models import Chat, Message
+from chat_service.services.chat_history import conversation_history, message_timeline, with_last_message
+
+BENCHMARK_TITLE = "[benchmark] chat history"
+
+
+class Command(BaseCommand):
+    help = (
+        "Populate synthetic chats/messages and print the query plans and timings "
+        "of the chat list, chat timeline and LLM history queries"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user-email", required=True, help="Owner of the synthetic chats")
+        parser.add_argument("--chats", type=int, default=1000)
+        parser.add_argument("--messages-per-chat", type=int, default=2000)
+        parser.add_argument("--populate", action="store_true", help="Insert synthetic data first")
+        parser.add_argument("--cleanup", action="store_true", help="Delete synthetic data and exit")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This benchmark uses PostgreSQL generate_series/EXPLAIN")
+
+        user = User.objects.filter(email=options["user_email"]).first()
+        if not user:
+            raise CommandError(f"User {options['user_email']} not found")
+
+        if options["cleanup"]:
+            deleted, _ = Chat.objects.filter(user=user, title=BENCHMARK_TITLE).delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} rows"))
+            return
+
+        if options["populate"]:
+            self._populate(user, options["chats"], options["messages_per_chat"])
+
+        chat = (
+            Chat.objects.filter(user=user, title=BENCHMARK_TITLE)
+            .order_by("-last_message_at")
+            .first()
+        )
+        if not chat:
+            raise CommandError("No synthetic chats found, run with --populate first")
+
+        chat_list = with_last_message(
+            Chat.objects.filter(user_id=user.id, is_deleted=False).order_by("-last_message_at")
+        )[:10]
+        newest_page = message_timeline(chat.id).order_by("-created_at", "-id")[:31]
+        history = Message.objects.filter(chat_id=chat.id).order_by("created_at", "id").values_list("sender", "message")
+        legacy_history = Message.objects.filter(chat__uuid=chat.uuid).order_by("created_at")
+
+        self._explain("Chat list (last_message + message_count)", chat_list)
+        self._explain("Newest timeline page", newest_page)
+        self._explain("LLM history by chat_id", history)
+        self._explain("Legacy LLM history by chat__uuid", legacy_history)
+
+        started = time.perf_counter()
+        conversation_history(chat.id)
+        self.stdout.write(f"conversation_history: {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    def _explain(self, title, queryset):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(queryset.explain(analyze=True, buffers=True))
+        self.stdout.write("")
+
+    def _populate(self, user, chats, messages_per_chat):
+        """Insert rows with generate_series: millions of rows in seconds, spread over a year"""
+        chat_table = Chat._meta.db_table
+        message_table = Message._meta.db_table
+        started = time.perf_counter()
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {chat_table}
+                    (uuid, created_at, updated_at, is_deleted, user_id, title, last_message_at)
+                SELECT gen_random_uuid(), now() - interval '365 days', now(), false, %s, %s, now()
+                FROM generate_series(1, %s)
+                """,
+                [user.id, BENCHMARK_TITLE, chats],
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {message_table}
+                    (uuid, created_at, updated_at, chat_id, message, sender)
+                SELECT
+                    gen_random_uuid(),
+                    c.created_at + (n * interval '1 minute') + (random() * interval '30 seconds'),
+                    now(),
+                    c.id,
+                    'Synthetic message #' || n,
+                    CASE WHEN n % 2 = 0 THEN 'BOT' ELSE 'HUMAN' END
+                FROM {chat_table} c
+                CROSS JOIN generate_series(1, %s) AS n
+                WHERE c.user_id = %s AND c.title = %s
+                """,
+                [messages_per_chat, user.id, BENCHMARK_TITLE],
+            )
+            cursor.execute(
+                f"""
+                UPDATE {chat_table} c
+                SET last_message_at = m.latest
+                FROM (
+                    SELECT chat_id, max(created_at) AS latest FROM {message_table} GROUP BY chat_id
+                ) m
+                WHERE m.chat_id = c.id AND c.user_id = %s AND c.title = %s
+                """,
+                [user.id, BENCHMARK_TITLE],
+            )
+            cursor.execute(f"ANALYZE {chat_table}")
+            cursor.execute(f"ANALYZE {message_table}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Inserted {chats} chats x {messages_per_chat} messages "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        )
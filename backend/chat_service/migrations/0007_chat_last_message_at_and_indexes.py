@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:20
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_last_message_at(apps, schema_editor):
+    Chat = apps.get_model("chat_service", "Chat")
+    Message = apps.get_model("chat_service", "Message")
+    latest = (
+        Message.objects.filter(chat_id=models.OuterRef("pk"))
+        .order_by("-created_at")
+        .values("created_at")[:1]
+    )
+    Chat.objects.update(
+        last_message_at=Coalesce(
+            models.Subquery(latest), models.F("created_at")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat_service", "0006_remove_message_html_message_message_extra_data"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chat",
+            name="last_message_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(populate_last_message_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="chat",
+            index=models.Index(
+                fields=["user", "is_deleted", "-updated_at"],
+                name="chat_user_active_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chat",
+            index=models.Index(
+                fields=["user", "is_deleted", "-last_message_at"],
+                name="chat_user_active_activity_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["chat", "created_at"], name="message_chat_created_idx"
+            ),
+        ),
+    ]
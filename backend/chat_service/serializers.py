@@ -7,21 +7,52 @@ class MessageSerializer(serializers.ModelSerializer):
         fields = "__all__"
         depth = 5
 
+class MessageTimelineSerializer(serializers.ModelSerializer):
+    """Slim message payload for chat timelines (no nested chat/parent/user)"""
+    parent = serializers.IntegerField(source="parent_id", read_only=True, allow_null=True)
+    extra_data = serializers.SerializerMethodField()
+    turn = serializers.SerializerMethodField()
+    class Meta:
+        model = Message
+        fields = ["id", "uuid", "parent", "message", "sender", "extra_data", "turn", "created_at"]
+
+    @staticmethod
+    def _is_turn_record(extra_data):
+        return isinstance(extra_data, dict) and "turn" in extra_data
+
+    def get_extra_data(self, obj):
+        # Bot messages store {"payload", "turn"}; the UI only renders the payload
+        if self._is_turn_record(obj.extra_data):
+            return obj.extra_data.get("payload")
+        return obj.extra_data
+
+    def get_turn(self, obj):
+        if self._is_turn_record(obj.extra_data):
+            return obj.extra_data["turn"]
+        return None
+
 class ChatHistoryListSerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(source="uuid")
+    last_message = serializers.CharField(read_only=True, allow_null=True)
+    message_count = serializers.IntegerField(read_only=True)
     class Meta:
         model = Chat
-        fields = ["id", "title", "created_at", "updated_at"]
+        fields = ["id", "title", "created_at", "updated_at", "last_message", "message_count"]
 
 class ChatHistoryDetailSerializer(serializers.ModelSerializer):
+    """Chat with its newest page of messages; older pages via the messages endpoint"""
     id = serializers.UUIDField(source="uuid")
     messages = serializers.SerializerMethodField()
+    next_cursor = serializers.SerializerMethodField()
     class Meta:
         model = Chat
-        fields = ["id", "title", "created_at", "updated_at", "messages"]
+        fields = ["id", "title", "created_at", "updated_at", "messages", "next_cursor"]
 
     def get_messages(self, obj):
-        return MessageSerializer(obj.messages.all().order_by("created_at"), many=True).data
+        return MessageTimelineSerializer(self.context.get("messages", []), many=True).data
+
+    def get_next_cursor(self, obj):
+        return self.context.get("next_cursor")
 
 class ChatRequestSerializer(serializers.Serializer):
     chat_id = serializers.CharField(required=True, allow_null=True)
@@ -0,0 +1,59 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Left
+
+from ..models import Chat, Message
+
+# Length of the last-message preview shown in the chat list
+PREVIEW_LENGTH = 100
+
+# Columns needed by MessageTimelineSerializer
+TIMELINE_FIELDS = ("id", "uuid", "parent_id", "message", "sender", "extra_data", "created_at")
+
+
+def with_last_message(queryset):
+    """
+    Annotate chats with `last_message` (preview) and `message_count`.
+
+    Both values come from correlated subqueries, so the chat list stays a
+    single query regardless of how many messages each chat has.
+    """
+    chat_messages = Message.objects.filter(chat_id=OuterRef("pk")).order_by()
+    last_message = (
+        chat_messages.order_by("-created_at", "-id")
+        .annotate(preview=Left("message", PREVIEW_LENGTH))
+        .values("preview")[:1]
+    )
+    message_count = (
+        chat_messages.values("chat_id")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return queryset.annotate(
+        last_message=Subquery(last_message),
+        message_count=Coalesce(Subquery(message_count, output_field=IntegerField()), 0),
+    )
+
+
+def message_timeline(chat_id):
+    """Messages of a chat with only the columns the timeline returns"""
+    return Message.objects.filter(chat_id=chat_id).only(*TIMELINE_FIELDS)
+
+
+def touch_last_message_at(chat_id, created_at):
+    """Move Chat.last_message_at forward (never backwards) with one UPDATE"""
+    Chat.objects.filter(pk=chat_id, last_message_at__lt=created_at).update(
+        last_message_at=created_at
+    )
+
+
+def conversation_history(chat_id):
+    """LLM history of a chat as [{"role", "content"}], oldest first"""
+    messages = (
+        Message.objects.filter(chat_id=chat_id)
+        .order_by("created_at", "id")
+        .values_list("sender", "message")
+    )
+    return [
+        {"role": "user" if sender == Message.Sender.HUMAN else "assistant", "content": message}
+        for sender, message in messages
+    ]
@@ -2,17 +2,46 @@ import json
 import time
 import threading
 from django.http import StreamingHttpResponse
-from ..models import Chat, Message
+from ..models import Chat
 from ..serializers import ChatHistoryListSerializer, ChatHistoryDetailSerializer
+from .chat_history import conversation_history, message_timeline, with_last_message
+from .turn_writer import ConversationTurn, merge_usage, save_turn
+from common.custom.pagination import KeysetPagination
+from common.services.db_pool import release_db_connections
+from common.services.media_store import get_media_store
 from agents.pscd_agent import PscdAgent
 from langchain_core.callbacks import BaseCallbackHandler
-from queue import Queue
+from queue import Empty, Queue
+
+
+class StreamQueue(Queue):
+    """
+    Event queue of one reply that also remembers what was shown with it: the
+    last extra_data table and the stored images (charts). They are noted when
+    the event is produced, so the agent thread can save the turn without
+    waiting for the stream to read every event.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.extra_data = None
+        self.media = []
+
+    def put(self, item, block=True, timeout=None):
+        if isinstance(item, dict):
+            if item.get("type") == "extra_data":
+                self.extra_data = item.get("content")
+            elif item.get("type") == "image" and get_media_store().owns(item.get("content")):
+                self.media.append(item["content"])
+        super().put(item, block, timeout)
 
 
 class StreamingCallbackHandler(BaseCallbackHandler):
     def __init__(self, queue: Queue):
         self.queue = queue
         self.finished = False
+        # Token usage summed over every LLM call of the agent run
+        self.usage = {}
 
     def send(self, event_type: str, content=None):
         self.queue.put({"type": event_type, "content": content})
@@ -28,41 +57,66 @@ class StreamingCallbackHandler(BaseCallbackHandler):
         else:
             self.queue.put({"type": "token", "content": token})
 
+    def on_llm_end(self, response, **kwargs):
+        reported = False
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    merge_usage(self.usage, usage)
+                    reported = True
+        if not reported:
+            merge_usage(self.usage, (response.llm_output or {}).get("token_usage"))
+
     def on_chain_end(self, *args, **kwargs):
         self.queue.put({"type": "end"})
 
 
 class DbInteractAiChatService:
     def __init__(self):
-        self.queue = Queue()
+        self.queue = StreamQueue()
         self.callback_handler = StreamingCallbackHandler(self.queue)
-        self.agent = PscdAgent(callbacks=[self.callback_handler], queue=self.queue).agent
+        self.pscd_agent = PscdAgent(callbacks=[self.callback_handler], queue=self.queue)
+        self.agent = self.pscd_agent.agent
 
     def get_chat_history(self, user):
-        chats = Chat.objects.filter(user=user, is_deleted=False)
+        chats = with_last_message(Chat.objects.filter(user=user, is_deleted=False))
         return ChatHistoryListSerializer(chats, many=True).data
 
     def get_chat_history_detail(self, chat_id):
         chat = Chat.objects.get(uuid=chat_id, is_deleted=False)
-        return ChatHistoryDetailSerializer(chat).data
+        paginator = KeysetPagination()
+        messages = paginator.paginate_queryset(message_timeline(chat.id), None)
+        return ChatHistoryDetailSerializer(
+            chat, context={"messages": messages, "next_cursor": paginator.next_cursor}
+        ).data
 
     def chat(self, request, data):
         user = request.user
         chat_id = data.get("chat_id", None)
         user_message = data.get("message", "")
         chat = self.get_chat_by_id(user, chat_id, user_message)
-        history = self.get_history_by_chat_id(chat_id)
-        extra_data = None
+        history = self.get_history_by_chat_id(chat.id)
 
         self._load_chat_history_into_agent_memory(self.agent, history)
 
-        # Start the agent execution in a separate thread to allow streaming
+        # Start the agent execution in a separate thread to allow streaming. The
+        # thread also saves the turn, so the response never waits for it: the
+        # stream closes on "end" (or on disconnect) while the save runs.
+        @release_db_connections
         def run_agent():
+            started = time.perf_counter()
             try:
-                result = self.agent.invoke({"input": user_message})
-                self._save_conversation_messages(chat, user_message, result["output"], extra_data)
+                output = self.agent.invoke(
+                    {"input": user_message}, config={"callbacks": [self.pscd_agent.metrics_handler]}
+                )["output"]
             except Exception as e:
                 self.callback_handler.send("error", str(e))
+                return
+            self._save_conversation_messages(
+                chat, user_message, output, self.queue.extra_data,
+                latency_ms=(time.perf_counter() - started) * 1000, media=self.queue.media,
+            )
 
         # Start agent in background thread
         agent_thread = threading.Thread(target=run_agent)
@@ -73,11 +127,9 @@ class DbInteractAiChatService:
             try:
                 event = self.callback_handler.queue.get(timeout=1)
                 yield f"data: {json.dumps(event)}\n\n"
-                if event["type"] == "extra_data":
-                    extra_data = event["content"]
                 if event["type"] == "end" or event["type"] == "error":
                     break
-            except:
+            except Empty:
                 # Check if agent thread is still running
                 if not agent_thread.is_alive():
                     break
@@ -95,15 +147,8 @@ class DbInteractAiChatService:
         )[0]
 
     def get_history_by_chat_id(self, chat_id):
-        messages = Message.objects.filter(chat__uuid=chat_id).order_by("created_at")
-        # Build history input for LLM as a list of dicts with role and content
-        history = []
-        for msg in messages:
-            if msg.sender == Message.Sender.HUMAN:
-                history.append({"role": "user", "content": msg.message})
-            else:
-                history.append({"role": "assistant", "content": msg.message})
-        return history
+        """Build history input for LLM from the chat's primary key (no join on uuid)"""
+        return conversation_history(chat_id)
 
     def _load_chat_history_into_agent_memory(self, agent, messages):
         """Load chat history into the agent's memory."""
@@ -155,13 +200,20 @@ class DbInteractAiChatService:
             return f"Error generating response: {error_message}"
 
     def _save_conversation_messages(
-        self, chat, user_message: str, bot_message: str, extra_data: str = None
+        self, chat, user_message: str, bot_message: str, extra_data: str = None, latency_ms: float = None,
+        media: list = None,
     ):
-        """Save both user and bot messages to the database."""
-        self.save_message(chat, user_message, Message.Sender.HUMAN)
-        self.save_message(chat, bot_message, Message.Sender.BOT, extra_data)
-
-    def save_message(self, chat, message, sender, extra_data=None):
-        Message.objects.create(
-            chat=chat, message=message, sender=sender, extra_data=extra_data
+        """Save the user and bot messages of a turn in one insert (or hand them to the write-behind writer)."""
+        llm = self.pscd_agent.llm
+        save_turn(
+            ConversationTurn(
+                chat_id=chat.id,
+                user_message=user_message,
+                bot_message=bot_message,
+                extra_data=extra_data,
+                model=getattr(llm, "model_name", None) or getattr(llm, "model", None),
+                usage=self.callback_handler.usage,
+                latency_ms=latency_ms,
+                media=list(dict.fromkeys(media or [])),
+            )
         )
@@ -0,0 +1,191 @@
+"""
+Streaming DOCX ingestion
+
+`iter_docx_blocks()` reads word/document.xml with lxml's iterparse (python-docx
+would build the whole DOM) and yields paragraphs and table rows in document
+order, each with the heading path it sits under, clearing every element once
+it is read. `iter_docx_chunks()` feeds those blocks through a bounded window
+into the text splitter, so chunks can go straight to the embedding batches:
+memory stays flat whatever the size of the document.
+"""
+
+import json
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from common.utils.lazy_import import lazy_import
+
+etree = lazy_import("lxml.etree")
+langchain_text_splitters = lazy_import("langchain_text_splitters")
+langchain_documents = lazy_import("langchain_core.documents")
+
+WORD_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _w(tag: str) -> str:
+    return f"{{{WORD_NAMESPACE}}}{tag}"
+
+
+@dataclass
+class DocxBlock:
+    text: str
+    kind: str  # "heading" | "paragraph" | "table_row"
+    section_path: Tuple[str, ...]
+
+
+def _read_heading_styles(archive: zipfile.ZipFile) -> dict:
+    """styleId -> heading level (0 for Title) from word/styles.xml"""
+    levels = {}
+    try:
+        styles = archive.read("word/styles.xml")
+    except KeyError:
+        return levels
+    for style in etree.fromstring(styles).iter(_w("style")):
+        style_id = style.get(_w("styleId"))
+        name = style.find(_w("name"))
+        name = (name.get(_w("val")) if name is not None else style_id or "").lower()
+        outline = style.find(f"{_w('pPr')}/{_w('outlineLvl')}")
+        if name == "title":
+            levels[style_id] = 0
+        elif name.startswith("heading ") and name[8:].isdigit():
+            levels[style_id] = int(name[8:])
+        elif outline is not None and outline.get(_w("val"), "").isdigit():
+            levels[style_id] = int(outline.get(_w("val"))) + 1
+    return levels
+
+
+def _text_of(element) -> str:
+    parts = []
+    for node in element.iter(_w("t"), _w("tab"), _w("br")):
+        if node.tag == _w("t"):
+            parts.append(node.text or "")
+        else:
+            parts.append("\t" if node.tag == _w("tab") else "\n")
+    return "".join(parts).strip()
+
+
+def _inside(element, tag: str) -> bool:
+    parent = element.getparent()
+    while parent is not None:
+        if parent.tag == tag:
+            return True
+        parent = parent.getparent()
+    return False
+
+
+def _release(element):
+    """Free an element and the already processed siblings before it"""
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def iter_docx_blocks(path: str) -> Iterator[DocxBlock]:
+    """Yield the paragraphs and table rows of a .docx in document order"""
+    with zipfile.ZipFile(path) as archive:
+        heading_styles = _read_heading_styles(archive)
+        headings: List[Tuple[int, str]] = []
+
+        with archive.open("word/document.xml") as document:
+            for _, element in etree.iterparse(document, events=("end",), tag=(_w("p"), _w("tr"))):
+                # Paragraphs in cells and rows of nested tables belong to their outer row
+                if _inside(element, _w("tc")):
+                    continue
+
+                if element.tag == _w("tr"):
+                    cells = [_text_of(cell) for cell in element.iterchildren(_w("tc"))]
+                    text = " | ".join(cell for cell in cells if cell)
+                    if text:
+                        yield DocxBlock(text, "table_row", tuple(title for _, title in headings))
+                    _release(element)
+                    continue
+
+                text = _text_of(element)
+                style = element.find(f"{_w('pPr')}/{_w('pStyle')}")
+                level = heading_styles.get(style.get(_w("val"))) if style is not None else None
+                _release(element)
+                if not text:
+                    continue
+                if level is not None:
+                    while headings and headings[-1][0] >= level:
+                        headings.pop()
+                    headings.append((level, text))
+                    yield DocxBlock(text, "heading", tuple(title for _, title in headings))
+                else:
+                    yield DocxBlock(text, "paragraph", tuple(title for _, title in headings))
+
+
+def iter_docx_chunks(
+    blocks: Iterable[DocxBlock],
+    metadata: dict,
+    chunk_size: int = 300,
+    chunk_overlap: int = 100,
+    window_chunks: int = 16,
+) -> Iterator["langchain_documents.Document"]:
+    """
+    Split streamed blocks into Documents, one section at a time.
+
+    Blocks are buffered up to about `window_chunks` chunks (or until the
+    section changes) and then split; the tail of the last chunk is carried
+    over as overlap. Each chunk records its heading and section path.
+    """
+    splitter = langchain_text_splitters.RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", ". ", " ", ""],
+    )
+    window = chunk_size * window_chunks
+    buffer: List[str] = []
+    buffered = 0
+    section: Optional[Tuple[str, ...]] = None
+    chunk_index = 0
+
+    def flush(carry: bool):
+        nonlocal buffer, buffered, chunk_index
+        pieces = splitter.split_text("\n\n".join(buffer)) if buffer else []
+        buffer, buffered = [], 0
+        for piece in pieces:
+            yield langchain_documents.Document(
+                page_content=piece,
+                metadata={
+                    **metadata,
+                    "heading": section[-1] if section else None,
+                    "section_path": " > ".join(section or ()),
+                    "chunk_index": chunk_index,
+                },
+            )
+            chunk_index += 1
+        if carry and pieces and chunk_overlap:
+            buffer, buffered = [pieces[-1][-chunk_overlap:]], min(len(pieces[-1]), chunk_overlap)
+
+    for block in blocks:
+        if block.section_path != section:
+            yield from flush(carry=False)
+            section = block.section_path
+        buffer.append(block.text)
+        buffered += len(block.text) + 2
+        if buffered >= window:
+            yield from flush(carry=True)
+    yield from flush(carry=False)
+
+
+def tee_blocks_to_json(blocks: Iterable[DocxBlock], path: str, source: str) -> Iterator[DocxBlock]:
+    """
+    Pass blocks through while writing {"content", "source", "processed_at"}
+    to `path`; the content string is written piece by piece, never built.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('{"content": "')
+        for block in blocks:
+            separator = "\n" if block.kind == "table_row" else "\n\n"
+            file.write(json.dumps(block.text + separator, ensure_ascii=False)[1:-1])
+            yield block
+        file.write(
+            f'", "source": {json.dumps(source, ensure_ascii=False)}, '
+            f'"processed_at": {json.dumps(time.strftime("%Y-%m-%d %H:%M:%S"))}}}'
+        )
@@ -4,12 +4,14 @@ import time
 from django.http import StreamingHttpResponse
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from api_chat_bot import settings
-from langchain_community.docstore.document import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from common.services.llm_service import get_llm_service, LLMProvider
-import docx
-from ..models import create_document_embedding, Chat, Message
+from common.services.llm_metrics import LLMMetricsCallbackHandler
+from ..models import create_document_embedding, Chat
 from ..serializers import ChatHistoryListSerializer, ChatHistoryDetailSerializer
+from .chat_history import conversation_history, message_timeline, with_last_message
+from .docx_ingestion import iter_docx_blocks, iter_docx_chunks, tee_blocks_to_json
+from .turn_writer import ConversationTurn, merge_usage, save_turn
+from common.custom.pagination import KeysetPagination
 
 class TosiAiChatService:
     def __init__(self, llm_provider: LLMProvider = LLMProvider.OPENAI):
@@ -37,24 +39,33 @@ class TosiAiChatService:
             streaming=True,
             api_key=api_key,
             verbose=False,
+            # Report token usage on the last streamed chunk
+            stream_usage=True,
         )
         
         # Configurable streaming delay (in seconds)
         self.streaming_delay = 0.05  # 50ms default delay
+
+        # Latency/token metrics of each streamed answer
+        self.metrics_handler = LLMMetricsCallbackHandler("tosi_ai_chat")
     def get_chat_history(self, user):
-        chats = Chat.objects.filter(user=user, is_deleted=False)
+        chats = with_last_message(Chat.objects.filter(user=user, is_deleted=False))
         return ChatHistoryListSerializer(chats, many=True).data
     
     def get_chat_history_detail(self, chat_id):
         chat = Chat.objects.get(uuid=chat_id, is_deleted=False)
-        return ChatHistoryDetailSerializer(chat).data
+        paginator = KeysetPagination()
+        messages = paginator.paginate_queryset(message_timeline(chat.id), None)
+        return ChatHistoryDetailSerializer(
+            chat, context={"messages": messages, "next_cursor": paginator.next_cursor}
+        ).data
         
     def chat(self, request, data):
         user = request.user
         chat_id = data.get('chat_id', None)
         message = data.get('message', None)
         chat = self.get_chat_by_id(user, chat_id, message)
-        history = self.get_history_by_chat_id(chat_id)
+        history = self.get_history_by_chat_id(chat.id)
 
         return self.stream_chat(data, chat, history) 
 
@@ -66,15 +77,8 @@ class TosiAiChatService:
         return chat
     
     def get_history_by_chat_id(self, chat_id):
-        messages = Message.objects.filter(chat__uuid=chat_id).order_by("created_at")
-        # Build history input for LLM as a list of dicts with role and content
-        history = []
-        for msg in messages:
-            if msg.sender == Message.Sender.HUMAN:
-                history.append({"role": "user", "content": msg.message})
-            else:
-                history.append({"role": "assistant", "content": msg.message})
-        return history
+        """Build history input for LLM from the chat's primary key (no join on uuid)"""
+        return conversation_history(chat_id)
 
     def stream_chat(self, input_data, chat, history):
         """
@@ -96,17 +100,23 @@ class TosiAiChatService:
                 messages = self._build_messages(system_message, history, user_message)
                 
                 # Stream the response
+                started = time.perf_counter()
                 output_message = ""
-                for chunk in self.llm.stream(messages):
+                usage = {}
+                for chunk in self.llm.stream(messages, config={'callbacks': [self.metrics_handler]}):
+                    merge_usage(usage, getattr(chunk, 'usage_metadata', None))
                     if hasattr(chunk, 'content') and chunk.content:
                         output_message += chunk.content
                         yield self._format_stream_data('token', content=chunk.content)
                         # Add delay to control streaming speed (adjust value as needed)
                         time.sleep(self.streaming_delay)  # Use configurable delay
+                latency_ms = (time.perf_counter() - started) * 1000
                 
                 # Send end signal and save messages
                 yield self._format_stream_data('end')
-                self._save_conversation_messages(chat, user_message, output_message)
+                self._save_conversation_messages(
+                    chat, user_message, output_message, usage=usage, latency_ms=latency_ms
+                )
                 
             except Exception as e:
                 error_message = self._handle_streaming_error(e)
@@ -186,19 +196,23 @@ class TosiAiChatService:
         response['Cache-Control'] = 'no-cache'
         return response
 
-    def _save_conversation_messages(self, chat, user_message: str, bot_message: str):
-        """Save both user and bot messages to the database."""
-        self.save_message(chat, user_message, Message.Sender.HUMAN)
-        self.save_message(chat, bot_message, Message.Sender.BOT)
-    
-    def save_message(self, chat, message, sender):
-        Message.objects.create(chat=chat, message=message, sender=sender)
+    def _save_conversation_messages(self, chat, user_message: str, bot_message: str, usage=None, latency_ms=None):
+        """Save the user and bot messages of a turn in one insert (or hand them to the write-behind writer)."""
+        save_turn(ConversationTurn(
+            chat_id=chat.id,
+            user_message=user_message,
+            bot_message=bot_message,
+            model=getattr(self.llm, 'model_name', None) or getattr(self.llm, 'model', None),
+            usage=usage or {},
+            latency_ms=latency_ms,
+        ))
     
 
     def _create_documents_from_text(self):
         """
         Read the Whitepaper Tosi Growth Holding.docx file and store it in DocumentEmbedding as vector database.
-        This method processes the DOCX file, splits it into chunks, and creates embeddings for each chunk.
+        Paragraphs and table rows are streamed from the DOCX into the splitter and the chunks
+        straight into batched embeddings, so memory stays flat for documents of any size.
         """
         try:
             # Path to the whitepaper file
@@ -210,82 +224,34 @@ class TosiAiChatService:
             
             print(f"Reading whitepaper from: {whitepaper_path}")
             
-            # Read the DOCX file
-            doc = docx.Document(whitepaper_path)
-            
-            # Extract text from all paragraphs
-            full_text = ""
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():  # Only add non-empty paragraphs
-                    full_text += paragraph.text.strip() + "\n\n"
-            
-            # Also extract text from tables if any
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            full_text += cell.text.strip() + "\n"
-                    full_text += "\n"
-            
-            if not full_text.strip():
-                print("Warning: No text content found in the whitepaper file")
-                return
-            
-            print(f"Extracted {len(full_text)} characters from whitepaper")
-            
-            # Create a Document object
-            document = Document(
-                page_content=full_text,
+            # Also save the full content to JSON for backward compatibility (written while streaming)
+            blocks = tee_blocks_to_json(
+                iter_docx_blocks(whitepaper_path), "whitepaper_data.json", "Whitepaper Tosi Growth Holding.docx"
+            )
+            chunks = iter_docx_chunks(
+                blocks,
                 metadata={
                     "source": "Whitepaper Tosi Growth Holding.docx",
                     "document_type": "whitepaper",
                     "company": "Tosi Growth Holding",
-                    "extraction_method": "python-docx"
-                }
-            )
-            
-            # Split the document into chunks
-            text_splitter = RecursiveCharacterTextSplitter(
+                    "extraction_method": "lxml-iterparse"
+                },
                 chunk_size=300,
                 chunk_overlap=100,
-                length_function=len,
-                separators=["\n\n", "\n", ". ", " ", ""]
             )
             
-            documents = text_splitter.split_documents([document])
-            print(f"Split document into {len(documents)} chunks")
-            
             # Store documents in vector database
-            create_document_embedding(documents)
-            
-            print("Successfully processed and stored whitepaper in vector database")
+            stored = create_document_embedding(chunks, batch_size=settings.EMBEDDING_BATCH_SIZE)
+            if not stored:
+                print("Warning: No text content found in the whitepaper file")
+                return
             
-            # Also save the full content to JSON for backward compatibility
-            self._save_whitepaper_to_json(full_text)
+            print(f"Successfully stored {stored} whitepaper chunks in vector database")
             
         except Exception as e:
             print(f"Error processing whitepaper: {e}")
             raise
 
-    def _save_whitepaper_to_json(self, content):
-        """
-        Save the whitepaper content to JSON file for backward compatibility.
-        """
-        try:
-            data = {
-                "content": content,
-                "source": "Whitepaper Tosi Growth Holding.docx",
-                "processed_at": time.strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            with open('whitepaper_data.json', 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            print("Saved whitepaper content to whitepaper_data.json")
-            
-        except Exception as e:
-            print(f"Error saving whitepaper to JSON: {e}")
-
     def search_whitepaper_embeddings(self, query: str, top_k: int = 5):
         """
         Search the whitepaper embeddings for relevant content based on a query.
@@ -0,0 +1,230 @@
+import atexit
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from queue import Empty, Queue
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from ..models import Message
+from .chat_history import touch_last_message_at
+from common.services.media_store import get_media_store
+
+logger = logging.getLogger(__name__)
+
+# Keys of the token usage recorded per turn (langchain usage_metadata names)
+USAGE_KEYS = ("input_tokens", "output_tokens", "total_tokens")
+
+# OpenAI llm_output["token_usage"] names -> usage_metadata names
+LEGACY_USAGE_KEYS = {
+    "prompt_tokens": "input_tokens",
+    "completion_tokens": "output_tokens",
+    "total_tokens": "total_tokens",
+}
+
+
+def merge_usage(totals: Dict[str, int], usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Add a usage_metadata / token_usage dict into `totals` (in place)"""
+    for key, value in (usage or {}).items():
+        key = LEGACY_USAGE_KEYS.get(key, key)
+        if key in USAGE_KEYS and isinstance(value, int):
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+@dataclass
+class ConversationTurn:
+    """A user message, the bot reply and the LLM stats of that exchange"""
+
+    chat_id: int
+    user_message: str
+    bot_message: str
+    extra_data: Any = None
+    model: Optional[str] = None
+    usage: Dict[str, int] = field(default_factory=dict)
+    latency_ms: Optional[float] = None
+    # Media store keys of the images shown with the reply
+    media: List[str] = field(default_factory=list)
+
+    def bot_extra_data(self) -> Dict[str, Any]:
+        """
+        extra_data stored on the bot message.
+
+        `payload` is what the UI renders (tables/charts); `media` lists the
+        media store keys the reply shows; `turn` holds the model, token usage
+        and latency of the exchange.
+        """
+        return {
+            "payload": self.extra_data,
+            "media": self.media,
+            "turn": {
+                "model": self.model,
+                "usage": self.usage,
+                "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            },
+        }
+
+
+def _reserve_ids(count: int) -> List[int]:
+    """Take `count` ids from the message sequence so replies can point at their parent"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [Message._meta.db_table, count],
+        )
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def persist_turns(turns: List[ConversationTurn]) -> List[Message]:
+    """
+    Insert the messages of one or more turns with a single bulk_create.
+
+    Ids are reserved up front so each bot message is inserted with `parent`
+    already pointing at its user message; the insert and the
+    Chat.last_message_at bump share one transaction. bulk_create skips the
+    post_save signal, hence the explicit touch_last_message_at. Media shown
+    in the replies is retained in the same transaction.
+    """
+    if not turns:
+        return []
+
+    with transaction.atomic():
+        ids = iter(_reserve_ids(len(turns) * 2))
+        messages = []
+        for turn in turns:
+            human = Message(
+                id=next(ids),
+                chat_id=turn.chat_id,
+                message=turn.user_message,
+                sender=Message.Sender.HUMAN,
+            )
+            bot = Message(
+                id=next(ids),
+                chat_id=turn.chat_id,
+                parent_id=human.id,
+                message=turn.bot_message,
+                sender=Message.Sender.BOT,
+                extra_data=turn.bot_extra_data(),
+            )
+            messages.extend((human, bot))
+        Message.objects.bulk_create(messages)
+
+        latest = {}
+        for message in messages:
+            latest[message.chat_id] = max(latest.get(message.chat_id, message.created_at), message.created_at)
+        for chat_id, created_at in latest.items():
+            touch_last_message_at(chat_id, created_at)
+
+        media = [key for turn in turns for key in turn.media]
+        if media:
+            get_media_store().retain(media)
+
+    return messages
+
+
+def iter_media_references() -> Iterator[str]:
+    """Media keys shown by bot messages of chats that are not deleted (MEDIA_REFERENCE_PROVIDERS)"""
+    rows = (
+        Message.objects.filter(sender=Message.Sender.BOT, chat__is_deleted=False, extra_data__has_key="media")
+        .values_list("extra_data__media", flat=True)
+        .iterator(chunk_size=2000)
+    )
+    for media in rows:
+        yield from media or []
+
+
+class TurnWriter:
+    """
+    Write-behind persistence of conversation turns.
+
+    Turns are queued by the streaming code and written by a daemon thread,
+    which drains up to `batch_size` queued turns into one persist_turns call,
+    so the end-of-stream event never waits on the database. Queued turns are
+    flushed at interpreter exit; a hard kill loses them, and a reply sent
+    right after a turn may be built from history that lacks it.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, interval: Optional[float] = None):
+        self.batch_size = batch_size or getattr(settings, "CHAT_WRITE_BEHIND_BATCH_SIZE", 50)
+        self.interval = interval or getattr(settings, "CHAT_WRITE_BEHIND_INTERVAL", 1)
+        self.queue: Queue = Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, turn: ConversationTurn):
+        self._ensure_started()
+        self.queue.put(turn)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="chat-turn-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _drain(self, first: ConversationTurn) -> List[ConversationTurn]:
+        turns = [first]
+        while len(turns) < self.batch_size:
+            try:
+                turns.append(self.queue.get_nowait())
+            except Empty:
+                break
+        return turns
+
+    def _write(self, turns: List[ConversationTurn]):
+        started = time.perf_counter()
+        try:
+            persist_turns(turns)
+            logger.debug(
+                f"Persisted {len(turns)} chat turns in {(time.perf_counter() - started) * 1000:.1f}ms"
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist {len(turns)} chat turns: {e}")
+        finally:
+            for _ in turns:
+                self.queue.task_done()
+
+    def _run(self):
+        while True:
+            try:
+                first = self.queue.get(timeout=self.interval)
+            except Empty:
+                continue
+            close_old_connections()
+            self._write(self._drain(first))
+
+    def flush(self):
+        """Persist everything still queued on the calling thread"""
+        while True:
+            try:
+                first = self.queue.get_nowait()
+            except Empty:
+                return
+            self._write(self._drain(first))
+
+
+# Global instance
+_turn_writer = None
+
+
+def get_turn_writer() -> TurnWriter:
+    """Get singleton instance of TurnWriter"""
+    global _turn_writer
+
+    if _turn_writer is None:
+        _turn_writer = TurnWriter()
+
+    return _turn_writer
+
+
+def save_turn(turn: ConversationTurn):
+    """Persist a turn now, or hand it to the background writer when CHAT_WRITE_BEHIND is on"""
+    if getattr(settings, "CHAT_WRITE_BEHIND", False):
+        get_turn_writer().submit(turn)
+    else:
+        persist_turns([turn])
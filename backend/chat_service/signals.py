@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Message
+from .services.chat_history import touch_last_message_at
+
+
+@receiver(post_save, sender=Message)
+def update_chat_last_message_at(sender, instance, created, **kwargs):
+    """Keep Chat.last_message_at in step with message inserts"""
+    if created and instance.chat_id:
+        touch_last_message_at(instance.chat_id, instance.created_at)
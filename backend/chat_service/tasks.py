@@ -0,0 +1,9 @@
+from common.services.task_queue import task
+
+
+@task(name="chat_service.ingest_whitepaper", queue="embeddings", max_attempts=3)
+def ingest_whitepaper():
+    """Embed the Tosi whitepaper into the vector store"""
+    from chat_service.services.tosi_ai_chat import TosiAiChatService
+
+    TosiAiChatService()._create_documents_from_text()
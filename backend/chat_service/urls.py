@@ -14,4 +14,7 @@ urlpatterns = [
         "get": "retrieve",
         "delete": "destroy",
     }), name="chat-history-detail"),
+    path("chat-history/<uuid:uuid>/messages", ChatHistoryView.as_view({
+        "get": "messages",
+    }), name="chat-history-messages"),
 ]
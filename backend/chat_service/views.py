@@ -4,35 +4,61 @@ from .serializers import (
     ChatRequestSerializer,
     ChatHistoryListSerializer,
     ChatHistoryDetailSerializer,
+    MessageTimelineSerializer,
 )
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.viewsets import ModelViewSet
 from .models import Chat
-from .services.tosi_ai_chat import TosiAiChatService
-from .services.db_interact_ai_chat import DbInteractAiChatService
+from .services.chat_history import message_timeline, with_last_message
+from common.custom.pagination import KeysetPagination
+from common.services.task_queue import enqueue
+from common.utils.lazy_import import lazy_import
 from django.http import StreamingHttpResponse
 
+# The chat services pull in langchain/openai/python-docx: load them on the first chat
+db_interact_ai_chat = lazy_import("chat_service.services.db_interact_ai_chat")
+
 
 class ChatHistoryView(ModelViewSet):
     permission_classes = [IsAuthenticated]
     lookup_field = "uuid"
-    ordering = ["-created_at"]
+    ordering = ["-last_message_at"]
 
     def get_queryset(self):
-        return Chat.objects.filter(user=self.request.user, is_deleted=False).order_by("-created_at")
+        queryset = Chat.objects.filter(user_id=self.request.user.id, is_deleted=False).order_by("-last_message_at")
+        if self.action == "list":
+            queryset = with_last_message(queryset)
+        return queryset
 
     def get_serializer(self, *args, **kwargs):
         if self.action == "list":
             return ChatHistoryListSerializer(*args, **kwargs)
         elif self.action == "retrieve":
             return ChatHistoryDetailSerializer(*args, **kwargs)
+        elif self.action == "messages":
+            return MessageTimelineSerializer(*args, **kwargs)
 
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        # Chat + newest page of messages: two queries however long the chat is
+        chat = self.get_object()
+        paginator = KeysetPagination()
+        messages = paginator.paginate_queryset(message_timeline(chat.id), request, view=self)
+        serializer = self.get_serializer(
+            chat, context={"messages": messages, "next_cursor": paginator.next_cursor}
+        )
+        return Response(serializer.data)
+
+    def messages(self, request, *args, **kwargs):
+        """Older messages of a chat, keyset-paginated with ?cursor=&limit="""
+        chat = self.get_object()
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(message_timeline(chat.id), request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
@@ -51,7 +77,7 @@ class ChatView(APIView):
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        chat_service = DbInteractAiChatService()
+        chat_service = db_interact_ai_chat.DbInteractAiChatService()
 
         response = StreamingHttpResponse(
             chat_service.chat(request, serializer.validated_data),
@@ -69,6 +95,6 @@ class CreateDocumentEmbeddingView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        chat_service = TosiAiChatService()
-        chat_service._create_documents_from_text()
-        return Response(status=status.HTTP_200_OK)
+        # Embedding the whitepaper takes minutes: run it on the task worker
+        job = enqueue("chat_service.ingest_whitepaper", unique_key="chat_service.ingest_whitepaper")
+        return Response({"job_id": job.id if job else None}, status=status.HTTP_202_ACCEPTED)
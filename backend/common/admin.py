@@ -2,6 +2,25 @@ from django.utils.translation import gettext_lazy as _
 from django.contrib import admin
 from django.contrib.auth.models import Group
 
+from common.models import Job, MediaObject
+
 from django.contrib import admin
 
 admin.site.unregister(Group)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["id", "name", "queue", "priority", "status", "attempts", "run_at", "finished_at"]
+    list_filter = ["status", "queue", "name"]
+    search_fields = ["name", "unique_key", "last_error"]
+    readonly_fields = ["locked_by", "locked_at", "finished_at", "created_at", "updated_at"]
+    ordering = ["-id"]
+
+
+@admin.register(MediaObject)
+class MediaObjectAdmin(admin.ModelAdmin):
+    list_display = ["id", "key", "size", "content_type", "ref_count", "last_used_at"]
+    search_fields = ["key", "digest"]
+    readonly_fields = ["key", "digest", "size", "content_type", "created_at", "updated_at"]
+    ordering = ["-id"]
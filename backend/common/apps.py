@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "common"
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_in, user_logged_out
+        from django.db.backends.signals import connection_created
+
+        # Connection metrics (db_connections_opened_total) hook the connection_created signal
+        from common.services import db_pool  # noqa: F401
+        from common.utils import request_context
+
+        # Per-request DB time/query count, and the session -> user cache used by the request logs
+        connection_created.connect(request_context.install_query_recorder, dispatch_uid="request_query_recorder")
+        user_logged_in.connect(request_context.remember_session_user, dispatch_uid="remember_session_user")
+        user_logged_out.connect(request_context.forget_session_user, dispatch_uid="forget_session_user")
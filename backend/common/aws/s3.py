@@ -1,63 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import threading
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError, ClientError
 from django.conf import settings
 import logging
 
+MB = 1024 * 1024
+
+# delete_objects accepts at most 1,000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+# Global instance: creating a client is slow and clients are thread-safe
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """Get the shared S3 client (its connection pool fits S3_MAX_CONCURRENCY transfers)"""
+    global _s3_client
+
+    with _s3_client_lock:
+        if _s3_client is None:
+            _s3_client = boto3.client(
+                "s3",
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_S3_REGION_NAME,
+                endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+                config=Config(
+                    max_pool_connections=max(settings.S3_MAX_CONCURRENCY * 2, 10),
+                    retries={"max_attempts": 5, "mode": "standard"},
+                ),
+            )
+    return _s3_client
+
 
 class S3Storage:
-    def __init__(self):
+    def __init__(self, s3_client=None):
         self.bucket_name = settings.AWS_STORAGE_BUCKET_NAME
-        self.s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_S3_REGION_NAME,
+        self.s3_client = s3_client or get_s3_client()
+        # Bodies above the threshold go up/down as concurrent multipart chunks
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE_MB * MB,
+            max_concurrency=settings.S3_MAX_CONCURRENCY,
+            use_threads=True,
         )
         self.logger = logging.getLogger(__name__)
 
-    def upload_file(self, content: BytesIO, file_path: str, file_name: str):
-        """Upload a file to an S3 bucket"""
+    def upload_file(self, content: BytesIO, file_path: str, file_name: str, extra_args: Optional[dict] = None):
+        """Upload a file object to an S3 bucket, streamed in multipart chunks"""
         path = file_path + "/" + file_name
-        self.s3_client.put_object(
-            Bucket=self.bucket_name,
-            Key=path,
-            Body=content,
+        self.s3_client.upload_fileobj(
+            content,
+            self.bucket_name,
+            path,
+            ExtraArgs=extra_args,
+            Config=self.transfer_config,
         )
         return path
 
-    def download_file(self, object_name, file_name=None):
-        """Download a file from an S3 bucket"""
+    def download_file(self, object_name, file_name=None) -> Optional[str]:
+        """Download a file from an S3 bucket; returns the local path, None on error"""
         if file_name is None:
             file_name = object_name
         try:
-            self.s3_client.download_file(self.bucket_name, object_name, file_name)
-            print(
-                f"File {object_name} downloaded from {self.bucket_name} to {file_name}"
-            )
+            self.s3_client.download_file(self.bucket_name, object_name, file_name, Config=self.transfer_config)
+            self.logger.info(f"File {object_name} downloaded from {self.bucket_name} to {file_name}")
+            return file_name
         except ClientError as e:
-            print(f"Error occurred: {e}")
+            self.logger.error(f"Error downloading {object_name}: {e}")
+            return None
+
+    def download_fileobj(self, object_name, fileobj):
+        """Stream an object into a writable binary file object"""
+        self.s3_client.download_fileobj(self.bucket_name, object_name, fileobj, Config=self.transfer_config)
+        return fileobj
 
-    def delete_file(self, object_name):
+    def delete_file(self, object_name) -> bool:
         """Delete a file from an S3 bucket"""
         try:
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=object_name)
-            print(f"File {object_name} deleted from {self.bucket_name}")
+            self.logger.info(f"File {object_name} deleted from {self.bucket_name}")
+            return True
         except ClientError as e:
-            print(f"Error occurred: {e}")
+            self.logger.error(f"Error deleting {object_name}: {e}")
+            return False
 
-    def list_files(self):
-        """List files in an S3 bucket"""
-        try:
-            response = self.s3_client.list_objects_v2(Bucket=self.bucket_name)
-            if "Contents" in response:
-                for obj in response["Contents"]:
-                    print(obj["Key"])
-            else:
-                print("No files found in the bucket.")
-        except ClientError as e:
-            print(f"Error occurred: {e}")
+    def delete_files(self, object_names: Iterable[str]) -> List[dict]:
+        """
+        Delete many files, 1,000 keys per delete_objects request.
+        Returns the per-key errors reported by S3 (empty when all were deleted).
+        """
+        errors = []
+        batch = []
+        for object_name in object_names:
+            batch.append({"Key": object_name})
+            if len(batch) == DELETE_BATCH_SIZE:
+                errors.extend(self._delete_batch(batch))
+                batch = []
+        if batch:
+            errors.extend(self._delete_batch(batch))
+        for error in errors:
+            self.logger.error(f"Error deleting {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+        return errors
+
+    def _delete_batch(self, batch: List[dict]) -> List[dict]:
+        response = self.s3_client.delete_objects(
+            Bucket=self.bucket_name,
+            Delete={"Objects": batch, "Quiet": True},
+        )
+        return response.get("Errors", [])
+
+    def iter_files(self, prefix: str = "", page_size: int = 1000) -> Iterator[Dict]:
+        """Yield every object under a prefix ({"Key", "Size", "LastModified", "ETag"}), page by page"""
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        pages = paginator.paginate(
+            Bucket=self.bucket_name,
+            Prefix=prefix,
+            PaginationConfig={"PageSize": page_size},
+        )
+        for page in pages:
+            yield from page.get("Contents", [])
+
+    def list_files(self, prefix: str = "") -> List[str]:
+        """List the keys in an S3 bucket (all pages)"""
+        return [obj["Key"] for obj in self.iter_files(prefix)]
 
     def get_object(self, object_name):
         """Get an object from an S3 bucket"""
         return self.s3_client.get_object(Bucket=self.bucket_name, Key=object_name)
+
+    def get_size(self, object_name) -> Optional[int]:
+        """Size in bytes of an object, None if it does not exist"""
+        try:
+            return self.s3_client.head_object(Bucket=self.bucket_name, Key=object_name)["ContentLength"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def copy(self, from_path: str, to_path: str):
+        """Server-side copy inside the bucket (multipart for large objects)"""
+        self.s3_client.copy(
+            {"Bucket": self.bucket_name, "Key": from_path},
+            self.bucket_name,
+            to_path,
+            Config=self.transfer_config,
+        )
+        return to_path
+
+    def copy_many(self, pairs: Iterable[Tuple[str, str]], max_workers: Optional[int] = None) -> List[str]:
+        """Copy (from_path, to_path) pairs in parallel; raises the first failure"""
+        pairs = list(pairs)
+        if len(pairs) <= 1:
+            return [self.copy(from_path, to_path) for from_path, to_path in pairs]
+        workers = min(max_workers or settings.S3_MAX_CONCURRENCY, len(pairs))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-copy") as executor:
+            return list(executor.map(lambda pair: self.copy(*pair), pairs))
@@ -0,0 +1,9 @@
+"""
+Two-tier cache: a bounded in-process LRU (L1) in front of the shared Django
+cache configured in CACHES (L2: Redis, or a database table).
+"""
+
+from common.cache.local import MISSING, LocalCache
+from common.cache.tiered import TieredCache, get_tiered_cache
+
+__all__ = ["MISSING", "LocalCache", "TieredCache", "get_tiered_cache"]
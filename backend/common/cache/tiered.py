@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from prometheus_client import Counter
+
+from common.cache.local import MISSING, LocalCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Tiered cache lookups by namespace, tier and result",
+    ["namespace", "tier", "result"],
+)
+CACHE_LOCK_WAITS = Counter(
+    "cache_single_flight_waits_total",
+    "Lookups that waited for another process to compute the value",
+    ["namespace"],
+)
+
+# In-process locks are striped by key hash instead of kept per key
+LOCK_STRIPES = 64
+
+
+class TieredCache:
+    """
+    Namespaced cache: an in-process LRU (L1) in front of a shared Django cache (L2).
+
+    - L1 entries live at most `l1_ttl` seconds, which bounds how stale a
+      worker can be after another worker changes or clears the value.
+    - `clear()` bumps the namespace version stored in L2, so every worker
+      drops the whole namespace without deleting keys one by one.
+    - `get_or_set()` computes a missing value once: per process through a
+      striped lock, across processes through an `add()` lock in L2 while
+      the others poll for the result.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        backend=None,
+        default_timeout: Optional[int] = 300,
+        l1_ttl: Optional[float] = None,
+        l1_max_entries: Optional[int] = None,
+        lock_timeout: float = 30,
+        lock_poll_interval: float = 0.05,
+    ):
+        self.namespace = namespace
+        self.backend = backend if backend is not None else caches[getattr(settings, "TIERED_CACHE_ALIAS", "default")]
+        self.default_timeout = default_timeout
+        self.local = LocalCache(
+            max_entries=l1_max_entries if l1_max_entries is not None else getattr(settings, "CACHE_L1_MAX_ENTRIES", 1024),
+            ttl=l1_ttl if l1_ttl is not None else getattr(settings, "CACHE_L1_TTL", 10),
+        )
+        self.lock_timeout = lock_timeout
+        self.lock_poll_interval = lock_poll_interval
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+
+    # Keys
+
+    def _version_key(self) -> str:
+        return f"{self.namespace}:version"
+
+    def _version(self) -> int:
+        key = self._version_key()
+        version = self.local.get(key)
+        if version is MISSING:
+            version = self.backend.get(key)
+            if version is None:
+                version = 1
+                self.backend.add(key, version, timeout=None)
+            self.local.set(key, version)
+        return version
+
+    def make_key(self, key: str) -> str:
+        return f"{self.namespace}:v{self._version()}:{key}"
+
+    def _count(self, tier: str, result: str, stat: Optional[str] = None):
+        CACHE_REQUESTS.labels(self.namespace, tier, result).inc()
+        if stat:
+            with self._stats_lock:
+                self._stats[stat] += 1
+
+    # Reads / writes
+
+    def _lookup(self, full_key: str) -> Any:
+        value = self.local.get(full_key)
+        if value is not MISSING:
+            self._count("l1", "hit", "l1_hits")
+            return value
+        self._count("l1", "miss")
+
+        value = self.backend.get(full_key, MISSING)
+        if value is not MISSING:
+            self._count("l2", "hit", "l2_hits")
+            self.local.set(full_key, value)
+            return value
+        self._count("l2", "miss", "misses")
+        return MISSING
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(self.make_key(key))
+        return default if value is MISSING else value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = MISSING):
+        timeout = self.default_timeout if timeout is MISSING else timeout
+        full_key = self.make_key(key)
+        self.backend.set(full_key, value, timeout=timeout)
+        self.local.set(full_key, value, ttl=timeout)
+
+    def delete(self, key: str):
+        full_key = self.make_key(key)
+        self.backend.delete(full_key)
+        self.local.delete(full_key)
+
+    def clear(self):
+        """Invalidate the whole namespace in every worker (within l1_ttl)"""
+        key = self._version_key()
+        try:
+            self.backend.incr(key)
+        except ValueError:
+            # No version yet (or evicted): any new value differs from the cached ones
+            self.backend.set(key, int(time.time()), timeout=None)
+        self.local.clear()
+
+    def get_or_set(self, key: str, compute: Callable[[], Any], timeout: Optional[int] = MISSING) -> Any:
+        full_key = self.make_key(key)
+        value = self._lookup(full_key)
+        if value is not MISSING:
+            return value
+
+        with self._locks[zlib.crc32(full_key.encode("utf-8")) % LOCK_STRIPES]:
+            # Another thread of this process may have filled it meanwhile
+            value = self.local.get(full_key)
+            if value is not MISSING:
+                return value
+
+            lock_key = f"{full_key}:lock"
+            token = uuid.uuid4().hex
+            deadline = time.monotonic() + self.lock_timeout
+            waited = False
+            while not self.backend.add(lock_key, token, timeout=self.lock_timeout):
+                if not waited:
+                    CACHE_LOCK_WAITS.labels(self.namespace).inc()
+                    waited = True
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Cache lock {lock_key} still held after {self.lock_timeout}s, computing anyway")
+                    token = None
+                    break
+                time.sleep(self.lock_poll_interval)
+                value = self.backend.get(full_key, MISSING)
+                if value is not MISSING:
+                    self.local.set(full_key, value)
+                    return value
+
+            try:
+                value = compute()
+                self.set(key, value, timeout)
+                return value
+            finally:
+                if token and self.backend.get(lock_key) == token:
+                    self.backend.delete(lock_key)
+
+    # Metrics
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["l1_hits"] + stats["l2_hits"]) / lookups if lookups else 0.0
+        stats["l1_size"] = len(self.local)
+        return stats
+
+
+# Global instances, one per namespace
+_tiered_caches: Dict[str, TieredCache] = {}
+_tiered_caches_lock = threading.Lock()
+
+
+def get_tiered_cache(namespace: str, **kwargs) -> TieredCache:
+    """Get the TieredCache of a namespace (options apply on first call only)"""
+    with _tiered_caches_lock:
+        if namespace not in _tiered_caches:
+            _tiered_caches[namespace] = TieredCache(namespace, **kwargs)
+        return _tiered_caches[namespace]
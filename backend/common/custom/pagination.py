@@ -1,5 +1,10 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
 from drf_yasg import openapi
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
 
 
@@ -69,3 +74,98 @@ class CustomPagination(PageNumberPagination):
                 }
             }
         )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on (created_at, id), newest page first.
+
+    Each page is fetched with `WHERE (created_at, id) < cursor ORDER BY
+    created_at DESC, id DESC LIMIT n`, so the cost does not depend on how deep
+    the page is. Items of a page are returned oldest first (timeline order)
+    and `next_cursor` points to the older page.
+    """
+
+    page_size = 30
+    page_size_query_param = "limit"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        if request is None:
+            return self.page_size
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, instance):
+        raw = f"{instance.created_at.isoformat()}|{instance.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_page_size(request)
+        queryset = queryset.order_by("-created_at", "-id")
+
+        cursor = request.query_params.get(self.cursor_query_param) if request else None
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        page = list(queryset[: self.limit + 1])
+        has_next = len(page) > self.limit
+        page = page[: self.limit]
+        self.next_cursor = self.encode_cursor(page[-1]) if has_next else None
+        return page[::-1]
+
+    def get_paginated_response(self, data, message="Data has been fetched."):
+        return Response(
+            {
+                "message": message,
+                "status_code": 200,
+                "data": {
+                    "items": data,
+                    "meta": {
+                        "pagination": {
+                            "limit": self.limit,
+                            "next_cursor": self.next_cursor,
+                        }
+                    },
+                },
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "message": openapi.Schema(
+                    type=openapi.TYPE_STRING, example="Data has been fetched."
+                ),
+                "status_code": openapi.Schema(type=openapi.TYPE_INTEGER, example=200),
+                "data": {
+                    "items": schema,
+                    "meta": {
+                        "pagination": {
+                            "limit": openapi.Schema(
+                                type=openapi.TYPE_INTEGER, example=30
+                            ),
+                            "next_cursor": openapi.Schema(
+                                type=openapi.TYPE_STRING, example=None
+                            ),
+                        }
+                    },
+                },
+            },
+        )
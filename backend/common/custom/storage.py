@@ -58,12 +58,24 @@ class CustomStorage(Storage):
             return urljoin(self.base_url, name)
         return urljoin(self.base_url, f"{self.default_folder}/{name}")
 
+    def delete(self, name):
+        self.s3_storage.delete_file(name)
+
+    def copy(self, from_path, to_path):
+        return self.s3_storage.copy(from_path, to_path)
+
+    def copy_many(self, pairs):
+        """Copy (from_path, to_path) pairs in parallel"""
+        return self.s3_storage.copy_many(pairs)
+
+    def get_size_file(self, to_path):
+        return self.s3_storage.get_size(to_path)
+
     def size(self, name):
         """
         Return the total size, in bytes, of the file specified by name.
         """
         try:
-            obj = self.s3_storage.get_object(name)
-            return obj["ContentLength"]
+            return self.s3_storage.get_size(name) or 0
         except Exception:
             return 0
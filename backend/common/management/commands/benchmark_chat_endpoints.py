@@ -0,0 +1,251 @@
+import json
+import os
+import pathlib
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import cycle, islice
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from rest_framework.test import APIClient
+
+from accounts.models.user import User
+from common.services.fake_openai_server import FakeOpenAIServer
+
+SCENARIOS_PATH = pathlib.Path(__file__).resolve().parent.parent / "assets" / "chat_benchmark_scenarios.json"
+
+ENDPOINTS = ("chat", "restaurant", "order")
+
+
+@dataclass
+class TurnResult:
+    latency: float
+    ttft: Optional[float]
+    error: Optional[str] = None
+
+
+class QueryCounter:
+    """execute_wrapper counting queries on every connection, including the agents' threads"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+def scripted_tool_calls(scenarios) -> dict:
+    """user message -> tool call the fake model answers with"""
+    return {
+        turn["message"]: turn["tool_call"]
+        for spec in scenarios.values()
+        for conversation in spec["conversations"]
+        for turn in conversation
+        if turn.get("tool_call")
+    }
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def _rss_mb() -> float:
+    """Resident memory of this process (Linux /proc, 0 elsewhere)"""
+    try:
+        with open("/proc/self/statm") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive ChatView, restaurant_chat_stream and OrderChatView with scripted multi-turn "
+        "conversations against a local fake OpenAI server and report throughput, time to "
+        "first token, latency percentiles, query counts and memory at increasing concurrency. "
+        "MB/thr is the RSS growth during a level divided by its concurrent threads (an estimate "
+        "per request thread, not per gunicorn worker process)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", action="append", choices=ENDPOINTS, help="Default: all")
+        parser.add_argument("--concurrency", default="1,4,8", help="Comma separated levels")
+        parser.add_argument("--conversations", type=int, help="Conversations per level (default 2x concurrency)")
+        parser.add_argument("--first-token-ms", type=float, default=300)
+        parser.add_argument("--tokens-per-second", type=float, default=50)
+        parser.add_argument("--scenarios", default=str(SCENARIOS_PATH))
+        parser.add_argument("--user-email", default="benchmark@example.com", help="Created if missing")
+        parser.add_argument("--llm-url", help="Use an already running fake server (see run_fake_openai_server)")
+        parser.add_argument(
+            "--seed", action="store_true",
+            help=(
+                "Run seed_fashion_products, seed_order_bot and a small seed_pscd_dataset first "
+                "(replaces the product catalog)"
+            ),
+        )
+        parser.add_argument("--trace-memory", action="store_true", help="Report the tracemalloc peak per thread instead of RSS growth")
+
+    def handle(self, *args, **options):
+        with open(options["scenarios"], encoding="utf-8") as file:
+            scenarios = json.load(file)
+        endpoints = options["endpoint"] or list(ENDPOINTS)
+        levels = [int(level) for level in options["concurrency"].split(",") if level.strip()]
+        if not levels:
+            raise CommandError("--concurrency needs at least one level")
+
+        if options["seed"]:
+            call_command("seed_fashion_products")
+            call_command("seed_order_bot")
+            call_command("seed_pscd_dataset", scale="small")
+
+        user = User.objects.filter(email=options["user_email"]).first()
+        if user is None:
+            user = User.objects.create_user(
+                email=options["user_email"], password=None, status=User.UserStatus.ACTIVE
+            )
+
+        server = None
+        if options["llm_url"]:
+            base_url = options["llm_url"]
+        else:
+            server = self._start_fake_llm(scenarios, options)
+            base_url = server.base_url
+        os.environ["OPENAI_BASE_URL"] = base_url
+        os.environ.setdefault("OPENAI_API_KEY", "sk-fake-benchmark")
+        settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or os.environ["OPENAI_API_KEY"]
+
+        counter = QueryCounter()
+        connection_created.connect(counter.install)
+        if options["trace_memory"]:
+            tracemalloc.start()
+
+        self.stdout.write(
+            f"{'endpoint':<11} {'conc':>4} {'turns':>5} {'err':>4} {'turn/s':>7} {'ttft50':>7} {'ttft95':>7} "
+            f"{'p50':>7} {'p95':>7} {'p99':>7} {'q/turn':>7} {'llm/turn':>8} {'rss MB':>7} {'MB/thr':>7}"
+        )
+        try:
+            for endpoint in endpoints:
+                for level in levels:
+                    self._run_level(endpoint, scenarios[endpoint], level, user, counter, server, options)
+        finally:
+            connection_created.disconnect(counter.install)
+            if options["trace_memory"]:
+                tracemalloc.stop()
+            if server:
+                server.stop()
+
+    def _start_fake_llm(self, scenarios, options) -> FakeOpenAIServer:
+        return FakeOpenAIServer(
+            first_token_latency=options["first_token_ms"] / 1000,
+            tokens_per_second=options["tokens_per_second"],
+            tool_calls=scripted_tool_calls(scenarios),
+        ).start()
+
+    def _run_level(self, endpoint, spec, level, user, counter, server, options):
+        total = options["conversations"] or level * 2
+        conversations = list(islice(cycle(spec["conversations"]), total))
+        queries_before = counter.count
+        llm_before = server.requests if server else 0
+        rss_before = _rss_mb()
+        if options["trace_memory"]:
+            tracemalloc.reset_peak()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            futures = [
+                pool.submit(self._run_conversation, endpoint, spec["path"], conversation, user)
+                for conversation in conversations
+            ]
+            results: List[TurnResult] = [result for future in futures for result in future.result()]
+        elapsed = time.perf_counter() - started
+
+        ok = [result for result in results if not result.error]
+        latencies = [result.latency * 1000 for result in ok]
+        ttfts = [result.ttft * 1000 for result in ok if result.ttft is not None]
+        turns = len(results) or 1
+        # Estimated memory per concurrent request thread, not per gunicorn worker process:
+        # the process's RSS growth (or traced peak) during the level divided by its thread count
+        if options["trace_memory"]:
+            per_thread = tracemalloc.get_traced_memory()[1] / 1024 / 1024 / level
+        else:
+            per_thread = max(_rss_mb() - rss_before, 0) / level
+        llm_requests = (server.requests - llm_before) if server else 0
+
+        self.stdout.write(
+            f"{endpoint:<11} {level:>4} {len(results):>5} {len(results) - len(ok):>4} "
+            f"{len(ok) / elapsed:>7.2f} {_percentile(ttfts, 0.5):>7.0f} {_percentile(ttfts, 0.95):>7.0f} "
+            f"{_percentile(latencies, 0.5):>7.0f} {_percentile(latencies, 0.95):>7.0f} "
+            f"{_percentile(latencies, 0.99):>7.0f} {(counter.count - queries_before) / turns:>7.1f} "
+            f"{llm_requests / turns:>8.1f} {_rss_mb():>7.0f} {per_thread:>7.1f}"
+        )
+        for error in sorted({result.error for result in results if result.error})[:3]:
+            self.stdout.write(self.style.WARNING(f"  {endpoint}: {error}"))
+
+    def _payload(self, endpoint, chat_id, message, history):
+        if endpoint == "chat":
+            return {"chat_id": chat_id, "message": message}
+        if endpoint == "restaurant":
+            return {"user_input": message, "chat_history": history}
+        # OrderChatView drops the last history entry (the current message)
+        return {"message": message, "chat_history": history + [{"role": "user", "content": message}]}
+
+    def _run_conversation(self, endpoint, path, conversation, user) -> List[TurnResult]:
+        client = APIClient()
+        client.force_authenticate(user=user)
+        chat_id = str(uuid.uuid4())
+        history = []
+        results = []
+
+        for turn in conversation:
+            payload = self._payload(endpoint, chat_id, turn["message"], history)
+            started = time.perf_counter()
+            first_token = None
+            error = None
+            reply = ""
+            try:
+                response = client.post(path, payload, format="json")
+                if response.status_code != 200:
+                    error = f"HTTP {response.status_code}"
+                elif response.streaming:
+                    for chunk in response.streaming_content:
+                        for line in chunk.decode("utf-8").splitlines():
+                            if not line.startswith("data: "):
+                                continue
+                            event = json.loads(line[len("data: "):])
+                            if event.get("type") == "token":
+                                first_token = first_token or time.perf_counter()
+                                reply += str(event.get("content") or "")
+                            elif event.get("type") == "error":
+                                error = str(event.get("error") or event.get("content"))
+                response.close()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+
+            results.append(TurnResult(
+                latency=time.perf_counter() - started,
+                ttft=first_token - started if first_token else None,
+                error=error,
+            ))
+            history += [
+                {"role": "user", "content": turn["message"]},
+                {"role": "assistant", "content": reply},
+            ]
+        return results
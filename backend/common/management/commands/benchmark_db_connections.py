@@ -0,0 +1,137 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from common.services.db_pool import get_sqlalchemy_engine
+from common.utils.lazy_import import lazy_import
+
+sqlalchemy = lazy_import("sqlalchemy")
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the database connection overhead of a request: a new connection per "
+        "request (the old behaviour) against persistent connections, the psycopg pool "
+        "when DB_POOL_ENABLED, and the shared SQLAlchemy engine of the PGVector store"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Simulated requests per mode")
+        parser.add_argument("--queries", type=int, default=3, help="SELECT 1 queries per request")
+        parser.add_argument("--threads", type=int, default=4, help="Concurrent request threads (gunicorn --threads)")
+        parser.add_argument("--database", default="default", help="Database alias")
+
+    def _request(self, alias, queries):
+        """One request as Django runs it: the request signals close stale connections"""
+        started = time.perf_counter()
+        request_started.send(sender=self.__class__)
+        try:
+            with connections[alias].cursor() as cursor:
+                for _ in range(queries):
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+        finally:
+            request_finished.send(sender=self.__class__)
+        return (time.perf_counter() - started) * 1000
+
+    def _engine_request(self, engine, queries):
+        started = time.perf_counter()
+        with engine.connect() as connection:
+            for _ in range(queries):
+                connection.exec_driver_sql("SELECT 1").fetchone()
+        return (time.perf_counter() - started) * 1000
+
+    def _run(self, name, request, options, engine=None):
+        opened = []
+        lock = threading.Lock()
+
+        def count(*args, **kwargs):
+            with lock:
+                opened.append(1)
+
+        def worker(count_requests):
+            try:
+                return [request() for _ in range(count_requests)]
+            finally:
+                connections.close_all()
+
+        threads = max(options["threads"], 1)
+        share, extra = divmod(options["requests"], threads)
+        if engine is not None:
+            sqlalchemy.event.listen(engine, "connect", count)
+        else:
+            connection_created.connect(count, weak=False)
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                batches = executor.map(worker, [share + (i < extra) for i in range(threads)])
+                latencies = [latency for batch in batches for latency in batch]
+        finally:
+            if engine is not None:
+                sqlalchemy.event.remove(engine, "connect", count)
+            else:
+                connection_created.disconnect(count)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{name:<34} {len(latencies) / elapsed:>8.0f} "
+            f"{sum(latencies) / max(len(latencies), 1):>8.2f} {_percentile(latencies, 0.5):>8.2f} "
+            f"{_percentile(latencies, 0.95):>8.2f} {len(opened):>8}"
+        )
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        settings_dict = connections[alias].settings_dict
+        configured = {
+            "CONN_MAX_AGE": settings_dict["CONN_MAX_AGE"],
+            "OPTIONS": dict(settings_dict["OPTIONS"]),
+        }
+
+        def configure(max_age, pool):
+            connections.close_all()
+            settings_dict["CONN_MAX_AGE"] = max_age
+            settings_dict["OPTIONS"] = dict(configured["OPTIONS"])
+            if not pool:
+                settings_dict["OPTIONS"].pop("pool", None)
+
+        self.stdout.write(
+            f"{options['requests']} requests x {options['queries']} queries, {options['threads']} threads"
+        )
+        self.stdout.write(
+            f"{'mode':<34} {'req/s':>8} {'mean ms':>8} {'p50':>8} {'p95':>8} {'connects':>8}"
+        )
+        request = lambda: self._request(alias, options["queries"])
+        try:
+            configure(0, pool=False)
+            self._run("new connection per request", request, options)
+
+            max_age = settings.DB_CONN_MAX_AGE or 60
+            configure(max_age, pool=False)
+            self._run(f"persistent (CONN_MAX_AGE={max_age})", request, options)
+
+            if "pool" in configured["OPTIONS"]:
+                configure(0, pool=True)
+                self._run("psycopg pool (connects = checkouts)", request, options)
+        finally:
+            configure(configured["CONN_MAX_AGE"], pool=True)
+
+        engine = get_sqlalchemy_engine(alias)
+        self._run(
+            f"sqlalchemy engine ({type(engine.pool).__name__})",
+            lambda: self._engine_request(engine, options["queries"]),
+            options,
+            engine=engine,
+        )
@@ -0,0 +1,78 @@
+import json
+import logging
+import pathlib
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from order_bot.agents.product_keywords import (
+    COLOR_KEYWORDS,
+    PRODUCT_MATCHER,
+    PRODUCT_TYPE_KEYWORDS,
+)
+from restaurant_booking.agents.time_processor import (
+    RELATIVE_DAYS,
+    TIME_MATCHER,
+    WEEKDAYS,
+)
+
+logger = logging.getLogger(__name__)
+
+CORPUS_PATH = pathlib.Path(__file__).resolve().parent.parent / "assets" / "vietnamese_messages.json"
+
+
+def _legacy_scan(text, keyword_maps):
+    """Per-keyword substring scan used before the compiled matcher (baseline only)."""
+    text = text.lower()
+    result = {}
+    for slot, keywords in keyword_maps.items():
+        for keyword, value in keywords.items():
+            if keyword in text:
+                result[slot] = value
+                break
+    return result
+
+
+class Command(BaseCommand):
+    help = "Check the Vietnamese keyword matchers against the message corpus and benchmark them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--number", type=int, default=2000, help="Iterations per benchmark")
+
+    def _check_corpus(self, name, matcher, cases):
+        failures = 0
+        for text, expected in cases:
+            actual = matcher.extract(text)
+            if actual != expected:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"  [{name}] {text!r}: expected {expected}, got {actual}"))
+        self.stdout.write(f"  [{name}] {len(cases) - failures}/{len(cases)} messages OK")
+        return failures
+
+    def _benchmark(self, name, func, texts, number):
+        seconds = timeit.timeit(lambda: [func(text) for text in texts], number=number)
+        per_message = seconds / (number * len(texts)) * 1_000_000
+        self.stdout.write(f"  {name:<32} {per_message:8.2f} µs/message")
+
+    def handle(self, *args, **options):
+        with CORPUS_PATH.open(encoding="utf-8") as f:
+            corpus = json.load(f)
+
+        self.stdout.write("Correctness corpus:")
+        failures = self._check_corpus("time", TIME_MATCHER, corpus["time"])
+        failures += self._check_corpus("product", PRODUCT_MATCHER, corpus["product"])
+
+        number = options["number"]
+        time_texts = [text for text, _ in corpus["time"]]
+        product_texts = [text for text, _ in corpus["product"]]
+        legacy_time = {"relative_day": RELATIVE_DAYS, "weekday": WEEKDAYS}
+        legacy_product = {"product_type": PRODUCT_TYPE_KEYWORDS, "color": COLOR_KEYWORDS}
+
+        self.stdout.write(f"Microbenchmark ({number} iterations):")
+        self._benchmark("time / legacy substring scan", lambda t: _legacy_scan(t, legacy_time), time_texts, number)
+        self._benchmark("time / compiled matcher", TIME_MATCHER.extract, time_texts, number)
+        self._benchmark("product / legacy substring scan", lambda t: _legacy_scan(t, legacy_product), product_texts, number)
+        self._benchmark("product / compiled matcher", PRODUCT_MATCHER.extract, product_texts, number)
+
+        if failures:
+            raise CommandError(f"{failures} corpus message(s) did not match the expected slots")
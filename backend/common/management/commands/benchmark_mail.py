@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from common.constant.mail import MailTemplateEnum
+from common.services.mail_service import MailService
+
+
+class SinkHandler:
+    """aiosmtpd handler that counts messages and can delay each EHLO (connection setup)"""
+
+    def __init__(self, connect_latency: float):
+        self.connect_latency = connect_latency
+        self.messages = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        with self._lock:
+            self.connections += 1
+        if self.connect_latency:
+            await asyncio.sleep(self.connect_latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.messages += 1
+        return "250 Message accepted for delivery"
+
+
+class Command(BaseCommand):
+    help = (
+        "Send templated mail to a local aiosmtpd sink and compare messages per second: "
+        "a new SMTP connection per message, one reused connection, and bulk send_messages batches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=200, help="Messages per mode")
+        parser.add_argument("--batch-size", type=int, default=100, help="Messages per send_messages call")
+        parser.add_argument(
+            "--connect-latency-ms", type=float, default=50,
+            help="Delay added to every connection setup, standing in for TLS handshake and login",
+        )
+        parser.add_argument("--port", type=int, default=8025, help="Sink port")
+
+    def _mode(self, name, handler, send, count):
+        service = MailService()
+        messages_before, connections_before = handler.messages, handler.connections
+        started = time.perf_counter()
+        send(service)
+        elapsed = time.perf_counter() - started
+        service.close_connection()
+
+        received = handler.messages - messages_before
+        self.stdout.write(
+            f"{name:<28} {count / elapsed:>9.1f} {elapsed:>9.2f} "
+            f"{handler.connections - connections_before:>12} {received:>9}"
+        )
+        if received != count:
+            raise CommandError(f"{name}: the sink received {received} of {count} messages")
+
+    def handle(self, *args, **options):
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            raise CommandError("aiosmtpd is required: pip install -r requirements-dev.txt")
+
+        count = options["messages"]
+        handler = SinkHandler(options["connect_latency_ms"] / 1000)
+        controller = Controller(handler, hostname="127.0.0.1", port=options["port"])
+        controller.start()
+
+        email_type = MailTemplateEnum.VERIFY_EMAIL
+        recipients = [
+            (f"user{index}@example.com", {"callback_url": f"https://example.com/verify-email?token={index}"})
+            for index in range(count)
+        ]
+
+        def one_by_one(service):
+            for recipient, context in recipients:
+                service.send_email_template_by_type(email_type, [recipient], context)
+
+        mail_settings = {
+            "EMAIL_BACKEND": "django.core.mail.backends.smtp.EmailBackend",
+            "EMAIL_HOST": "127.0.0.1",
+            "EMAIL_PORT": options["port"],
+            "EMAIL_HOST_USER": "",
+            "EMAIL_HOST_PASSWORD": "",
+            "EMAIL_USE_TLS": False,
+            "EMAIL_USE_SSL": False,
+            "DEFAULT_FROM_EMAIL": "benchmark@example.com",
+        }
+        self.stdout.write(
+            f"{count} messages, {options['connect_latency_ms']:.0f}ms per connection setup"
+        )
+        self.stdout.write(f"{'mode':<28} {'msg/s':>9} {'seconds':>9} {'connections':>12} {'received':>9}")
+        try:
+            with override_settings(**mail_settings, MAIL_CONNECTION_MAX_AGE=0):
+                self._mode("connection per message", handler, one_by_one, count)
+            with override_settings(**mail_settings, MAIL_CONNECTION_MAX_AGE=3600):
+                self._mode("reused connection", handler, one_by_one, count)
+                self._mode(
+                    f"bulk (batches of {options['batch_size']})",
+                    handler,
+                    lambda service: service.send_bulk_email_template_by_type(
+                        email_type, recipients, batch_size=options["batch_size"]
+                    ),
+                    count,
+                )
+        finally:
+            controller.stop()
@@ -0,0 +1,64 @@
+from queue import Queue
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+
+def _token_counter():
+    """tiktoken count for the agent model, or ~4 characters per token without tiktoken"""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text)), "tiktoken o200k_base"
+    except Exception:
+        return lambda text: (len(text) + 3) // 4, "estimated (chars / 4)"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the size of list-style PSCD tool results sent to the LLM with every row "
+        "(uncapped) and with the AGENT_TOOL_* page cap, against the current (seeded) database. "
+        "Tool results are re-sent on every later agent iteration, so the difference is paid per iteration"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start-date", default="2000-01-01", help="Range of get_requests_in_date_range")
+        parser.add_argument("--end-date", default="2100-01-01")
+        parser.add_argument("--format", choices=["table", "json"], help="AGENT_TOOL_OUTPUT_FORMAT to measure")
+
+    def handle(self, *args, **options):
+        from agents.services.pscd_projects import PSCDProjectsService
+        from agents.services.pscd_requests import PSCDRequestsService
+        from agents.services.pscd_users import PSCDUsersService
+
+        count_tokens, counter_name = _token_counter()
+        queue = Queue()
+        projects = PSCDProjectsService(queue)
+        users = PSCDUsersService(queue)
+        requests = PSCDRequestsService(queue)
+        calls = [
+            ("get_all_projects", projects._get_all_projects),
+            ("get_all_users", users._get_all_users),
+            (
+                "get_requests_in_date_range",
+                lambda: requests._get_requests_in_date_range(options["start_date"], options["end_date"]),
+            ),
+        ]
+        overrides = {"AGENT_TOOL_OUTPUT_FORMAT": options["format"]} if options["format"] else {}
+
+        self.stdout.write(f"Tokens: {counter_name}")
+        self.stdout.write(f"{'tool':<28} {'uncapped':>10} {'capped':>10} {'saved':>8}")
+        totals = [0, 0]
+        for name, call in calls:
+            with override_settings(AGENT_TOOL_MAX_ROWS=10**9, AGENT_TOOL_MAX_CELL_CHARS=10**6, **overrides):
+                uncapped = count_tokens(call())
+            with override_settings(**overrides):
+                capped = count_tokens(call())
+            totals[0] += uncapped
+            totals[1] += capped
+            saved = 1 - capped / uncapped if uncapped else 0
+            self.stdout.write(f"{name:<28} {uncapped:>10} {capped:>10} {saved:>7.0%}")
+
+        saved = 1 - totals[1] / totals[0] if totals[0] else 0
+        self.stdout.write(f"{'total':<28} {totals[0]:>10} {totals[1]:>10} {saved:>7.0%}")
@@ -0,0 +1,112 @@
+import os
+import re
+import resource
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common.utils.lazy_import import HEAVY_MODULES
+
+# What a gunicorn worker does before serving: build the WSGI app, then resolve URLs
+BOOT_SCRIPT = (
+    "from django.core.wsgi import get_wsgi_application\n"
+    "application = get_wsgi_application()\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+# "import time:       123 |       4567 |   package.module"
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_import_time(stderr: str) -> List[ImportRecord]:
+    records = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            # One separator space, then two more per nesting level
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot a worker in a fresh interpreter with -X importtime and fail when the import "
+        "time exceeds the budget or a heavy dependency is imported before the first request"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--budget-ms", type=float,
+            help="Maximum total import time (default IMPORT_TIME_BUDGET_MS)",
+        )
+        parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to list")
+        parser.add_argument(
+            "--allow-heavy", action="store_true", help="Only enforce the time budget, not HEAVY_MODULES"
+        )
+
+    def handle(self, *args, **options):
+        budget_ms = options["budget_ms"] or settings.IMPORT_TIME_BUDGET_MS
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "api_chat_bot.settings"),
+            "PYTHONDONTWRITEBYTECODE": "1",
+        }
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        records = parse_import_time(result.stderr)
+        if result.returncode != 0:
+            errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+            raise CommandError("Worker boot failed:\n" + "\n".join(errors[-20:]))
+
+        top_level = [record for record in records if record.depth == 0]
+        total_ms = sum(record.cumulative_us for record in top_level) / 1000
+        # ru_maxrss is in KB on Linux
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+        self.stdout.write(f"{'cumulative ms':>13} {'self ms':>8}  module")
+        for record in sorted(top_level, key=lambda record: record.cumulative_us, reverse=True)[: options["top"]]:
+            self.stdout.write(
+                f"{record.cumulative_us / 1000:>13.1f} {record.self_us / 1000:>8.1f}  {record.module}"
+            )
+        self.stdout.write("")
+        self.stdout.write(
+            f"{len(records)} modules, {total_ms:.0f}ms import time (budget {budget_ms:.0f}ms), "
+            f"peak RSS {peak_rss_mb:.0f}MB"
+        )
+
+        failures = []
+        if total_ms > budget_ms:
+            failures.append(f"import time {total_ms:.0f}ms exceeds the {budget_ms:.0f}ms budget")
+        if not options["allow_heavy"]:
+            imported = {record.module for record in records}
+            heavy = sorted(
+                name for name in HEAVY_MODULES
+                if any(module == name or module.startswith(name + ".") for module in imported)
+            )
+            if heavy:
+                failures.append(
+                    f"heavy modules imported at boot: {', '.join(heavy)} "
+                    "(defer them with common.utils.lazy_import)"
+                )
+        if failures:
+            raise CommandError("; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Worker cold start is within budget"))
@@ -0,0 +1,122 @@
+import io
+import os
+import time
+import uuid
+from contextlib import nullcontext
+
+import boto3
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common.aws.s3 import MB, S3Storage
+
+
+class PatternStream(io.RawIOBase):
+    """Readable stream of `size` bytes generated on the fly (never held in memory)"""
+
+    def __init__(self, size: int):
+        self.remaining = size
+        self.block = os.urandom(MB)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = min(len(buffer), self.remaining, len(self.block))
+        buffer[:count] = self.block[:count]
+        self.remaining -= count
+        return count
+
+
+class CountingSink(io.RawIOBase):
+    def __init__(self):
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+
+class Command(BaseCommand):
+    help = (
+        "Exercise S3Storage end to end: multipart upload and streamed download, parallel "
+        "copies, paginated listing past 1,000 keys and batch deletes. Runs against moto "
+        "with --moto, otherwise against the configured bucket under a throwaway prefix"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--moto", action="store_true", help="Use an in-process moto S3")
+        parser.add_argument("--size-mb", type=int, default=32, help="Size of the multipart test object")
+        parser.add_argument("--keys", type=int, default=2500, help="Objects for the listing/delete check")
+
+    def _step(self, name, func):
+        started = time.perf_counter()
+        result = func()
+        self.stdout.write(f"  {name:<48} {time.perf_counter() - started:>7.2f}s")
+        return result
+
+    def handle(self, *args, **options):
+        if options["moto"]:
+            try:
+                from moto import mock_aws
+            except ImportError:
+                raise CommandError("moto is required for --moto: pip install -r requirements-dev.txt")
+            context = mock_aws()
+        else:
+            context = nullcontext()
+
+        with context:
+            client = boto3.client(
+                "s3",
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID or "testing",
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or "testing",
+                region_name=settings.AWS_S3_REGION_NAME or "us-east-1",
+                endpoint_url=None if options["moto"] else settings.AWS_S3_ENDPOINT_URL,
+            )
+            storage = S3Storage(s3_client=client)
+            if options["moto"]:
+                storage.bucket_name = storage.bucket_name or "s3-storage-check"
+                client.create_bucket(Bucket=storage.bucket_name)
+            self._check(storage, f"s3-check/{uuid.uuid4().hex}", options)
+
+    def _check(self, storage: S3Storage, prefix: str, options):
+        size = options["size_mb"] * MB
+        keys = options["keys"]
+        self.stdout.write(
+            f"Bucket {storage.bucket_name}, prefix {prefix}: {options['size_mb']}MB object, {keys} keys"
+        )
+        try:
+            self._step(
+                f"multipart upload ({options['size_mb']}MB)",
+                lambda: storage.upload_file(io.BufferedReader(PatternStream(size)), prefix, "large.bin"),
+            )
+            etag = storage.s3_client.head_object(Bucket=storage.bucket_name, Key=f"{prefix}/large.bin")["ETag"]
+            if size > storage.transfer_config.multipart_threshold and "-" not in etag:
+                raise CommandError(f"Expected a multipart ETag, got {etag}")
+            if storage.get_size(f"{prefix}/large.bin") != size:
+                raise CommandError("Uploaded object has the wrong size")
+
+            sink = self._step("streamed download", lambda: storage.download_fileobj(f"{prefix}/large.bin", CountingSink()))
+            if sink.size != size:
+                raise CommandError(f"Downloaded {sink.size} bytes instead of {size}")
+
+            storage.upload_file(io.BytesIO(b"x"), prefix, "seed.txt")
+            pairs = [(f"{prefix}/seed.txt", f"{prefix}/many/{index:05d}.txt") for index in range(keys)]
+            self._step(f"parallel copy x{keys}", lambda: storage.copy_many(pairs))
+
+            listed = self._step("paginated listing", lambda: storage.list_files(f"{prefix}/many/"))
+            if len(listed) != keys:
+                raise CommandError(f"Listed {len(listed)} keys instead of {keys}")
+        finally:
+            errors = self._step(
+                "batch delete", lambda: storage.delete_files(obj["Key"] for obj in storage.iter_files(prefix))
+            )
+
+        if errors:
+            raise CommandError(f"{len(errors)} keys could not be deleted")
+        if storage.list_files(prefix):
+            raise CommandError("Objects left after the batch delete")
+        self.stdout.write(self.style.SUCCESS("S3Storage checks passed"))
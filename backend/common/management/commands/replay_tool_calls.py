@@ -0,0 +1,144 @@
+import json
+from collections import defaultdict
+from queue import Queue
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from common.utils.tool_tracing import capture_tool_traces
+
+
+def build_tool_registry():
+    """name -> traced tool, for every tool the agents can call"""
+    from agents.services.pscd_logtime import PSCDLogTimeService
+    from agents.services.pscd_projects import PSCDProjectsService
+    from agents.services.pscd_requests import PSCDRequestsService
+    from agents.services.pscd_users import PSCDUsersService
+    from order_bot.agents.orders import OrdersService
+    from order_bot.agents.products import ProductsService
+    from restaurant_booking.agents.tables import TablesService
+
+    services = [
+        PSCDProjectsService(Queue()),
+        PSCDUsersService(),
+        PSCDRequestsService(),
+        PSCDLogTimeService(),
+        TablesService(),
+        ProductsService(),
+        OrdersService(),
+    ]
+    return {tool.name: tool for service in services for tool in service.create_tools()}
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay tool calls recorded in TOOL_TRACE_FILE against the current (seeded) "
+        "database and print a profile ranked by total wall time"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("trace_file", nargs="?", help="JSON lines written by the tool tracer")
+        parser.add_argument("--repeat", type=int, default=1, help="Replay every call N times")
+        parser.add_argument("--tool", action="append", help="Only replay these tools")
+        parser.add_argument("--limit", type=int, help="Replay at most N recorded calls")
+        parser.add_argument("--top", type=int, default=20, help="Rows in the ranking")
+        parser.add_argument(
+            "--commit", action="store_true", help="Keep writes made by the tools (rolled back by default)"
+        )
+
+    def handle(self, *args, **options):
+        trace_file = options["trace_file"] or getattr(settings, "TOOL_TRACE_FILE", None)
+        if not trace_file:
+            raise CommandError("No trace file given and TOOL_TRACE_FILE is not set")
+
+        calls = self._load_calls(trace_file, options["tool"], options["limit"])
+        if not calls:
+            raise CommandError(f"No tool calls to replay in {trace_file}")
+
+        registry = build_tool_registry()
+        missing = defaultdict(int)
+
+        with capture_tool_traces() as collector:
+            for _ in range(options["repeat"]):
+                for call in calls:
+                    tool = registry.get(call["tool"])
+                    if tool is None:
+                        missing[call["tool"]] += 1
+                        continue
+                    self._replay(tool, call, options["commit"])
+
+        self._print_profile(collector.traces, options["top"])
+        for name, count in missing.items():
+            self.stdout.write(self.style.WARNING(f"Skipped {count} calls of unknown tool {name}"))
+
+    def _load_calls(self, path, tools, limit):
+        calls = []
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                call = json.loads(line)
+                if tools and call["tool"] not in tools:
+                    continue
+                calls.append(call)
+                if limit and len(calls) >= limit:
+                    break
+        return calls
+
+    def _replay(self, tool, call, commit):
+        with transaction.atomic():
+            try:
+                tool.func(*call.get("args", []), **call.get("kwargs", {}))
+            except Exception:
+                # Already recorded on the trace
+                pass
+            if not commit:
+                transaction.set_rollback(True)
+
+    def _print_profile(self, traces, top):
+        by_tool = defaultdict(list)
+        for trace in traces:
+            by_tool[trace.tool].append(trace)
+
+        rows = []
+        for name, tool_traces in by_tool.items():
+            wall = [trace.wall_ms for trace in tool_traces]
+            slowest = max(tool_traces, key=lambda trace: trace.slowest_sql_ms)
+            rows.append({
+                "tool": name,
+                "calls": len(tool_traces),
+                "total_ms": sum(wall),
+                "p50_ms": _percentile(wall, 0.5),
+                "p95_ms": _percentile(wall, 0.95),
+                "max_ms": max(wall),
+                "sql": sum(trace.sql_count for trace in tool_traces) / len(tool_traces),
+                "sql_ms": sum(trace.sql_ms for trace in tool_traces) / len(tool_traces),
+                "chars": sum(trace.payload_chars for trace in tool_traces) / len(tool_traces),
+                "errors": sum(1 for trace in tool_traces if trace.error),
+                "slowest_sql": slowest.slowest_sql,
+                "slowest_sql_ms": slowest.slowest_sql_ms,
+            })
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+
+        self.stdout.write(
+            f"{'tool':<45} {'calls':>6} {'total ms':>10} {'p50':>8} {'p95':>8} {'max':>8} "
+            f"{'sql/call':>8} {'sql ms':>8} {'chars':>8} {'errors':>6}"
+        )
+        for row in rows[:top]:
+            self.stdout.write(
+                f"{row['tool']:<45} {row['calls']:>6} {row['total_ms']:>10.1f} {row['p50_ms']:>8.1f} "
+                f"{row['p95_ms']:>8.1f} {row['max_ms']:>8.1f} {row['sql']:>8.1f} {row['sql_ms']:>8.1f} "
+                f"{row['chars']:>8.0f} {row['errors']:>6}"
+            )
+
+        self.stdout.write("")
+        self.stdout.write(self.style.MIGRATE_HEADING("Slowest query per tool"))
+        for row in rows[:top]:
+            if row["slowest_sql"]:
+                self.stdout.write(f"{row['tool']} ({row['slowest_sql_ms']:.1f}ms): {row['slowest_sql']}")
@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from common.services.fake_openai_server import FakeOpenAIServer
+from common.management.commands.benchmark_chat_endpoints import SCENARIOS_PATH, scripted_tool_calls
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the fake OpenAI API so a running server (gunicorn) can be benchmarked with "
+        "OPENAI_BASE_URL=http://<host>:<port>/v1"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8090)
+        parser.add_argument("--first-token-ms", type=float, default=300)
+        parser.add_argument("--tokens-per-second", type=float, default=50)
+        parser.add_argument("--scenarios", default=str(SCENARIOS_PATH), help="Tool calls to script")
+
+    def handle(self, *args, **options):
+        with open(options["scenarios"], encoding="utf-8") as file:
+            scenarios = json.load(file)
+        server = FakeOpenAIServer(
+            host=options["host"],
+            port=options["port"],
+            first_token_latency=options["first_token_ms"] / 1000,
+            tokens_per_second=options["tokens_per_second"],
+            tool_calls=scripted_tool_calls(scenarios),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Fake OpenAI API on {server.base_url}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,67 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from common.services.db_pool import release_db_connections
+from common.services.task_queue import TASKS, TaskWorker, autodiscover_tasks, start_scheduler
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database task queue (mail, Sheets export, embeddings)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queues", default="default,embeddings", help="Comma separated queues to take jobs from"
+        )
+        parser.add_argument("--concurrency", type=int, default=2, help="Worker threads")
+        parser.add_argument("--interval", type=float, default=None, help="Seconds between polls")
+        parser.add_argument("--batch-size", type=int, default=None, help="Jobs claimed per poll")
+        parser.add_argument("--once", action="store_true", help="Run one batch and exit")
+        parser.add_argument(
+            "--no-scheduler", action="store_true", help="Do not enqueue the scheduled (periodic) tasks"
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_tasks()
+        queues = [queue.strip() for queue in options["queues"].split(",") if queue.strip()]
+        self.stdout.write(f"Tasks: {', '.join(sorted(TASKS))}")
+
+        def make_worker():
+            return TaskWorker(queues=queues, batch_size=options["batch_size"], interval=options["interval"])
+
+        if options["once"]:
+            ran = make_worker().run_once()
+            self.stdout.write(self.style.SUCCESS(f"Ran {ran} jobs"))
+            return
+
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop_event.set())
+        scheduler = None if options["no_scheduler"] else start_scheduler()
+
+        threads = [
+            threading.Thread(
+                target=release_db_connections(make_worker().run_forever),
+                args=(stop_event,),
+                name=f"task-worker-{index}",
+                daemon=True,
+            )
+            for index in range(max(options["concurrency"], 1))
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                stop_event.wait(1)
+                if stop_event.is_set():
+                    break
+        except KeyboardInterrupt:
+            stop_event.set()
+        finally:
+            stop_event.set()
+            if scheduler is not None:
+                scheduler.shutdown(wait=False)
+            for thread in threads:
+                thread.join()
+            self.stdout.write("Stopped")
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Ngày tạo")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Ngày cập nhật")),
+                ("name", models.CharField(max_length=100, verbose_name="Tác vụ")),
+                ("payload", models.JSONField(default=dict, verbose_name="Tham số")),
+                ("queue", models.CharField(default="default", max_length=50, verbose_name="Hàng đợi")),
+                ("priority", models.SmallIntegerField(default=0, verbose_name="Độ ưu tiên")),
+                ("unique_key", models.CharField(blank=True, max_length=200, null=True, verbose_name="Khóa duy nhất")),
+                ("status", models.CharField(choices=[("PENDING", "Chờ xử lý"), ("RUNNING", "Đang chạy"), ("DONE", "Hoàn thành"), ("FAILED", "Thất bại")], default="PENDING", max_length=20, verbose_name="Trạng thái")),
+                ("run_at", models.DateTimeField(default=django.utils.timezone.now, verbose_name="Thời gian chạy")),
+                ("attempts", models.PositiveIntegerField(default=0, verbose_name="Số lần thử")),
+                ("max_attempts", models.PositiveIntegerField(default=5, verbose_name="Số lần thử tối đa")),
+                ("last_error", models.TextField(blank=True, null=True, verbose_name="Lỗi gần nhất")),
+                ("locked_by", models.CharField(blank=True, max_length=100, null=True, verbose_name="Worker")),
+                ("locked_at", models.DateTimeField(blank=True, null=True, verbose_name="Thời gian nhận")),
+                ("finished_at", models.DateTimeField(blank=True, null=True, verbose_name="Thời gian hoàn thành")),
+            ],
+            options={
+                "verbose_name": "Job",
+                "verbose_name_plural": "Jobs",
+                "db_table": "common_jobs",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(condition=models.Q(("status", "PENDING")), fields=["queue", "-priority", "run_at"], name="common_job_due_idx"),
+                    models.Index(fields=["status", "locked_at"], name="common_job_status_idx"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(condition=models.Q(("status__in", ["PENDING", "RUNNING"])), fields=("unique_key",), name="common_job_unique_active_key"),
+                ],
+            },
+        ),
+    ]
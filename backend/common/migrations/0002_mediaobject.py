@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaObject",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Ngày tạo")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Ngày cập nhật")),
+                ("key", models.CharField(max_length=255, unique=True, verbose_name="Khóa lưu trữ")),
+                ("digest", models.CharField(db_index=True, max_length=64, verbose_name="SHA-256")),
+                ("size", models.BigIntegerField(default=0, verbose_name="Kích thước (byte)")),
+                ("content_type", models.CharField(blank=True, default="", max_length=100, verbose_name="Kiểu nội dung")),
+                ("ref_count", models.IntegerField(default=0, verbose_name="Số tham chiếu")),
+                ("last_used_at", models.DateTimeField(default=django.utils.timezone.now, verbose_name="Lần dùng gần nhất")),
+            ],
+            options={
+                "verbose_name": "Media Object",
+                "verbose_name_plural": "Media Objects",
+                "db_table": "common_media_objects",
+                "ordering": ["id"],
+                "indexes": [models.Index(fields=["ref_count", "last_used_at"], name="common_media_orphan_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,4 @@
+from .job import Job
+from .media import MediaObject
+
+__all__ = ["Job", "MediaObject"]
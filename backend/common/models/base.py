@@ -161,6 +161,8 @@ class FileBaseModel(models.Model):
             super(self.__class__, self).save(*args, **kwargs)
             kwargs = {}
 
+        # Temp files to move, grouped by storage and copied in parallel
+        moves = {}
         for field in self.__class__._meta.get_fields():
             if isinstance(field, models.FileField) or isinstance(
                 field, models.ImageField
@@ -178,9 +180,12 @@ class FileBaseModel(models.Model):
                     )
                     # step move file
                     if FolderS3StorageEnum.TEMP in file_taken.name:
-                        s3_storage.copy(from_path=from_path, to_path=to_path)
+                        moves.setdefault(s3_storage, []).append((from_path, to_path))
                     setattr(self, field.name, to_path)
 
+        for s3_storage, pairs in moves.items():
+            s3_storage.copy_many(pairs)
+
         super(self.__class__, self).save(*args, **kwargs)
 
 
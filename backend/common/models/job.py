@@ -0,0 +1,113 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from common.models.base import DateTimeModel
+
+
+class Job(DateTimeModel):
+    """
+    Background job of the database task queue (common.services.task_queue).
+
+    Request handlers insert a row instead of doing slow work inline; the
+    `run_task_worker` processes claim due rows with SELECT ... FOR UPDATE
+    SKIP LOCKED, highest priority first, and retry failures with backoff.
+    """
+
+    class JobStatus(models.TextChoices):
+        PENDING = "PENDING", "Chờ xử lý"
+        RUNNING = "RUNNING", "Đang chạy"
+        DONE = "DONE", "Hoàn thành"
+        FAILED = "FAILED", "Thất bại"
+
+    # Registered task name, e.g. "common.send_email_template"
+    name = models.CharField(
+        max_length=100,
+        verbose_name="Tác vụ"
+    )
+    payload = models.JSONField(
+        default=dict,
+        verbose_name="Tham số"
+    )
+    queue = models.CharField(
+        max_length=50,
+        default="default",
+        verbose_name="Hàng đợi"
+    )
+    # Higher runs first
+    priority = models.SmallIntegerField(
+        default=0,
+        verbose_name="Độ ưu tiên"
+    )
+    # Jobs with the same key are not enqueued twice while one is pending or running
+    unique_key = models.CharField(
+        max_length=200,
+        blank=True,
+        null=True,
+        verbose_name="Khóa duy nhất"
+    )
+
+    # Delivery state
+    status = models.CharField(
+        max_length=20,
+        choices=JobStatus.choices,
+        default=JobStatus.PENDING,
+        verbose_name="Trạng thái"
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Thời gian chạy"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Số lần thử"
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=5,
+        verbose_name="Số lần thử tối đa"
+    )
+    last_error = models.TextField(
+        blank=True,
+        null=True,
+        verbose_name="Lỗi gần nhất"
+    )
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        verbose_name="Worker"
+    )
+    locked_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Thời gian nhận"
+    )
+    finished_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Thời gian hoàn thành"
+    )
+
+    class Meta:
+        db_table = "common_jobs"
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        ordering = ["id"]
+        indexes = [
+            # Only pending rows are scanned by the workers
+            models.Index(
+                fields=["queue", "-priority", "run_at"],
+                condition=Q(status="PENDING"),
+                name="common_job_due_idx",
+            ),
+            models.Index(fields=["status", "locked_at"], name="common_job_status_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["unique_key"],
+                condition=Q(status__in=["PENDING", "RUNNING"]),
+                name="common_job_unique_active_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} {self.name} ({self.status})"
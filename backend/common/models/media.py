@@ -0,0 +1,56 @@
+from django.db import models
+from django.utils import timezone
+from common.models.base import DateTimeModel
+
+
+class MediaObject(DateTimeModel):
+    """
+    A stored media file, addressed by the SHA-256 of its bytes.
+
+    Identical content is stored once (common.services.media_store). Records
+    that show a file retain it (`ref_count`); the purge job drops files
+    nobody references once they have been unused for the grace period.
+    """
+
+    # Storage key, e.g. "cas/ab/cd/abcd....png"
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name="Khóa lưu trữ"
+    )
+    digest = models.CharField(
+        max_length=64,
+        db_index=True,
+        verbose_name="SHA-256"
+    )
+    size = models.BigIntegerField(
+        default=0,
+        verbose_name="Kích thước (byte)"
+    )
+    content_type = models.CharField(
+        max_length=100,
+        blank=True,
+        default="",
+        verbose_name="Kiểu nội dung"
+    )
+    ref_count = models.IntegerField(
+        default=0,
+        verbose_name="Số tham chiếu"
+    )
+    # Last time the content was stored again (dedup hit); protects fresh unreferenced media
+    last_used_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Lần dùng gần nhất"
+    )
+
+    class Meta:
+        db_table = "common_media_objects"
+        verbose_name = "Media Object"
+        verbose_name_plural = "Media Objects"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["ref_count", "last_used_at"], name="common_media_orphan_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.ref_count} refs)"
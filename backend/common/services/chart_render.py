@@ -0,0 +1,84 @@
+"""
+Chart drawing - runs in the chart worker processes
+
+The workers import this module without setting Django up (forkserver/spawn
+start a fresh interpreter), so it must not import Django, models or
+anything that does: standard library and matplotlib only.
+"""
+
+import hashlib
+import io
+import json
+from dataclasses import asdict, dataclass
+from typing import List
+
+CHART_KINDS = ("bar", "barh", "line", "pie")
+CHART_FORMATS = ("png", "svg")
+
+
+@dataclass
+class ChartSpec:
+    """Everything a chart is drawn from; its hash is the cache key"""
+
+    labels: List[str]
+    values: List[float]
+    title: str = ""
+    kind: str = "bar"
+    xlabel: str = ""
+    ylabel: str = ""
+    format: str = "png"
+    width: float = 8
+    height: float = 4
+    dpi: int = 100
+    color: str = "skyblue"
+    annotate: bool = True
+
+    def __post_init__(self):
+        if self.kind not in CHART_KINDS:
+            raise ValueError(f"Unsupported chart kind: {self.kind}")
+        if self.format not in CHART_FORMATS:
+            raise ValueError(f"Unsupported chart format: {self.format}")
+        if len(self.labels) != len(self.values):
+            raise ValueError("labels and values must have the same length")
+        self.labels = [str(label) for label in self.labels]
+        self.values = [float(value or 0) for value in self.values]
+
+    def cache_key(self) -> str:
+        payload = json.dumps(asdict(self), sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_chart(spec: dict) -> bytes:
+    """Draw a chart and return the encoded image (runs in the worker processes)"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    spec = ChartSpec(**spec)
+    figure = Figure(figsize=(spec.width, spec.height), dpi=spec.dpi)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+
+    if spec.kind == "pie":
+        axes.pie(spec.values, labels=spec.labels, autopct="%1.1f%%")
+        axes.axis("equal")
+    elif spec.kind == "line":
+        axes.plot(spec.labels, spec.values, marker="o", color=spec.color)
+    else:
+        draw = axes.bar if spec.kind == "bar" else axes.barh
+        bars = draw(spec.labels, spec.values, color=spec.color)
+        if spec.annotate:
+            axes.bar_label(bars, labels=[f"{value:g}" for value in spec.values], fontsize=8)
+        if spec.kind == "bar":
+            for label in axes.get_xticklabels():
+                label.set_rotation(30)
+                label.set_horizontalalignment("right")
+
+    if spec.kind != "pie":
+        axes.set_xlabel(spec.xlabel)
+        axes.set_ylabel(spec.ylabel)
+    axes.set_title(spec.title)
+    figure.tight_layout()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=spec.format)
+    return buffer.getvalue()
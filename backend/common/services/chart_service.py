@@ -0,0 +1,108 @@
+"""
+Chart rendering service
+
+Charts are drawn with matplotlib's object-oriented Figure API (no pyplot
+global state) in a small process pool, so rendering neither blocks nor
+races between gunicorn threads. The PNG/SVG bytes go to the
+content-addressed media store, and the media path is cached (shared cache)
+under a hash of the chart data: the same data is rendered once per
+CHART_CACHE_TTL and identical images are stored once. matplotlib is only
+imported by the worker processes, on the first chart; they only load
+common.services.chart_render, which does not need Django.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from typing import Optional
+
+from django.conf import settings
+
+from common.cache.tiered import get_tiered_cache
+from common.services.chart_render import ChartSpec, render_chart
+from common.services.storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+
+class ChartService:
+    """
+    Render charts in a process pool and store them content-addressed.
+
+    `render()` returns the image bytes; `render_to_storage()` returns the
+    media path ("cas/ab/cd/<sha256>.png"), rendering only on a cache miss.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[int] = None,
+    ):
+        self.workers = workers if workers is not None else getattr(settings, "CHART_RENDER_WORKERS", 2)
+        self.timeout = timeout if timeout is not None else getattr(settings, "CHART_RENDER_TIMEOUT", 30)
+        self.cache_size = cache_size if cache_size is not None else getattr(settings, "CHART_CACHE_SIZE", 256)
+        # Kept below MEDIA_ORPHAN_GRACE_HOURS so a cached path is never purged while served
+        self.cache_ttl = cache_ttl if cache_ttl is not None else getattr(settings, "CHART_CACHE_TTL", 3600)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # chart hash -> media path
+        self._paths = get_tiered_cache("charts", default_timeout=self.cache_ttl, l1_max_entries=self.cache_size)
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # Never fork the (threaded) web worker: start workers from a clean server process
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._pool
+
+    def render(self, spec: ChartSpec) -> bytes:
+        pool = self._get_pool()
+        if pool is None:
+            return render_chart(asdict(spec))
+        try:
+            return pool.submit(render_chart, asdict(spec)).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            logger.warning("Chart process pool is broken, rendering in-process")
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            return render_chart(asdict(spec))
+
+    def _store(self, spec: ChartSpec) -> str:
+        path = StorageService.save_bytes(self.render(spec), extension=spec.format)
+        if path is None:
+            raise OSError(f"Could not store chart {spec.cache_key()}")
+        return path
+
+    def render_to_storage(self, spec: ChartSpec) -> str:
+        return self._paths.get_or_set(spec.cache_key(), lambda: self._store(spec))
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Global instance
+_chart_service = None
+
+
+def get_chart_service():
+    """Get singleton instance of ChartService"""
+    global _chart_service
+
+    if _chart_service is None:
+        _chart_service = ChartService()
+
+    return _chart_service
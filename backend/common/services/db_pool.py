@@ -0,0 +1,196 @@
+"""
+Database connection management
+
+The ORM, raw DB-API users (Text2SQL's pandas queries) and SQLAlchemy users
+(the PGVector store) all get their connections here instead of opening
+their own:
+
+- By default every thread keeps one persistent Django connection
+  (CONN_MAX_AGE, verified by CONN_HEALTH_CHECKS before reuse) and
+  `get_raw_connection()` hands out that same connection.
+- With DB_POOL_ENABLED, Django's psycopg 3 pool backs the ORM and
+  `get_sqlalchemy_engine()` checks its connections out of the same pool.
+  Otherwise the engine keeps its own small pool with the same lifetime.
+
+Connections are per thread, so threads that run agents outside the request
+cycle must give theirs back with `release_db_connections` when they end.
+Pool occupancy is exported as the db_pool_* gauges.
+"""
+
+import functools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import Counter, Gauge, Histogram
+
+from common.utils.lazy_import import lazy_import
+
+sqlalchemy = lazy_import("sqlalchemy")
+
+logger = logging.getLogger(__name__)
+
+DB_CONNECTIONS_OPENED = Counter(
+    "db_connections_opened_total",
+    "Connections set up by Django (server connections, or pool checkouts with DB_POOL_ENABLED)",
+    ["alias"],
+)
+DB_CONNECT_LATENCY = Histogram(
+    "db_connect_latency_seconds",
+    "Time to get a usable connection (connect, health check or pool wait)",
+    ["pool"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10),
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Open connections held by the pool", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_in_use", "Connections currently checked out", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_WAITING = Gauge(
+    "db_pool_waiting", "Callers waiting for a free connection", ["pool"], multiprocess_mode="livesum"
+)
+
+
+@receiver(connection_created)
+def _count_connection(sender, connection, **kwargs):
+    DB_CONNECTIONS_OPENED.labels(connection.alias).inc()
+
+
+def get_django_pool(alias: str = DEFAULT_DB_ALIAS):
+    """The psycopg_pool.ConnectionPool behind the ORM, or None without DB_POOL_ENABLED"""
+    if not getattr(settings, "DB_POOL_ENABLED", False):
+        return None
+    return getattr(connections[alias], "pool", None)
+
+
+def get_raw_connection(alias: str = DEFAULT_DB_ALIAS):
+    """
+    DB-API connection of the calling thread's Django connection.
+
+    Reuses the persistent (or pooled) connection the ORM already holds
+    instead of opening a new one; it stays owned by Django, so callers must
+    not close it or keep it beyond the current request/thread.
+    """
+    connection = connections[alias]
+    started = time.perf_counter()
+    # What the ORM does before its first query: drop a connection that died, then (re)connect
+    connection.close_if_health_check_failed()
+    connection.ensure_connection()
+    DB_CONNECT_LATENCY.labels("django").observe(time.perf_counter() - started)
+    update_pool_metrics()
+    return connection.connection
+
+
+def release_db_connections(func):
+    """
+    Decorator for thread targets that use the database: close (or, with the
+    pool, return) the thread's connections when it finishes, since
+    request_finished never fires for it.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+            update_pool_metrics()
+
+    return wrapper
+
+
+class _PooledConnection:
+    """
+    Connection checked out of the Django pool for SQLAlchemy: SQLAlchemy
+    closes the connections it is done with, this puts them back instead.
+    """
+
+    def __init__(self, pool):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_connection", pool.getconn())
+
+    def close(self):
+        self._pool.putconn(self._connection)
+
+    def __getattr__(self, item):
+        return getattr(self._connection, item)
+
+    def __setattr__(self, key, value):
+        setattr(self._connection, key, value)
+
+
+def _sqlalchemy_url(alias: str):
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    database = settings.DATABASES[alias]
+    return sqlalchemy.engine.URL.create(
+        "postgresql+psycopg" if is_psycopg3 else "postgresql+psycopg2",
+        username=database.get("USER") or None,
+        password=database.get("PASSWORD") or None,
+        host=database.get("HOST") or None,
+        port=int(database["PORT"]) if database.get("PORT") else None,
+        database=database.get("NAME") or None,
+    )
+
+
+def _create_engine(alias: str):
+    url = _sqlalchemy_url(alias)
+    pool = get_django_pool(alias)
+    if pool is not None:
+        # SQLAlchemy keeps no connections of its own, it borrows from Django's pool
+        return sqlalchemy.create_engine(
+            url,
+            creator=lambda: _PooledConnection(pool),
+            poolclass=sqlalchemy.pool.NullPool,
+        )
+
+    max_age = settings.DATABASES[alias].get("CONN_MAX_AGE", 0)
+    if max_age == 0:
+        return sqlalchemy.create_engine(url, poolclass=sqlalchemy.pool.NullPool)
+    engine = sqlalchemy.create_engine(
+        url,
+        pool_size=settings.DB_SQLALCHEMY_POOL_SIZE,
+        max_overflow=settings.DB_SQLALCHEMY_POOL_SIZE,
+        pool_pre_ping=True,
+        pool_recycle=max_age or -1,
+    )
+    sqlalchemy.event.listen(engine, "checkout", lambda *args: update_pool_metrics())
+    sqlalchemy.event.listen(engine, "checkin", lambda *args: update_pool_metrics())
+    return engine
+
+
+def update_pool_metrics():
+    """Sample the pools into the db_pool_* gauges"""
+    try:
+        pool = get_django_pool()
+        if pool is not None:
+            stats = pool.get_stats()
+            size = stats.get("pool_size", 0)
+            DB_POOL_SIZE.labels("django").set(size)
+            DB_POOL_IN_USE.labels("django").set(size - stats.get("pool_available", 0))
+            DB_POOL_WAITING.labels("django").set(stats.get("requests_waiting", 0))
+
+        engine = _engines.get(DEFAULT_DB_ALIAS)
+        if engine is not None and isinstance(engine.pool, sqlalchemy.pool.QueuePool):
+            DB_POOL_SIZE.labels("sqlalchemy").set(engine.pool.checkedin() + engine.pool.checkedout())
+            DB_POOL_IN_USE.labels("sqlalchemy").set(engine.pool.checkedout())
+    except Exception as e:
+        logger.debug(f"Could not sample connection pool stats: {e}")
+
+
+# Global instances, one per database alias
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_sqlalchemy_engine(alias: str = DEFAULT_DB_ALIAS):
+    """Get the shared SQLAlchemy engine of a database alias"""
+    with _engines_lock:
+        if alias not in _engines:
+            _engines[alias] = _create_engine(alias)
+        return _engines[alias]
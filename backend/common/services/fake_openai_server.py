@@ -0,0 +1,235 @@
+"""
+Fake OpenAI server - a local stand-in for the chat completions API
+
+Implements POST /v1/chat/completions (streamed and not, including tool calls
+and the `stream_options.include_usage` chunk) and POST /v1/embeddings with
+the same response shapes as the real API, so ChatOpenAI and the OpenAI SDK
+can be pointed at it through OPENAI_BASE_URL. Latency is configurable
+(time to first token + tokens per second), which makes chat benchmarks
+repeatable and free.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLY = (
+    "Đây là câu trả lời mô phỏng từ máy chủ LLM giả lập, dùng để đo hiệu năng "
+    "của luồng chat mà không gọi tới OpenAI. "
+)
+
+EMBEDDING_DIMENSIONS = 1536
+
+
+def _count_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split a reply into word-sized stream chunks (keeps the spaces)"""
+    words = text.split(" ")
+    tokens = [word + " " for word in words[:-1]] + [words[-1]]
+    return [token for token in tokens if token]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server: "FakeOpenAIServer"
+
+    def log_message(self, format, *args):
+        logger.debug("fake-openai " + format % args)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        path = self.path.rstrip("/")
+        if path.endswith("/chat/completions"):
+            self._chat_completions(self._read_json())
+        elif path.endswith("/embeddings"):
+            self._embeddings(self._read_json())
+        else:
+            self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+    def _embeddings(self, body: Dict[str, Any]):
+        inputs = body.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        self._send_json({
+            "object": "list",
+            "model": body.get("model", "text-embedding-3-small"),
+            "data": [
+                {"object": "embedding", "index": index, "embedding": [0.0] * EMBEDDING_DIMENSIONS}
+                for index, _ in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)},
+        })
+
+    def _chat_completions(self, body: Dict[str, Any]):
+        self.server.requests += 1
+        messages = body.get("messages") or []
+        prompt_tokens = sum(_count_tokens(str(message.get("content") or "")) for message in messages)
+        tool_call = self.server.tool_call_for(messages) if body.get("tools") else None
+        reply = None if tool_call else self.server.reply_for(messages)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = body.get("model", "gpt-4o-mini")
+
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            self._stream(completion_id, model, reply, tool_call, prompt_tokens, include_usage)
+            return
+
+        time.sleep(self.server.first_token_latency)
+        if tool_call:
+            message = {"role": "assistant", "content": None, "tool_calls": [tool_call]}
+            completion_tokens, finish_reason = _count_tokens(json.dumps(tool_call)), "tool_calls"
+        else:
+            time.sleep(_count_tokens(reply) / self.server.tokens_per_second)
+            message = {"role": "assistant", "content": reply}
+            completion_tokens, finish_reason = _count_tokens(reply), "stop"
+        self._send_json({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": self._usage(prompt_tokens, completion_tokens),
+        })
+
+    @staticmethod
+    def _usage(prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+
+    def _stream(self, completion_id, model, reply, tool_call, prompt_tokens, include_usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def chunk(delta, finish_reason=None, usage=None):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if usage:
+                payload["usage"] = usage
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        time.sleep(self.server.first_token_latency)
+        if tool_call:
+            chunk({"role": "assistant", "content": None, "tool_calls": [{"index": 0, **tool_call}]})
+            chunk({}, finish_reason="tool_calls")
+            completion_tokens = _count_tokens(json.dumps(tool_call))
+        else:
+            chunk({"role": "assistant", "content": ""})
+            delay = 1 / self.server.tokens_per_second
+            for token in _tokenize(reply):
+                chunk({"content": token})
+                time.sleep(delay)
+            chunk({}, finish_reason="stop")
+            completion_tokens = _count_tokens(reply)
+
+        if include_usage:
+            chunk({}, usage=self._usage(prompt_tokens, completion_tokens))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """
+    Threaded fake OpenAI server.
+
+    Args:
+        first_token_latency: seconds before the first chunk
+        tokens_per_second: streaming rate of the reply
+        replies: user message substring -> scripted reply
+        tool_calls: user message substring -> {"name", "arguments"} returned
+            (once, when the request offers tools) before the text reply
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        first_token_latency: float = 0.3,
+        tokens_per_second: float = 50,
+        replies: Optional[Dict[str, str]] = None,
+        tool_calls: Optional[Dict[str, Dict[str, Any]]] = None,
+        default_reply: str = DEFAULT_REPLY * 3,
+    ):
+        super().__init__((host, port), FakeOpenAIHandler)
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.replies = replies or {}
+        self.tool_calls = tool_calls or {}
+        self.default_reply = default_reply
+        self.requests = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @staticmethod
+    def _last_user_message(messages: List[Dict[str, Any]]) -> str:
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                return str(message.get("content") or "")
+        return ""
+
+    def reply_for(self, messages: List[Dict[str, Any]]) -> str:
+        text = self._last_user_message(messages)
+        for needle, reply in self.replies.items():
+            if needle in text:
+                return reply
+        return self.default_reply
+
+    def tool_call_for(self, messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        # After the tool result comes back the model answers in text
+        if not messages or messages[-1].get("role") != "user":
+            return None
+        text = self._last_user_message(messages)
+        for needle, call in self.tool_calls.items():
+            if needle in text:
+                return {
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments") or {})},
+                }
+        return None
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
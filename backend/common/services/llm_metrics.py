@@ -0,0 +1,290 @@
+"""
+LLM metrics - per-request latency, token and tool instrumentation
+
+A LangChain callback handler that follows one agent/LLM run from its root
+start to its root end and exports what happened as Prometheus metrics and
+one structured log line tagged with the CorrelationMiddleware request UUID.
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from prometheus_client import Counter, Histogram
+
+from common.utils.middleware import get_req_uuid
+
+logger = logging.getLogger("llm.metrics")
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "claude-3-sonnet-20240229": (3.00, 0.30, 15.00),
+}
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+LLM_REQUESTS = Counter(
+    "llm_requests_total", "LLM/agent runs", ["component", "model", "status"]
+)
+LLM_LATENCY = Histogram(
+    "llm_request_latency_seconds", "Total run latency", ["component", "model"], buckets=LATENCY_BUCKETS
+)
+LLM_TTFT = Histogram(
+    "llm_time_to_first_token_seconds", "Time to first streamed token", ["component", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Tokens used", ["component", "model", "kind"]
+)
+LLM_COST = Counter(
+    "llm_cost_usd_total", "Estimated spend in USD", ["component", "model"]
+)
+LLM_ITERATIONS = Histogram(
+    "llm_agent_iterations", "LLM calls per run", ["component"], buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15)
+)
+LLM_RETRIES = Counter(
+    "llm_retries_total", "Retried or failed LLM calls", ["component", "model"]
+)
+TOOL_CALLS = Counter(
+    "llm_tool_calls_total", "Agent tool calls", ["component", "tool", "status"]
+)
+TOOL_LATENCY = Histogram(
+    "llm_tool_latency_seconds", "Agent tool duration", ["component", "tool"], buckets=LATENCY_BUCKETS
+)
+
+
+def _usage_from_llm_result(response) -> Dict[str, int]:
+    """prompt/completion/cached tokens from an LLMResult (streamed or not)"""
+    usage = {"prompt": 0, "completion": 0, "cached": 0}
+    reported = False
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if not metadata:
+                continue
+            reported = True
+            usage["prompt"] += metadata.get("input_tokens", 0)
+            usage["completion"] += metadata.get("output_tokens", 0)
+            usage["cached"] += (metadata.get("input_token_details") or {}).get("cache_read", 0) or 0
+
+    if not reported:
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        usage["prompt"] += token_usage.get("prompt_tokens", 0) or 0
+        usage["completion"] += token_usage.get("completion_tokens", 0) or 0
+        usage["cached"] += (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0) or 0
+    return usage
+
+
+@dataclass
+class RunMetrics:
+    """What happened during one agent/LLM run"""
+
+    component: str
+    request_uuid: Optional[str] = None
+    model: Optional[str] = None
+    started: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+    tokens: Dict[str, int] = field(default_factory=lambda: {"prompt": 0, "completion": 0, "cached": 0})
+    iterations: int = 0
+    retries: int = 0
+    tools: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    status: str = "ok"
+
+    def add_usage(self, usage: Dict[str, int]):
+        for kind, count in usage.items():
+            self.tokens[kind] = self.tokens.get(kind, 0) + count
+
+    def add_openai_usage(self, usage):
+        """Record the `usage` of an OpenAI SDK chat completion (one iteration)"""
+        self.iterations += 1
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.add_usage({
+            "prompt": usage.prompt_tokens or 0,
+            "completion": usage.completion_tokens or 0,
+            "cached": getattr(details, "cached_tokens", 0) or 0,
+        })
+
+    def add_tool_call(self, name: str, seconds: float, failed: bool = False):
+        stats = self.tools.setdefault(name, {"calls": 0, "errors": 0, "seconds": 0.0})
+        stats["calls"] += 1
+        stats["errors"] += int(failed)
+        stats["seconds"] += seconds
+        TOOL_CALLS.labels(self.component, name, "error" if failed else "ok").inc()
+        TOOL_LATENCY.labels(self.component, name).observe(seconds)
+
+    def cost_usd(self) -> Optional[float]:
+        prices = MODEL_PRICES.get(self.model or "")
+        if not prices:
+            return None
+        input_price, cached_price, output_price = prices
+        uncached = max(self.tokens["prompt"] - self.tokens["cached"], 0)
+        return (
+            uncached * input_price
+            + self.tokens["cached"] * cached_price
+            + self.tokens["completion"] * output_price
+        ) / 1_000_000
+
+    def emit(self):
+        """Export to Prometheus and write one structured log line"""
+        latency = time.perf_counter() - self.started
+        ttft = self.first_token_at - self.started if self.first_token_at else None
+        model = self.model or "unknown"
+        cost = self.cost_usd()
+
+        LLM_REQUESTS.labels(self.component, model, self.status).inc()
+        LLM_LATENCY.labels(self.component, model).observe(latency)
+        if ttft is not None:
+            LLM_TTFT.labels(self.component, model).observe(ttft)
+        for kind, count in self.tokens.items():
+            if count:
+                LLM_TOKENS.labels(self.component, model, kind).inc(count)
+        if cost:
+            LLM_COST.labels(self.component, model).inc(cost)
+        if self.iterations:
+            LLM_ITERATIONS.labels(self.component).observe(self.iterations)
+        if self.retries:
+            LLM_RETRIES.labels(self.component, model).inc(self.retries)
+
+        logger.info(
+            json.dumps(
+                {
+                    "event": "llm_run",
+                    "request_uuid": self.request_uuid,
+                    "component": self.component,
+                    "model": model,
+                    "status": self.status,
+                    "latency_ms": round(latency * 1000, 1),
+                    "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+                    "tokens": self.tokens,
+                    "cost_usd": round(cost, 6) if cost is not None else None,
+                    "iterations": self.iterations,
+                    "retries": self.retries,
+                    "tools": {
+                        name: {**stats, "seconds": round(stats["seconds"], 3)}
+                        for name, stats in self.tools.items()
+                    },
+                },
+                ensure_ascii=False,
+            ),
+            # Agent threads have no request thread-local; keep the request's UUID
+            extra={"req_uuid": self.request_uuid or ""},
+        )
+
+
+class LLMMetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Collect RunMetrics for every root run the handler sees.
+
+    Pass it at invoke time (config={"callbacks": [handler]}) so it is
+    inherited by the agent's LLM calls and tools. The request UUID is read
+    when the handler is created, which must happen on the request thread;
+    handlers that outlive a request can be re-bound via `request_uuid`.
+    """
+
+    def __init__(self, component: str, request_uuid: Optional[str] = None):
+        self.component = component
+        req_uuid = request_uuid or get_req_uuid()
+        self.request_uuid = str(req_uuid) if req_uuid else None
+        self._runs: Dict[UUID, RunMetrics] = {}
+        self._roots: Dict[UUID, UUID] = {}
+        self._started: Dict[UUID, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _enter(self, run_id: UUID, parent_run_id: Optional[UUID]) -> RunMetrics:
+        with self._lock:
+            if parent_run_id is None or parent_run_id not in self._roots:
+                self._roots[run_id] = run_id
+                self._runs[run_id] = RunMetrics(self.component, self.request_uuid)
+            else:
+                self._roots[run_id] = self._roots[parent_run_id]
+            return self._runs[self._roots[run_id]]
+
+    def _run_for(self, run_id: UUID) -> Optional[RunMetrics]:
+        root = self._roots.get(run_id)
+        return self._runs.get(root) if root else None
+
+    def _exit(self, run_id: UUID, failed: bool = False):
+        with self._lock:
+            root = self._roots.pop(run_id, None)
+            if root != run_id:
+                return
+            metrics = self._runs.pop(run_id)
+            # Drop children left behind by runs that never reported an end
+            for child in [child for child, child_root in self._roots.items() if child_root == run_id]:
+                del self._roots[child]
+        if failed:
+            metrics.status = "error"
+        metrics.emit()
+
+    # Chains (AgentExecutor and its sub-chains)
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        self._enter(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._exit(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._exit(run_id, failed=True)
+
+    # LLM calls: one per agent iteration
+    def _on_llm_start(self, serialized, run_id, parent_run_id, kwargs):
+        metrics = self._enter(run_id, parent_run_id)
+        metrics.iterations += 1
+        invocation = kwargs.get("invocation_params") or {}
+        metrics.model = metrics.model or invocation.get("model_name") or invocation.get("model")
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._on_llm_start(serialized, run_id, parent_run_id, kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        self._on_llm_start(serialized, run_id, parent_run_id, kwargs)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        metrics = self._run_for(run_id)
+        if metrics and metrics.first_token_at is None and token:
+            metrics.first_token_at = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        metrics = self._run_for(run_id)
+        if metrics:
+            metrics.add_usage(_usage_from_llm_result(response))
+        self._exit(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        metrics = self._run_for(run_id)
+        if metrics:
+            metrics.retries += 1
+        self._exit(run_id, failed=True)
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        metrics = self._run_for(run_id)
+        if metrics:
+            metrics.retries += 1
+
+    # Tools
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._enter(run_id, parent_run_id)
+        self._started[run_id] = ((serialized or {}).get("name") or "unknown", time.perf_counter())
+
+    def _on_tool_finish(self, run_id, failed):
+        started = self._started.pop(run_id, None)
+        metrics = self._run_for(run_id)
+        if metrics and started is not None:
+            name, started_at = started
+            metrics.add_tool_call(name, time.perf_counter() - started_at, failed)
+        self._exit(run_id, failed=failed)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._on_tool_finish(run_id, failed=False)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._on_tool_finish(run_id, failed=True)
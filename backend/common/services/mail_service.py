@@ -1,6 +1,11 @@
 import logging
+import threading
+import time
 from email import encoders
 from email.mime.base import MIMEBase
+from functools import lru_cache
+from smtplib import SMTPServerDisconnected
+from typing import Iterable, List, Sequence, Tuple, Union
 
 from django.conf import settings
 from django.core import mail
@@ -8,9 +13,25 @@ from django.core.mail import EmailMultiAlternatives
 from django.template.loader import get_template
 from django.utils.translation import gettext_lazy as _
 from common.constant.mail import MailTemplateEnum
+from common.services.task_queue import enqueue
 
 logger = logging.getLogger(__name__)
 
+# One open mail connection per thread, reused while it is younger than MAIL_CONNECTION_MAX_AGE
+_connections = threading.local()
+
+
+@lru_cache(maxsize=64)
+def _get_cached_template(template_path):
+    return get_template(template_path)
+
+
+def _get_template(template_path):
+    # DEBUG keeps Django's own (autoreloaded) lookup so edited templates show up
+    if settings.DEBUG:
+        return get_template(template_path)
+    return _get_cached_template(template_path)
+
 
 class MailService:
 
@@ -33,6 +54,134 @@ class MailService:
             **kwargs,
         )
 
+    def send_bulk_email_template_by_type(
+        self,
+        email_type_enum: MailTemplateEnum,
+        recipients: Iterable[Tuple[Union[str, Sequence[str]], dict]],
+        batch_size=None,
+        **kwargs,
+    ) -> int:
+        """
+        Send one templated mail per (recipient, context) pair over a single
+        mail connection, `batch_size` messages per send_messages() call.
+        Returns the number of messages sent.
+        """
+        batch_size = batch_size or settings.MAIL_BULK_BATCH_SIZE
+        sent = 0
+        batch: List[EmailMultiAlternatives] = []
+        for recipient, context in recipients:
+            batch.append(
+                self._build_message(
+                    subject=email_type_enum.subject_mail,
+                    recipient_mails=[recipient] if isinstance(recipient, str) else list(recipient),
+                    html_template_path=email_type_enum.template_html,
+                    context=context,
+                    **kwargs,
+                )
+            )
+            if len(batch) >= batch_size:
+                sent += self._send_messages(batch)
+                batch = []
+        if batch:
+            sent += self._send_messages(batch)
+        logger.info(f"Sent {sent} {email_type_enum.name} mails")
+        return sent
+
+    def enqueue_email_template_by_type(
+        self,
+        email_type_enum: MailTemplateEnum,
+        recipient_mails=[],
+        context={},
+    ):
+        """Send from the task worker instead of the request (see common.tasks)"""
+        return enqueue(
+            "common.send_email_template",
+            {
+                "email_type": email_type_enum.name,
+                "recipient_mails": list(recipient_mails),
+                "context": context,
+            },
+        )
+
+    def _build_message(
+        self,
+        subject,
+        recipient_mails,
+        plain_template_path=None,
+        html_template_path=None,
+        context=None,
+        attachments=None,
+        **kwargs,
+    ) -> EmailMultiAlternatives:
+        if not plain_template_path and not html_template_path:
+            raise ValueError(
+                _(
+                    "Send mail with template must not empty plain or html template path"
+                )
+            )
+        if plain_template_path:
+            message = _get_template(plain_template_path).render(context=context)
+        else:
+            message = ""
+
+        msg = EmailMultiAlternatives(
+            subject=subject,
+            body=message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=recipient_mails,
+            **kwargs,
+        )
+        if html_template_path:
+            msg.attach_alternative(_get_template(html_template_path).render(context=context), "text/html")
+
+        for attachment in attachments or []:
+            part = MIMEBase("application", "octet-stream")
+            part.set_payload(attachment.read())
+            encoders.encode_base64(part)
+            part.add_header(
+                "Content-Disposition",
+                f'attachment; filename="{attachment.name}"',
+            )
+            msg.attach(part)
+        return msg
+
+    def _get_connection(self):
+        connection = getattr(_connections, "connection", None)
+        if connection is not None and time.monotonic() - _connections.opened_at > settings.MAIL_CONNECTION_MAX_AGE:
+            self.close_connection()
+            connection = None
+        if connection is None:
+            connection = mail.get_connection(fail_silently=False)
+            # Opened here, so send_messages() leaves it open for the next messages
+            connection.open()
+            _connections.connection = connection
+            _connections.opened_at = time.monotonic()
+        return connection
+
+    def close_connection(self):
+        """Close the calling thread's mail connection"""
+        connection = getattr(_connections, "connection", None)
+        _connections.connection = None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception as e:
+                logger.debug(f"Error closing mail connection: {e}")
+
+    def _send_messages(self, messages: List[EmailMultiAlternatives]) -> int:
+        try:
+            sent = self._get_connection().send_messages(messages)
+        except SMTPServerDisconnected:
+            # The server dropped the idle connection before the first message: reconnect once
+            self.close_connection()
+            sent = self._get_connection().send_messages(messages)
+        except Exception:
+            self.close_connection()
+            raise
+        if settings.MAIL_CONNECTION_MAX_AGE <= 0:
+            self.close_connection()
+        return sent or 0
+
     def __send_email_template(
         self,
         subject,
@@ -41,57 +190,21 @@ class MailService:
         html_template_path=None,
         context=None,
         attachments=None,
+        fail_silently=False,
         **kwargs,
     ):
         try:
-            if not plain_template_path and not html_template_path:
-                raise ValueError(
-                    _(
-                        "Send mail with template must not empty plain or html template path"
-                    )
-                )
-            if plain_template_path:
-                plain_template = get_template(plain_template_path)
-                message = plain_template.render(context=context)
-            else:
-                message = ""
-
-            if html_template_path:
-                html_template = get_template(html_template_path)
-                html_message = html_template.render(context=context)
-            else:
-                html_message = ""
-
-            if attachments:
-                msg = EmailMultiAlternatives(
-                    subject=subject,
-                    body=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    to=recipient_mails,
-                    **kwargs,
-                )
-                msg.attach_alternative(html_message, "text/html")
-
-                for attachment in attachments:
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(attachment.read())
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        "Content-Disposition",
-                        f'attachment; filename="{attachment.name}"',
-                    )
-                    msg.attach(part)
-
-                msg.send()
-            else:
-                mail.send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=recipient_mails,
-                    html_message=html_message,
-                    **kwargs,
-                )
+            msg = self._build_message(
+                subject=subject,
+                recipient_mails=recipient_mails,
+                plain_template_path=plain_template_path,
+                html_template_path=html_template_path,
+                context=context,
+                attachments=attachments,
+                **kwargs,
+            )
+            self._send_messages([msg])
         except Exception as ex:
-            logger.exception("Send mail fail: ", ex)
-            raise ex
+            logger.exception(f"Send mail fail: {ex}")
+            if not fail_silently:
+                raise ex
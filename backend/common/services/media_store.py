@@ -0,0 +1,240 @@
+"""
+Content-addressed media storage
+
+`MediaStore.put_*()` streams the content to a temporary file while hashing
+it, then stores it once under its SHA-256 with a sharded layout
+("cas/ab/cd/abcd….png"), on local disk (MEDIA_ROOT) or S3 depending on
+MEDIA_STORE_BACKEND. Storing the same bytes again returns the existing key.
+
+Every stored file has a `MediaObject` row. Records that display a file call
+`retain()` (and `release()` when they let go of it); `purge_orphans()`
+recounts the references from MEDIA_REFERENCE_PROVIDERS and deletes files
+with no references that have not been stored again for
+MEDIA_ORPHAN_GRACE_HOURS.
+"""
+
+import base64
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import Counter
+from datetime import timedelta
+from typing import Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from common.models import MediaObject
+
+logger = logging.getLogger(__name__)
+
+# Read/decode granularity of the streaming writers (multiple of 4 for base64)
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "svg": "image/svg+xml",
+}
+
+
+class LocalMediaBackend:
+    """Files under MEDIA_ROOT, served at MEDIA_URL"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.MEDIA_ROOT
+
+    def temp_dir(self) -> str:
+        # Same filesystem as the final location, so saving is an atomic rename
+        path = os.path.join(self.root, ".tmp")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.root, key))
+
+    def save_file(self, local_path: str, key: str, content_type: str):
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(local_path, path)
+
+    def delete_many(self, keys: List[str]):
+        for key in keys:
+            try:
+                os.remove(os.path.join(self.root, key))
+            except FileNotFoundError:
+                pass
+
+    def url(self, key: str) -> str:
+        return f"{settings.MEDIA_URL}{key}"
+
+
+class S3MediaBackend:
+    """Objects in the S3Storage bucket (multipart upload, batch delete)"""
+
+    def __init__(self, s3_storage=None):
+        from common.aws.s3 import S3Storage
+
+        self.s3_storage = s3_storage or S3Storage()
+
+    def temp_dir(self) -> Optional[str]:
+        return None
+
+    def exists(self, key: str) -> bool:
+        return self.s3_storage.get_size(key) is not None
+
+    def save_file(self, local_path: str, key: str, content_type: str):
+        folder, name = key.rsplit("/", 1)
+        try:
+            with open(local_path, "rb") as file:
+                self.s3_storage.upload_file(file, folder, name, extra_args={"ContentType": content_type})
+        finally:
+            os.remove(local_path)
+
+    def delete_many(self, keys: List[str]):
+        self.s3_storage.delete_files(keys)
+
+    def url(self, key: str) -> str:
+        return self.s3_storage.s3_client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.s3_storage.bucket_name, "Key": key}
+        )
+
+
+def _decode_base64(data: str) -> Iterator[bytes]:
+    """Decode a (data: URL) base64 string chunk by chunk"""
+    if "," in data[:100]:
+        data = data.split(",", 1)[1]
+    data = "".join(data.split()) if any(char.isspace() for char in data[:CHUNK_SIZE]) else data
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield base64.b64decode(data[start:start + CHUNK_SIZE], validate=True)
+
+
+class MediaStore:
+    def __init__(self, backend=None, folder: str = "cas"):
+        self.backend = backend or LocalMediaBackend()
+        self.folder = folder
+
+    def key_for(self, digest: str, extension: str) -> str:
+        return f"{self.folder}/{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+    def owns(self, key) -> bool:
+        """Whether `key` looks like a key of this store"""
+        return isinstance(key, str) and key.startswith(f"{self.folder}/")
+
+    def put_stream(self, chunks: Iterable[bytes], extension: str = "png", content_type: Optional[str] = None) -> str:
+        """Store the content of `chunks` (written as it arrives); returns its key"""
+        extension = extension.lower().lstrip(".")
+        content_type = content_type or CONTENT_TYPES.get(extension, "application/octet-stream")
+        digest = hashlib.sha256()
+        size = 0
+
+        handle, temp_path = tempfile.mkstemp(suffix=f".{extension}", dir=self.backend.temp_dir())
+        try:
+            with os.fdopen(handle, "wb") as file:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    file.write(chunk)
+                    size += len(chunk)
+
+            key = self.key_for(digest.hexdigest(), extension)
+            updated = MediaObject.objects.filter(key=key).update(last_used_at=timezone.now())
+            if updated and self.backend.exists(key):
+                return key
+
+            self.backend.save_file(temp_path, key, content_type)
+            MediaObject.objects.get_or_create(
+                key=key,
+                defaults={"digest": digest.hexdigest(), "size": size, "content_type": content_type},
+            )
+            return key
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def put_bytes(self, data: bytes, extension: str = "png", content_type: Optional[str] = None) -> str:
+        return self.put_stream(
+            (data[start:start + CHUNK_SIZE] for start in range(0, len(data), CHUNK_SIZE)),
+            extension,
+            content_type,
+        )
+
+    def put_base64(self, data: str, extension: str = "png", content_type: Optional[str] = None) -> str:
+        """Store a base64 string (optionally a data: URL); raises ValueError if it is not valid base64"""
+        try:
+            return self.put_stream(_decode_base64(data), extension, content_type)
+        except base64.binascii.Error as e:
+            raise ValueError(f"Invalid base64 content: {e}")
+
+    def url(self, key: str) -> str:
+        return self.backend.url(key)
+
+    # References
+
+    def retain(self, keys: Iterable[str]):
+        for key, count in Counter(keys).items():
+            MediaObject.objects.filter(key=key).update(ref_count=F("ref_count") + count)
+
+    def release(self, keys: Iterable[str]):
+        for key, count in Counter(keys).items():
+            MediaObject.objects.filter(key=key).update(ref_count=F("ref_count") - count)
+
+    def recount_references(self) -> int:
+        """Reset every ref_count from MEDIA_REFERENCE_PROVIDERS; returns the referenced objects"""
+        counts = Counter()
+        for path in settings.MEDIA_REFERENCE_PROVIDERS:
+            counts.update(import_string(path)())
+
+        MediaObject.objects.exclude(key__in=list(counts)).exclude(ref_count=0).update(ref_count=0)
+        for key, count in counts.items():
+            MediaObject.objects.filter(key=key).exclude(ref_count=count).update(ref_count=count)
+        return len(counts)
+
+    def purge_orphans(self, grace_hours: Optional[int] = None, batch_size: int = 1000) -> int:
+        """Delete unreferenced media unused for `grace_hours`; returns the number purged"""
+        grace_hours = settings.MEDIA_ORPHAN_GRACE_HOURS if grace_hours is None else grace_hours
+        self.recount_references()
+        cutoff = timezone.now() - timedelta(hours=grace_hours)
+
+        purged = 0
+        while True:
+            candidates = list(
+                MediaObject.objects.filter(ref_count__lte=0, last_used_at__lt=cutoff)
+                .values_list("id", "key")[:batch_size]
+            )
+            if not candidates:
+                break
+            ids = [object_id for object_id, _ in candidates]
+            # Rows retained or stored again since the query above are kept
+            MediaObject.objects.filter(id__in=ids, ref_count__lte=0, last_used_at__lt=cutoff).delete()
+            remaining = set(MediaObject.objects.filter(id__in=ids).values_list("id", flat=True))
+            keys = [key for object_id, key in candidates if object_id not in remaining]
+            self.backend.delete_many(keys)
+            purged += len(keys)
+            if len(candidates) < batch_size:
+                break
+
+        logger.info(f"Purged {purged} orphaned media objects")
+        return purged
+
+
+# Global instance
+_media_store = None
+_media_store_lock = threading.Lock()
+
+
+def get_media_store() -> MediaStore:
+    """Get singleton MediaStore on the MEDIA_STORE_BACKEND backend"""
+    global _media_store
+
+    with _media_store_lock:
+        if _media_store is None:
+            backend = S3MediaBackend() if settings.MEDIA_STORE_BACKEND == "s3" else LocalMediaBackend()
+            _media_store = MediaStore(backend)
+    return _media_store
@@ -9,6 +9,8 @@ logger = logging.getLogger(__name__)
 
 
 class OTPService:
+    # OTPs go straight to the shared cache (CACHES["default"]), never through the
+    # in-process tier of common.cache: every worker must see a new or used OTP at once
 
     def __init__(self):
         super(OTPService, self).__init__()
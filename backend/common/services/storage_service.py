@@ -1,42 +1,56 @@
+import logging
 import os
-import base64
-import uuid
-from django.conf import settings
+
+from common.services.media_store import get_media_store
+
+logger = logging.getLogger(__name__)
+
 
 class StorageService:
+    """
+    Save generated media. Files go to the content-addressed media store
+    (common.services.media_store): identical content is stored once, and the
+    returned path is its storage key (e.g. "cas/ab/cd/<sha256>.png").
+    """
+
     @staticmethod
     def save_base64_image(base64_string, folder="images"):
         """
-        Save a base64-encoded image to the media folder and return the relative file path.
+        Save a base64-encoded image to media storage and return its relative file path.
 
         Args:
             base64_string (str): The base64-encoded image string (may include data:image/png;base64,...).
-            folder (str): Subfolder in MEDIA_ROOT to save the image.
+            folder (str): Kept for compatibility; content-addressed files share one folder.
 
         Returns:
-            str: Relative file path to the saved image (e.g., "images/uuid.png"), or None if failed.
+            str: Relative file path to the saved image (e.g., "cas/ab/cd/<sha256>.png"), or None if failed.
         """
-        # Remove header if present
-        if "," in base64_string:
-            base64_string = base64_string.split(",")[1]
-
         try:
-            # Try to decode base64
-            image_data = base64.b64decode(base64_string)
-        except Exception:
+            return get_media_store().put_base64(base64_string, extension="png")
+        except ValueError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to save image: {e}")
             return None
 
-        # Generate unique filename
-        filename = f"{uuid.uuid4().hex}.png"
-        media_folder = os.path.join(settings.MEDIA_ROOT, folder)
-        os.makedirs(media_folder, exist_ok=True)
-        file_path = os.path.join(media_folder, filename)
+    @staticmethod
+    def save_bytes(data, folder="images", filename=None, extension="png"):
+        """
+        Save raw file bytes to media storage and return the relative file path.
+
+        Args:
+            data (bytes): File content.
+            folder (str): Kept for compatibility; content-addressed files share one folder.
+            filename (str): Only its extension is used when given.
+            extension (str): Extension of the stored file.
 
+        Returns:
+            str: Relative file path (e.g., "cas/ab/cd/<sha256>.png"), or None if failed.
+        """
+        if filename:
+            extension = os.path.splitext(filename)[1].lstrip(".") or extension
         try:
-            with open(file_path, "wb") as f:
-                f.write(image_data)
-        except Exception:
+            return get_media_store().put_bytes(data, extension=extension)
+        except Exception as e:
+            logger.error(f"Failed to save file: {e}")
             return None
-
-        # Return relative path for use in URLs
-        return os.path.join(folder, filename)
@@ -0,0 +1,367 @@
+"""
+Database-backed task queue
+
+Slow side work (SMTP, Google Sheets, embeddings) is enqueued as a `Job` row
+instead of running inside the request:
+
+    @task(name="common.send_email_template", priority=10)
+    def send_email_template(email_type, recipient_mails, context=None): ...
+
+    enqueue("common.send_email_template", {"email_type": "VERIFY_EMAIL", ...})
+
+`python manage.py run_task_worker` claims due jobs with SELECT ... FOR
+UPDATE SKIP LOCKED (any number of worker processes can run side by side),
+runs them outside the claiming transaction and retries failures with
+exponential backoff. Tasks with a `schedule` are enqueued periodically by an
+APScheduler scheduler in each worker; their unique key keeps concurrent
+schedulers from queueing the same run twice. Tasks live in `<app>/tasks.py`.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+from prometheus_client import Counter, Histogram
+
+from common.models import Job
+from common.services.db_pool import release_db_connections
+
+logger = logging.getLogger(__name__)
+
+TASK_RUNS = Counter("task_runs_total", "Background task runs", ["task", "status"])
+TASK_DURATION = Histogram(
+    "task_duration_seconds", "Background task duration", ["task"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+TASK_QUEUE_DELAY = Histogram(
+    "task_queue_delay_seconds", "Time a due job waited before a worker picked it up", ["queue"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900),
+)
+
+
+@dataclass
+class Task:
+    name: str
+    func: Callable[..., Any]
+    queue: str = "default"
+    priority: int = 0
+    max_attempts: Optional[int] = None
+    # APScheduler add_job() trigger arguments, e.g. {"trigger": "interval", "seconds": 30}
+    schedule: Optional[Dict[str, Any]] = None
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, payload: Optional[Dict[str, Any]] = None, **options) -> Optional[Job]:
+        return enqueue(self.name, payload, **options)
+
+
+# Registered tasks by name, filled when the <app>.tasks modules are imported
+TASKS: Dict[str, Task] = {}
+_discovered = False
+_discover_lock = threading.Lock()
+
+
+def task(
+    name: Optional[str] = None,
+    queue: str = "default",
+    priority: int = 0,
+    max_attempts: Optional[int] = None,
+    schedule: Optional[Dict[str, Any]] = None,
+):
+    """Register a function as a task; its keyword arguments are the JSON payload"""
+
+    def decorator(func):
+        registered = Task(
+            name=name or f"{func.__module__}.{func.__name__}",
+            func=func,
+            queue=queue,
+            priority=priority,
+            max_attempts=max_attempts,
+            schedule=schedule,
+        )
+        TASKS[registered.name] = registered
+        return registered
+
+    return decorator
+
+
+def autodiscover_tasks():
+    """Import every installed app's tasks module once"""
+    global _discovered
+
+    with _discover_lock:
+        if not _discovered:
+            autodiscover_modules("tasks")
+            _discovered = True
+
+
+def get_task(name: str) -> Optional[Task]:
+    if name not in TASKS:
+        autodiscover_tasks()
+    return TASKS.get(name)
+
+
+def enqueue(
+    name: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    queue: Optional[str] = None,
+    priority: Optional[int] = None,
+    run_at: Optional[datetime] = None,
+    delay: Optional[float] = None,
+    max_attempts: Optional[int] = None,
+    unique_key: Optional[str] = None,
+) -> Optional[Job]:
+    """
+    Queue a task run. Inside a transaction the job is committed (or rolled
+    back) together with the caller's writes.
+
+    Returns:
+        The new Job, or None when a job with the same unique_key is already
+        pending or running
+    """
+    registered = TASKS.get(name)
+    if run_at is None:
+        run_at = timezone.now() + timedelta(seconds=delay or 0)
+    job = Job(
+        name=name,
+        payload=payload or {},
+        queue=queue or (registered.queue if registered else "default"),
+        priority=priority if priority is not None else (registered.priority if registered else 0),
+        max_attempts=(
+            max_attempts
+            or (registered.max_attempts if registered else None)
+            or settings.TASK_QUEUE_MAX_ATTEMPTS
+        ),
+        unique_key=unique_key,
+        run_at=run_at,
+    )
+
+    if settings.TASK_QUEUE_EAGER:
+        # Local development without a worker: run now, in the caller's thread
+        registered = get_task(name)
+        if registered is None:
+            raise LookupError(f"Unknown task {name}")
+        job.attempts = 1
+        registered(**job.payload)
+        return job
+
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        if unique_key is None:
+            raise
+        logger.debug(f"Job {name} with key {unique_key} is already queued")
+        return None
+    return job
+
+
+class TaskWorker:
+    """
+    Run due jobs of some queues.
+
+    Each poll claims up to `batch_size` pending jobs (highest priority, then
+    oldest run_at first) and marks them RUNNING in one short transaction,
+    then runs them one by one. While a job runs its lock is refreshed every
+    `lock_timeout / 3` seconds, so long jobs are not taken for dead; a job
+    without a heartbeat for `lock_timeout` seconds is put back, or failed
+    once it has used all its attempts (e.g. it keeps killing its worker).
+    """
+
+    def __init__(
+        self,
+        queues: Optional[Iterable[str]] = None,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.queues = list(queues or ["default"])
+        self.batch_size = batch_size or settings.TASK_QUEUE_BATCH_SIZE
+        self.interval = interval or settings.TASK_QUEUE_INTERVAL
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        self.backoff_base = settings.TASK_QUEUE_BACKOFF_BASE
+        self.backoff_max = settings.TASK_QUEUE_BACKOFF_MAX
+        self.lock_timeout = settings.TASK_QUEUE_LOCK_TIMEOUT
+
+    def backoff_delay(self, attempts: int) -> timedelta:
+        """10s, 20s, 40s, ... capped at backoff_max"""
+        seconds = min(self.backoff_base * (2 ** max(attempts - 1, 0)), self.backoff_max)
+        return timedelta(seconds=seconds)
+
+    def claim(self) -> List[Job]:
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status=Job.JobStatus.PENDING, queue__in=self.queues, run_at__lte=now)
+                .order_by("-priority", "run_at", "id")[:self.batch_size]
+            )
+            if not jobs:
+                return []
+            Job.objects.filter(id__in=[job.id for job in jobs]).update(
+                status=Job.JobStatus.RUNNING,
+                locked_by=self.worker_id,
+                locked_at=now,
+                attempts=F("attempts") + 1,
+            )
+
+        for job in jobs:
+            TASK_QUEUE_DELAY.labels(job.queue).observe(max((now - job.run_at).total_seconds(), 0))
+            job.status = Job.JobStatus.RUNNING
+            job.attempts += 1
+        return jobs
+
+    def requeue_stale(self) -> int:
+        """Put back (or fail, when out of attempts) jobs whose worker stopped before finishing them"""
+        now = timezone.now()
+        stale = Job.objects.filter(
+            status=Job.JobStatus.RUNNING,
+            queue__in=self.queues,
+            locked_at__lt=now - timedelta(seconds=self.lock_timeout),
+        )
+        failed = stale.filter(attempts__gte=F("max_attempts")).update(
+            status=Job.JobStatus.FAILED,
+            last_error=f"Worker stopped while running the job (no heartbeat for {self.lock_timeout}s)",
+            finished_at=now,
+            locked_by=None,
+            locked_at=None,
+        )
+        if failed:
+            logger.error(f"Failed {failed} jobs whose worker stopped on their last attempt")
+        requeued = stale.filter(attempts__lt=F("max_attempts")).update(
+            status=Job.JobStatus.PENDING, locked_by=None, locked_at=None, run_at=now
+        )
+        if requeued:
+            logger.warning(f"Requeued {requeued} jobs without a heartbeat for more than {self.lock_timeout}s")
+        return requeued
+
+    def _heartbeat(self, job: Job, stop_event: threading.Event):
+        """Refresh the job's lock until it finishes (runs in its own thread)"""
+        interval = max(self.lock_timeout / 3, 1)
+        while not stop_event.wait(interval):
+            try:
+                Job.objects.filter(
+                    id=job.id, status=Job.JobStatus.RUNNING, locked_by=self.worker_id
+                ).update(locked_at=timezone.now())
+            except Exception as e:
+                logger.warning(f"Heartbeat of job {job.id} failed: {e}")
+
+    def _run_with_heartbeat(self, job: Job, registered: Task):
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=release_db_connections(self._heartbeat), args=(job, stop_heartbeat), daemon=True
+        )
+        heartbeat.start()
+        try:
+            registered.func(**job.payload)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+    def run_job(self, job: Job):
+        registered = get_task(job.name)
+        if registered is None:
+            self._finish(job, Job.JobStatus.FAILED, f"Unknown task {job.name}")
+            TASK_RUNS.labels(job.name, "unknown").inc()
+            return
+
+        started = time.perf_counter()
+        try:
+            self._run_with_heartbeat(job, registered)
+        except Exception as e:
+            TASK_DURATION.labels(job.name).observe(time.perf_counter() - started)
+            if job.attempts >= job.max_attempts:
+                logger.error(f"Job {job.id} {job.name} failed after {job.attempts} attempts: {e}")
+                self._finish(job, Job.JobStatus.FAILED, str(e))
+                TASK_RUNS.labels(job.name, "failed").inc()
+            else:
+                delay = self.backoff_delay(job.attempts)
+                logger.warning(f"Job {job.id} {job.name} failed, retrying in {delay.total_seconds():.0f}s: {e}")
+                Job.objects.filter(id=job.id).update(
+                    status=Job.JobStatus.PENDING,
+                    run_at=timezone.now() + delay,
+                    last_error=str(e),
+                    locked_by=None,
+                    locked_at=None,
+                )
+                TASK_RUNS.labels(job.name, "retry").inc()
+            return
+
+        TASK_DURATION.labels(job.name).observe(time.perf_counter() - started)
+        self._finish(job, Job.JobStatus.DONE)
+        TASK_RUNS.labels(job.name, "done").inc()
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        Job.objects.filter(id=job.id).update(
+            status=status,
+            last_error=error,
+            finished_at=timezone.now(),
+            locked_by=None,
+            locked_at=None,
+        )
+
+    def run_once(self) -> int:
+        """Claim and run one batch; returns the number of jobs run"""
+        jobs = self.claim()
+        for job in jobs:
+            self.run_job(job)
+        return len(jobs)
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None):
+        """Poll every `interval` seconds; drain immediately while full batches keep coming"""
+        stop_event = stop_event or threading.Event()
+        logger.info(
+            f"Task worker {self.worker_id} started (queues={','.join(self.queues)}, "
+            f"interval={self.interval}s, batch_size={self.batch_size})"
+        )
+        last_stale_check = 0.0
+
+        while not stop_event.is_set():
+            try:
+                if time.monotonic() - last_stale_check >= self.lock_timeout / 4:
+                    self.requeue_stale()
+                    last_stale_check = time.monotonic()
+                ran = self.run_once()
+            except Exception as e:
+                logger.error(f"Task worker poll failed: {e}")
+                ran = 0
+
+            if ran < self.batch_size:
+                stop_event.wait(self.interval)
+
+        logger.info(f"Task worker {self.worker_id} stopped")
+
+
+def start_scheduler():
+    """Start a background APScheduler that enqueues the tasks with a schedule"""
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    autodiscover_tasks()
+    scheduler = BackgroundScheduler(timezone=settings.TIME_ZONE)
+    for registered in TASKS.values():
+        if not registered.schedule:
+            continue
+        scheduler.add_job(
+            release_db_connections(enqueue),
+            args=[registered.name],
+            kwargs={"unique_key": f"schedule:{registered.name}"},
+            id=registered.name,
+            coalesce=True,
+            max_instances=1,
+            **registered.schedule,
+        )
+        logger.info(f"Scheduled task {registered.name}: {registered.schedule}")
+    scheduler.start()
+    return scheduler
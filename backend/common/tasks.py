@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from common.constant.mail import MailTemplateEnum
+from common.models import Job
+from common.services.mail_service import MailService
+from common.services.media_store import get_media_store
+from common.services.task_queue import task
+
+
+@task(name="common.send_email_template", priority=10)
+def send_email_template(email_type, recipient_mails, context=None):
+    """Send a templated email (MailTemplateEnum member name)"""
+    MailService().send_email_template_by_type(
+        email_type_enum=MailTemplateEnum[email_type],
+        recipient_mails=recipient_mails,
+        context=context or {},
+    )
+
+
+@task(name="common.send_bulk_email_template")
+def send_bulk_email_template(email_type, recipients):
+    """Send one templated email per [recipient, context] pair over one connection"""
+    MailService().send_bulk_email_template_by_type(
+        email_type_enum=MailTemplateEnum[email_type],
+        recipients=[(recipient, context or {}) for recipient, context in recipients],
+    )
+
+
+@task(name="common.prune_jobs", priority=-10, max_attempts=1, schedule={"trigger": "interval", "hours": 1})
+def prune_jobs():
+    """Delete finished jobs older than TASK_QUEUE_RETENTION_HOURS"""
+    before = timezone.now() - timedelta(hours=settings.TASK_QUEUE_RETENTION_HOURS)
+    Job.objects.filter(
+        status__in=[Job.JobStatus.DONE, Job.JobStatus.FAILED], finished_at__lt=before
+    ).delete()
+
+
+@task(name="common.purge_orphaned_media", priority=-10, max_attempts=1, schedule={"trigger": "cron", "hour": 3})
+def purge_orphaned_media():
+    """Delete stored media no record references (MEDIA_ORPHAN_GRACE_HOURS)"""
+    get_media_store().purge_orphans()
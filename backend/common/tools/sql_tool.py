@@ -1,23 +1,19 @@
-import os
-import psycopg2
 import pandas as pd
-from psycopg2 import OperationalError
+from django.db import OperationalError
+
+from common.services.db_pool import get_raw_connection
 
 def connect_to_db():
     """
-    Connects to the PostgreSQL database using environment variables.
-    Sets the search_path to 'public' so you can query tables without prefixing with 'public.'.
-    Returns a connection object.
+    Returns the DB-API connection of the current thread's Django connection
+    (persistent or pooled, see common.services.db_pool) instead of opening a
+    new one, with the search_path set to 'public' so you can query tables
+    without prefixing with 'public.'. Do not close it or keep it past the
+    current request.
     Raises OperationalError if connection fails.
     """
     try:
-        conn = psycopg2.connect(
-            host=os.getenv("POSTGRES_HOST", "localhost"),
-            port=int(os.getenv("POSTGRES_PORT", 5432)),
-            dbname=os.getenv("POSTGRES_DB"),
-            user=os.getenv("POSTGRES_USER"),
-            password=os.getenv("POSTGRES_PASSWORD"),
-        )
+        conn = get_raw_connection()
 
         with conn.cursor() as cur:
             cur.execute("SET search_path TO public;")
@@ -0,0 +1,111 @@
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+def _build_fold_table() -> Dict[int, str]:
+    """
+    Build a str.translate table that lowercases and strips Vietnamese diacritics.
+    Every mapping is one character to one character so folded text keeps the
+    same offsets as the original text.
+    """
+    table = {}
+    for code_point in range(0x41, 0x2000):
+        char = chr(code_point)
+        lower = char.lower()
+        if len(lower) != 1:
+            continue
+        base = "".join(
+            c for c in unicodedata.normalize("NFD", lower) if not unicodedata.combining(c)
+        )
+        if len(base) == 1 and base != char:
+            table[code_point] = base
+    table[ord("đ")] = "d"
+    table[ord("Đ")] = "d"
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold_diacritics(text: str) -> str:
+    """
+    Lowercase text and remove diacritics, e.g. "Hôm Qua" -> "hom qua".
+    The result always has the same length as the input.
+    """
+    return unicodedata.normalize("NFC", text).translate(_FOLD_TABLE)
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    slot: str
+    value: Any
+    keyword: str
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    """
+    Match many keyword groups ("slots") against a text in a single regex pass.
+
+    Keywords are compiled once into one alternation with word boundaries over
+    diacritic-folded text, longest keyword first. Each match is checked on its
+    own span: a span typed without accents matches accented keywords
+    ("thu 2" -> "thứ 2", also in "đặt bàn thu 2"), while a span typed with
+    accents must match the keyword exactly, so "quá" does not match "qua"
+    and "đó" does not match "đỏ".
+
+    Example:
+        matcher = KeywordMatcher({"color": {"đỏ": "RED"}, "size": {"m": "M"}})
+        matcher.extract("áo đỏ size M")  # {"color": "RED", "size": "M"}
+    """
+
+    def __init__(self, slots: Dict[str, Dict[str, Any]]):
+        self.slots = slots
+        self._candidates: Dict[str, List[tuple]] = {}
+
+        for slot, keywords in slots.items():
+            for keyword, value in keywords.items():
+                keyword = unicodedata.normalize("NFC", keyword.lower())
+                folded = fold_diacritics(keyword)
+                self._candidates.setdefault(folded, []).append((slot, value, keyword))
+
+        alternation = "|".join(
+            re.escape(folded)
+            for folded in sorted(self._candidates, key=len, reverse=True)
+        )
+        self._pattern = re.compile(rf"\b(?:{alternation})\b")
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """Return every keyword match in text, in order of appearance."""
+        if not text:
+            return []
+
+        original = unicodedata.normalize("NFC", text).lower()
+        folded = fold_diacritics(original)
+
+        matches = []
+        for match in self._pattern.finditer(folded):
+            start, end = match.span()
+            span = original[start:end]
+            # Span typed with accents -> the keyword's accents must match exactly
+            unaccented = span == match.group(0)
+            for slot, value, keyword in self._candidates[match.group(0)]:
+                if unaccented or span == keyword:
+                    matches.append(KeywordMatch(slot, value, keyword, start, end))
+        return matches
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """Return the first matched value of each slot found in text."""
+        result = {}
+        for match in self.find_all(text):
+            result.setdefault(match.slot, match.value)
+        return result
+
+    def contains(self, text: str, slot: Optional[str] = None) -> bool:
+        """Check whether text contains any keyword (optionally of a given slot)."""
+        return any(
+            slot is None or match.slot == slot for match in self.find_all(text)
+        )
@@ -0,0 +1,72 @@
+"""
+Lazy module imports
+
+`lazy_import("langchain_openai")` returns a module proxy that imports the
+real module on first attribute access. Views and models keep their heavy
+dependencies (langchain, openai, python-docx, gspread, ...) behind such
+proxies so URL resolution in a fresh gunicorn worker does not load them;
+`manage.py check_import_time` keeps it that way.
+"""
+
+import importlib
+import sys
+import threading
+import types
+
+# Packages a worker must not import before the first request that needs them
+HEAVY_MODULES = (
+    "anthropic",
+    "docx",
+    "google.oauth2",
+    "gspread",
+    "langchain",
+    "langchain_anthropic",
+    "langchain_community",
+    "langchain_core",
+    "langchain_openai",
+    "langchain_postgres",
+    "langchain_text_splitters",
+    "matplotlib",
+    "openai",
+    "pandas",
+    "sqlalchemy",
+    "vnstock",
+)
+
+_import_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _import_lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return `name` if it is already imported, a LazyModule proxy otherwise"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
@@ -1,119 +1,54 @@
 import logging
-import uuid
-from threading import local
-import asyncio
 
-from django.conf import settings
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 
-from django.utils.deprecation import MiddlewareMixin
-from django.utils.functional import cached_property
-
-USER_ATTR_NAME = getattr(settings, "LOCAL_USER_ATTR_NAME", "_current_user")
-REQ_UUID_ATTR_NAME = getattr(settings, "LOCAL_REQ_UUID_ATTR_NAME", "_req_uuid")
-REQ_IP_ATTR_NAME = getattr(settings, "LOCAL_REQ_IP_ATTR_NAME", "_req_ip")
-REQ_USER_AGENT_ATTR_NAME = getattr(
-    settings, "LOCAL_REQ_USER_AGENT_ATTR_NAME", "_req_user_agent"
+from common.utils.request_context import (
+    RequestContext,
+    get_request_context,
+    new_request_id,
+    reset_request_context,
+    resolve_user_id,
+    set_request_context,
 )
 
-
 logger = logging.getLogger(__name__)
 
-_thread_locals = local()
-
-
-def _do_set_current_user(user_fun):
-    setattr(_thread_locals, USER_ATTR_NAME, user_fun.__get__(user_fun, local))
-
-
-def _do_del_current_user():
-    delattr(_thread_locals, USER_ATTR_NAME)
-
-
-def _do_set_req_uuid(request_uuid):
-    setattr(_thread_locals, REQ_UUID_ATTR_NAME, request_uuid)
-
-
-def _do_set_req_ip(request_ip):
-    setattr(_thread_locals, REQ_IP_ATTR_NAME, request_ip)
-
-
-def _do_del_req_uuid():
-    req_uuid = getattr(_thread_locals, REQ_UUID_ATTR_NAME, None)
-
-    if req_uuid is not None:
-        delattr(_thread_locals, REQ_UUID_ATTR_NAME)
-
-
-def _do_del_req_ip():
-    req_ip = getattr(_thread_locals, REQ_IP_ATTR_NAME, None)
-
-    if req_ip is not None:
-        delattr(_thread_locals, REQ_IP_ATTR_NAME)
-
-
-def _do_set_req_user_agent(request_user_agent):
-    setattr(_thread_locals, REQ_USER_AGENT_ATTR_NAME, request_user_agent)
-
-
-def _do_del_req_user_agent():
-    delattr(_thread_locals, REQ_USER_AGENT_ATTR_NAME)
-
 
 def get_current_user():
-    current_user = getattr(_thread_locals, USER_ATTR_NAME, None)
-    if callable(current_user):
-        return current_user()
-    return current_user
+    context = get_request_context()
+    return context.user if context else None
 
 
 def get_req_uuid():
-    req_uuid = getattr(_thread_locals, REQ_UUID_ATTR_NAME, None)
-    return req_uuid
+    context = get_request_context()
+    return context.request_id if context else None
 
 
 def get_request_ip():
-    req_ip = getattr(_thread_locals, REQ_IP_ATTR_NAME, None)
-    return req_ip
+    context = get_request_context()
+    return context.ip if context else None
 
 
 def get_req_user_agent():
-    req_user_agent = getattr(_thread_locals, REQ_USER_AGENT_ATTR_NAME, None)
-    return req_user_agent
+    context = get_request_context()
+    return context.user_agent if context else None
 
 
-class CorrelationMiddleware(MiddlewareMixin):
-    def __init__(self, get_response=None):
-        self.get_response = get_response
-        super().__init__(get_response)
-
-    @classmethod
-    def get_model_class(cls):
-        from django.contrib.sessions.models import Session
+class CorrelationMiddleware:
+    """
+    Open a RequestContext (request id, client IP, lazy user, DB stats) for the
+    request and log its start and end. The END line carries the timing as
+    structured fields (duration_ms, db_ms, db_queries, status, user_id).
+    For streaming responses the timing stops when streaming starts.
+    """
 
-        return Session
+    sync_capable = True
+    async_capable = True
 
-    @cached_property
-    def model(self):
-        return self.get_model_class()
-
-    @classmethod
-    def get_user_model_class(cls):
-        from django.contrib.auth import get_user_model
-
-        return get_user_model()
-
-    @cached_property
-    def user_model(self):
-        return self.get_user_model_class()
-
-    def _get_admin(self, request):
-        session_key = request.session.session_key
-        if session_key:
-            session = self.model.objects.get(session_key=session_key)
-            uid = session.get_decoded().get("_auth_user_id")
-            user = self.user_model.objects.get(pk=uid)
-            return user
-        return None
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __get_client_info_from_request(self, request):
         x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
@@ -126,36 +61,65 @@ class CorrelationMiddleware(MiddlewareMixin):
 
         return ip, user_agent
 
-    def process_request(self, request):
-        req_uuid = uuid.uuid4()
-        req_ip, req_user_agent = self.__get_client_info_from_request(request)
-        _do_set_req_uuid(req_uuid)
-        _do_set_req_ip(req_ip)
-        _do_set_req_user_agent(req_user_agent)
+    def _start(self, request):
+        ip, user_agent = self.__get_client_info_from_request(request)
+        context = RequestContext(
+            request_id=request.META.get("HTTP_X_REQUEST_ID", "")[:64] or new_request_id(),
+            ip=ip,
+            user_agent=user_agent,
+            user_loader=lambda: getattr(request, "user", None),
+        )
+        token = set_request_context(context)
         logger.info(f'START "{request.path} {request.method}"')
-        _do_set_current_user(lambda self: getattr(request, "user", None))
-
-    def process_response(self, request, response):
-        current_user = request.user
+        return context, token
+
+    def _finish(self, request, response, context):
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(context.elapsed_ms(), 1),
+            "db_ms": round(context.db_time * 1000, 1),
+            "db_queries": context.db_queries,
+            "user_id": resolve_user_id(request),
+        }
         logger.info(
-            f'END "{request.path} {response.status_code}" user_logged={current_user}'
+            f'END "{request.path} {response.status_code}" user_id={fields["user_id"]} '
+            f'duration_ms={fields["duration_ms"]} db_ms={fields["db_ms"]} db_queries={fields["db_queries"]}',
+            extra=fields,
         )
-        _do_del_current_user()
-        _do_del_req_uuid()
-        _do_del_req_ip()
-        _do_del_req_user_agent()
-        return response
+        response["X-Request-ID"] = context.request_id
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        context, token = self._start(request)
+        try:
+            response = self.get_response(request)
+            self._finish(request, response, context)
+            return response
+        finally:
+            reset_request_context(token)
+
+    async def __acall__(self, request):
+        context, token = self._start(request)
+        try:
+            response = await self.get_response(request)
+            self._finish(request, response, context)
+            return response
+        finally:
+            reset_request_context(token)
 
 
 class RequestUuidFilter(logging.Filter):
     def filter(self, record):
-        req_uuid = getattr(_thread_locals, REQ_UUID_ATTR_NAME, "")
+        # Records logged off the request thread may carry the UUID via `extra`
+        req_uuid = getattr(record, "req_uuid", None) or get_req_uuid() or ""
         record.req_uuid = req_uuid
         return True
 
 
 class RequestIPFilter(logging.Filter):
     def filter(self, record):
-        req_ip = getattr(_thread_locals, REQ_IP_ATTR_NAME, "")
-        record.req_ip = req_ip
+        record.req_ip = get_request_ip() or ""
         return True
@@ -0,0 +1,140 @@
+"""
+Request context - per-request state kept in a ContextVar
+
+CorrelationMiddleware opens a RequestContext for every request. Because it
+lives in a ContextVar it follows the request through async views and
+sync_to_async calls, which thread-locals do not. The user is resolved lazily:
+nothing authenticates or queries just to tag a log line. The database time
+and query count of the request are collected by an execute wrapper that
+every connection gets when it is opened.
+"""
+
+import itertools
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.utils.functional import empty
+
+# Request ids: a random per-process prefix plus a counter (unique, no uuid4 per request)
+_REQUEST_ID_PREFIX = os.urandom(4).hex()
+_request_counter = itertools.count(1)
+
+
+def new_request_id() -> str:
+    return f"{_REQUEST_ID_PREFIX}-{next(_request_counter):x}"
+
+
+@dataclass
+class RequestContext:
+    request_id: str
+    ip: Optional[str] = None
+    user_agent: str = ""
+    started: float = field(default_factory=time.perf_counter)
+    db_time: float = 0.0
+    db_queries: int = 0
+    # Returns request.user; only called when something needs the user
+    user_loader: Optional[Callable[[], Any]] = None
+
+    @property
+    def user(self):
+        return self.user_loader() if self.user_loader else None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+_request_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def get_request_context() -> Optional[RequestContext]:
+    return _request_context.get()
+
+
+def set_request_context(context: Optional[RequestContext]):
+    """Make `context` current; returns the token for reset_request_context()"""
+    return _request_context.set(context)
+
+
+def reset_request_context(token):
+    _request_context.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper: add the query's time to the current request"""
+    request_context = _request_context.get()
+    if request_context is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_context.db_time += time.perf_counter() - started
+        request_context.db_queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver: wrap every new connection once"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# Session users
+
+def _session_user_cache():
+    from common.cache.tiered import get_tiered_cache
+
+    return get_tiered_cache("session_users", default_timeout=settings.SESSION_USER_CACHE_TTL)
+
+
+def loaded_user(request):
+    """request.user if authentication already ran for this request, else None (never authenticates)"""
+    user = request.__dict__.get("user")
+    if user is None:
+        return None
+    # AuthenticationMiddleware sets a SimpleLazyObject; DRF replaces it with the user it authenticated
+    wrapped = getattr(user, "_wrapped", user)
+    return None if wrapped is empty else wrapped
+
+
+def resolve_user_id(request) -> Optional[str]:
+    """
+    Id of the request's user for logging, without authenticating the request.
+
+    Uses the user already loaded by the view, else the session's user
+    (session key -> user id, cached SESSION_USER_CACHE_TTL seconds so the
+    session row is read once). JWT-only requests that never authenticated
+    log no user.
+    """
+    user = loaded_user(request)
+    if user is not None:
+        return str(user.pk) if getattr(user, "is_authenticated", False) else None
+
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not session_key or not hasattr(request, "session"):
+        return None
+    cache = _session_user_cache()
+    user_id = cache.get(session_key)
+    if user_id is None:
+        # "" marks an anonymous session so it is not read again
+        user_id = request.session.get(SESSION_KEY) or ""
+        cache.set(session_key, user_id)
+    return user_id or None
+
+
+def remember_session_user(sender, request, user, **kwargs):
+    """user_logged_in receiver: prime the session -> user cache"""
+    session_key = getattr(getattr(request, "session", None), "session_key", None)
+    if session_key:
+        _session_user_cache().set(session_key, str(user.pk))
+
+
+def forget_session_user(sender, request, user, **kwargs):
+    """user_logged_out receiver (runs before the session is flushed)"""
+    session_key = getattr(getattr(request, "session", None), "session_key", None)
+    if session_key:
+        _session_user_cache().delete(session_key)
@@ -0,0 +1,143 @@
+"""
+Tool output formatting - compact results for the LLM, rich tables for the user
+
+Everything a tool returns is re-sent to the model on every later agent
+iteration, so list-style tools return one page of compact rows
+(AGENT_TOOL_MAX_ROWS) with the total count and a `next_page_token` for the
+following page, as a pipe-separated table or compact JSON
+(AGENT_TOOL_OUTPUT_FORMAT). When the tool has a stream queue, up to
+AGENT_TOOL_RENDER_MAX_ROWS rows are also sent to the UI as a typed
+`extra_data` table ({"kind": "table", "title", "columns", "rows"}, drawn by
+the frontend's DataTableExtraData) from the same query, so the model can
+summarise instead of repeating them. The untyped [header, *rows] payload is
+the work-time table of get_project_work_time, whose last cell is a nested
+task table.
+"""
+
+import json
+from dataclasses import dataclass, field
+from queue import Queue
+from typing import Any, Callable, List, Optional, Sequence
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+
+@dataclass
+class Page:
+    rows: List[Sequence[Any]]
+    total: int
+    offset: int
+    next_page_token: Optional[str]
+    # Rows fetched past the page for the user-facing table
+    extra_rows: List[Sequence[Any]] = field(default_factory=list)
+
+
+def _offset(page_token) -> int:
+    try:
+        return max(int(page_token or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def paginate(rows, page_token: Optional[str] = None, limit: Optional[int] = None, fetch: int = 0) -> Page:
+    """
+    One page of `rows` (a values_list queryset or a list) starting at
+    `page_token`; `fetch` rows are read in the same query when it is larger.
+    """
+    limit = limit or settings.AGENT_TOOL_MAX_ROWS
+    offset = _offset(page_token)
+    total = rows.count() if isinstance(rows, QuerySet) else len(rows)
+    fetched = list(rows[offset:offset + max(limit, fetch)]) if offset < total else []
+    page = fetched[:limit]
+    next_offset = offset + len(page)
+    return Page(
+        rows=page,
+        total=total,
+        offset=offset,
+        next_page_token=str(next_offset) if next_offset < total else None,
+        extra_rows=fetched[limit:],
+    )
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    text = " ".join(str(value).split()).replace("|", "/")
+    max_chars = settings.AGENT_TOOL_MAX_CELL_CHARS
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+
+class ToolOutputFormatter:
+    """
+    Format list results of a tool.
+
+    `table()` returns the compact page for the LLM and, when a queue is
+    given, renders the rows for the user through the `extra_data` event.
+    """
+
+    def __init__(self, queue: Optional[Queue] = None, max_rows: Optional[int] = None, fmt: Optional[str] = None):
+        self.queue = queue
+        self.max_rows = max_rows
+        self.fmt = fmt
+
+    def render(self, title: str, columns: Sequence[str], rows: List[Sequence[Any]]) -> bool:
+        """Send a table to the UI; returns False when there is no queue to send it on"""
+        if self.queue is None or not rows:
+            return False
+        table = {"kind": "table", "title": title, "columns": list(columns), "rows": rows}
+        self.queue.put({"type": "extra_data", "content": json.dumps(table, ensure_ascii=False, default=str)})
+        return True
+
+    def table(
+        self,
+        title: str,
+        columns: Sequence[str],
+        rows,
+        page_token: Optional[str] = None,
+        transform: Optional[Callable[[Sequence[Any]], Sequence[Any]]] = None,
+        ui_columns: Optional[Sequence[str]] = None,
+    ) -> str:
+        """
+        Page `rows` and format them for the LLM.
+
+        `transform` maps each fetched row (e.g. ids to names); `ui_columns`
+        is the user-facing header when it differs from the compact one.
+        """
+        fetch = settings.AGENT_TOOL_RENDER_MAX_ROWS if self.queue is not None else 0
+        page = paginate(rows, page_token, self.max_rows, fetch)
+        if not page.rows:
+            return f"{title}: {page.total} rows, none from offset {page.offset}"
+        if transform:
+            page.rows = [transform(row) for row in page.rows]
+            page.extra_rows = [transform(row) for row in page.extra_rows]
+
+        rendered = self.render(title, ui_columns or columns, [list(row) for row in page.rows + page.extra_rows])
+        return self.format(title, columns, page, rendered)
+
+    def format(self, title: str, columns: Sequence[str], page: Page, rendered: bool = False) -> str:
+        fmt = self.fmt or settings.AGENT_TOOL_OUTPUT_FORMAT
+        if fmt == "json":
+            return json.dumps(
+                {
+                    "title": title,
+                    "total": page.total,
+                    "offset": page.offset,
+                    "next_page_token": page.next_page_token,
+                    "shown_to_user": rendered,
+                    "columns": list(columns),
+                    "rows": [[_cell(value) for value in row] for row in page.rows],
+                },
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+
+        summary = f"{title}: {page.total} rows, showing {page.offset + 1}-{page.offset + len(page.rows)}"
+        if page.next_page_token:
+            summary += f"; next_page_token={page.next_page_token}"
+        if rendered:
+            summary += "; the rows are shown to the user as a table, summarise instead of listing them"
+        lines = [summary, "|".join(columns)]
+        lines.extend("|".join(_cell(value) for value in row) for row in page.rows)
+        return "\n".join(lines)
+
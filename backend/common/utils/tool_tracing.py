@@ -0,0 +1,195 @@
+"""
+Tracing of agent tool calls
+
+`trace_tools()` wraps the tools returned by the services' create_tools()
+so every call records its wall time, the SQL it ran (through
+connection.execute_wrapper), the size of the returned payload and the
+exception it swallowed into its answer, if any. Traces are logged (slow
+calls as warnings) and, when TOOL_TRACE_FILE is set, appended as JSON lines
+that `manage.py replay_tool_calls` can replay and rank.
+"""
+
+import functools
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from common.utils.middleware import get_req_uuid
+
+logger = logging.getLogger(__name__)
+
+# Answers the tools build from a caught exception ("Error ...: {e}", "Lỗi ...", "❌ ...")
+SWALLOWED_ERROR_PATTERN = re.compile(r"^\s*(?:❌|error\b|lỗi\b|có lỗi)", re.IGNORECASE)
+
+# Longest SQL statement text kept for the slowest query of a call
+SQL_TEXT_LIMIT = 500
+
+
+@dataclass
+class ToolTrace:
+    tool: str
+    args: List[Any]
+    kwargs: Dict[str, Any]
+    started_at: str
+    request_uuid: Optional[str] = None
+    wall_ms: float = 0.0
+    sql_count: int = 0
+    sql_ms: float = 0.0
+    slowest_sql: Optional[str] = None
+    slowest_sql_ms: float = 0.0
+    payload_chars: int = 0
+    error: Optional[str] = None
+    raised: bool = False
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False, default=str)
+
+
+@dataclass
+class SqlRecorder:
+    """connection.execute_wrapper callback counting and timing the queries of one call"""
+
+    count: int = 0
+    seconds: float = 0.0
+    slowest_sql: Optional[str] = None
+    slowest_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.count += 1
+                self.seconds += elapsed
+                if elapsed > self.slowest_seconds:
+                    self.slowest_seconds = elapsed
+                    self.slowest_sql = sql[:SQL_TEXT_LIMIT]
+
+
+class ToolTraceRecorder:
+    """Log every trace and append it to `path` (JSON lines) when configured"""
+
+    def __init__(self, path: Optional[str] = None, slow_ms: Optional[float] = None):
+        self.path = path if path is not None else getattr(settings, "TOOL_TRACE_FILE", None)
+        self.slow_ms = slow_ms if slow_ms is not None else getattr(settings, "TOOL_TRACE_SLOW_MS", 1000)
+        self._lock = threading.Lock()
+
+    def record(self, trace: ToolTrace):
+        summary = (
+            f"Tool {trace.tool}: {trace.wall_ms:.1f}ms, {trace.sql_count} queries "
+            f"({trace.sql_ms:.1f}ms), {trace.payload_chars} chars"
+        )
+        if trace.error:
+            summary += f", error: {trace.error}"
+        log = logger.warning if trace.wall_ms >= self.slow_ms or trace.error else logger.debug
+        log(summary, extra={"req_uuid": trace.request_uuid or ""})
+
+        if self.path:
+            with self._lock, open(self.path, "a", encoding="utf-8") as file:
+                file.write(trace.to_json() + "\n")
+
+
+class ToolTraceCollector:
+    """Recorder that keeps traces in memory (used by the replay command)"""
+
+    def __init__(self):
+        self.traces: List[ToolTrace] = []
+        self._lock = threading.Lock()
+
+    def record(self, trace: ToolTrace):
+        with self._lock:
+            self.traces.append(trace)
+
+
+# Global instance
+_tool_trace_recorder = None
+
+
+def get_tool_trace_recorder():
+    """Get singleton instance of ToolTraceRecorder"""
+    global _tool_trace_recorder
+
+    if _tool_trace_recorder is None:
+        _tool_trace_recorder = ToolTraceRecorder()
+
+    return _tool_trace_recorder
+
+
+@contextmanager
+def capture_tool_traces():
+    """Send traces to an in-memory collector instead of the log/trace file"""
+    global _tool_trace_recorder
+
+    previous = _tool_trace_recorder
+    collector = ToolTraceCollector()
+    _tool_trace_recorder = collector
+    try:
+        yield collector
+    finally:
+        _tool_trace_recorder = previous
+
+
+def _trace_call(name: str, func):
+    @functools.wraps(func)
+    def traced(*args, **kwargs):
+        req_uuid = get_req_uuid()
+        trace = ToolTrace(
+            tool=name,
+            args=list(args),
+            kwargs={key: value for key, value in kwargs.items() if key not in ("callbacks", "run_manager")},
+            started_at=timezone.now().isoformat(),
+            request_uuid=str(req_uuid) if req_uuid else None,
+        )
+        sql = SqlRecorder()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(sql):
+                result = func(*args, **kwargs)
+        except Exception as e:
+            trace.error = f"{type(e).__name__}: {e}"
+            trace.raised = True
+            raise
+        else:
+            text = result if isinstance(result, str) else str(result)
+            trace.payload_chars = len(text)
+            if SWALLOWED_ERROR_PATTERN.match(text):
+                trace.error = text.strip()[:SQL_TEXT_LIMIT]
+            return result
+        finally:
+            trace.wall_ms = (time.perf_counter() - started) * 1000
+            trace.sql_count = sql.count
+            trace.sql_ms = sql.seconds * 1000
+            trace.slowest_sql = sql.slowest_sql
+            trace.slowest_sql_ms = sql.slowest_seconds * 1000
+            try:
+                get_tool_trace_recorder().record(trace)
+            except Exception as e:
+                logger.error(f"Failed to record trace of tool {name}: {e}")
+
+    traced.__tool_traced__ = True
+    return traced
+
+
+def trace_tool(tool):
+    """Copy of a StructuredTool/Tool whose function is traced"""
+    func = getattr(tool, "func", None)
+    if func is None or getattr(func, "__tool_traced__", False):
+        return tool
+    # Copy: @tool-decorated staticmethods are shared class attributes
+    return tool.model_copy(update={"func": _trace_call(tool.name, func)})
+
+
+def trace_tools(tools):
+    return [trace_tool(tool) for tool in tools]
@@ -0,0 +1,34 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+from prometheus_client import multiprocess
+
+from common.services.db_pool import update_pool_metrics
+
+
+def _can_scrape(request) -> bool:
+    """Staff user, PROMETHEUS_METRICS_TOKEN bearer token or PROMETHEUS_METRICS_ALLOWED_IPS"""
+    token = settings.PROMETHEUS_METRICS_TOKEN
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+    if token and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        return True
+    if request.META.get("REMOTE_ADDR") in settings.PROMETHEUS_METRICS_ALLOWED_IPS:
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_authenticated and user.is_staff)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint (LLM metrics, see common.services.llm_metrics)"""
+    if not _can_scrape(request):
+        return HttpResponseForbidden()
+    update_pool_metrics()
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # gunicorn workers each write to the shared directory; aggregate them
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -1,3 +1,67 @@
 from django.contrib import admin
+from .models import Category, Product, SheetExport
 
-# Register your models here.
+
+class FinalPriceRangeFilter(admin.SimpleListFilter):
+    """Filter products by final price (uses the final_price column)"""
+    title = 'Giá bán'
+    parameter_name = 'final_price_range'
+
+    RANGES = {
+        'lt_200k': (None, 200000),
+        '200k_500k': (200000, 500000),
+        '500k_1m': (500000, 1000000),
+        'gte_1m': (1000000, None),
+    }
+
+    def lookups(self, request, model_admin):
+        return (
+            ('lt_200k', 'Dưới 200.000đ'),
+            ('200k_500k', '200.000đ - 500.000đ'),
+            ('500k_1m', '500.000đ - 1.000.000đ'),
+            ('gte_1m', 'Từ 1.000.000đ'),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() not in self.RANGES:
+            return queryset
+        min_price, max_price = self.RANGES[self.value()]
+        if min_price is not None:
+            queryset = queryset.filter(final_price__gte=min_price)
+        if max_price is not None:
+            queryset = queryset.filter(final_price__lt=max_price)
+        return queryset
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'order', 'is_active', 'created_at']
+    list_filter = ['is_active']
+    search_fields = ['name']
+    ordering = ['order', 'name']
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'name', 'category', 'product_type', 'size', 'color',
+        'price', 'discount_price', 'final_price', 'stock', 'is_active'
+    ]
+    list_filter = [
+        'is_active', 'product_type', 'size', 'color', 'category', FinalPriceRangeFilter
+    ]
+    search_fields = ['name', 'material']
+    list_select_related = ['category']
+    readonly_fields = ['final_price', 'created_at', 'updated_at']
+    ordering = ['order', '-created_at']
+
+
+@admin.register(SheetExport)
+class SheetExportAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'order_code', 'kind', 'status', 'attempts', 'row_number',
+        'next_attempt_at', 'exported_at', 'created_at'
+    ]
+    list_filter = ['kind', 'status']
+    search_fields = ['order_code']
+    readonly_fields = ['order', 'row', 'row_number', 'exported_at', 'last_error', 'created_at', 'updated_at']
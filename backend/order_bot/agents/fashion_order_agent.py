@@ -1,11 +1,43 @@
 from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.memory import ConversationBufferMemory
+from langchain_core.callbacks import BaseCallbackHandler
 from common.services.llm_service import get_llm_service, LLMProvider
+from common.services.llm_metrics import LLMMetricsCallbackHandler
 from queue import Queue
 from order_bot.agents.products import ProductsService
 from order_bot.agents.orders import OrdersService
+from order_bot.agents.product_keywords import PRODUCT_MATCHER
 from datetime import datetime
+import re
+
+
+# Patterns compiled once at import instead of on every message
+QUANTITY_PATTERN = re.compile(r'(\d+)\s*(cái|chiếc|món|sản phẩm)?')
+PHONE_PATTERN = re.compile(r'0\d{9,10}|\+84\d{9,10}')
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+NAME_PATTERNS = [
+    re.compile(r'tên\s+(?:là\s+|:|)\s*([a-zA-ZÀ-ỹ\s]{2,50})', re.IGNORECASE),
+    re.compile(r'(?:tôi|mình)\s+là\s+([a-zA-ZÀ-ỹ\s]{2,50})', re.IGNORECASE),
+    re.compile(r'họ\s+tên\s+(?:là\s+|:|)\s*([a-zA-ZÀ-ỹ\s]{2,50})', re.IGNORECASE),
+]
+ADDRESS_PATTERNS = [
+    re.compile(r'địa\s+chỉ\s+(?:là\s+|:|)\s*(.+)', re.IGNORECASE),
+    re.compile(r'giao\s+(?:hàng\s+)?(?:tới|đến|về)\s+(.+)', re.IGNORECASE),
+    re.compile(r'(?:ở|tại)\s+(.{5,})', re.IGNORECASE),
+]
+TRAILING_PARTICLE_PATTERN = re.compile(r'\s+(ạ|nhé|nha|à|ơi)$', re.IGNORECASE)
+
+
+class StreamingCallbackHandler(BaseCallbackHandler):
+    """Custom callback handler for streaming responses"""
+    
+    def __init__(self, queue):
+        self.queue = queue
+    
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        """Run on new LLM token. Only available when streaming is enabled."""
+        self.queue.put(token)
 
 
 class FashionOrderAgent:
@@ -31,8 +63,11 @@ class FashionOrderAgent:
             temperature=0.3,
             max_tokens=512,
             streaming=True,
+            stream_usage=True,
             callbacks=self.callbacks,
         )
+        # Đo latency/token/tool của mỗi lượt chạy agent
+        self.metrics_handler = LLMMetricsCallbackHandler("fashion_order_agent")
 
         # Initialize collected information tracking
         self.collected_info = {
@@ -201,104 +236,23 @@ class FashionOrderAgent:
         else:
             enhanced_input = user_input
         
-        return self.agent.invoke({"input": enhanced_input})
+        return self.agent.invoke(
+            {"input": enhanced_input}, config={"callbacks": [self.metrics_handler]}
+        )
     
     def _extract_info_from_input(self, user_input: str):
         """Extract structured information from user input"""
         user_lower = user_input.lower()
         
-        # === EXTRACT PRODUCT TYPE ===
-        product_type_map = {
-            'áo thun': 'T_SHIRT',
-            'ao thun': 'T_SHIRT',
-            'thun': 'T_SHIRT',
-            'áo sơ mi': 'SHIRT',
-            'ao so mi': 'SHIRT',
-            'sơ mi': 'SHIRT',
-            'so mi': 'SHIRT',
-            'áo khoác': 'JACKET',
-            'ao khoac': 'JACKET',
-            'khoác': 'JACKET',
-            'khoac': 'JACKET',
-            'hoodie': 'HOODIE',
-            'áo len': 'SWEATER',
-            'ao len': 'SWEATER',
-            'quần jean': 'JEANS',
-            'quan jean': 'JEANS',
-            'jean': 'JEANS',
-            'quần tây': 'PANTS',
-            'quan tay': 'PANTS',
-            'quần short': 'SHORTS',
-            'quan short': 'SHORTS',
-            'short': 'SHORTS',
-            'váy': 'DRESS',
-            'vay': 'DRESS',
-            'đầm': 'DRESS',
-            'dam': 'DRESS',
-            'chân váy': 'SKIRT',
-            'chan vay': 'SKIRT',
-            'giày': 'SHOES',
-            'giay': 'SHOES',
-        }
-        
-        if not self.collected_info['product_type']:
-            for keyword, ptype in product_type_map.items():
-                if keyword in user_lower:
-                    self.collected_info['product_type'] = ptype
-                    break
-        
-        # === EXTRACT SIZE ===
-        import re
-        size_pattern = r'\b(xs|s|m|l|xl|xxl|xxxl|free[\s_-]?size)\b'
-        size_match = re.search(size_pattern, user_lower)
-        if size_match and not self.collected_info['size']:
-            size = size_match.group(1).upper().replace(' ', '_').replace('-', '_')
-            if 'FREE' in size:
-                size = 'FREE_SIZE'
-            self.collected_info['size'] = size
-        
-        # === EXTRACT COLOR ===
-        color_map = {
-            'đen': 'BLACK',
-            'den': 'BLACK',
-            'đen': 'BLACK',
-            'trắng': 'WHITE',
-            'trang': 'WHITE',
-            'trắng': 'WHITE',
-            'xám': 'GRAY',
-            'xam': 'GRAY',
-            'đỏ': 'RED',
-            'do': 'RED',
-            'đỏ': 'RED',
-            'xanh dương': 'BLUE',
-            'xanh duong': 'BLUE',
-            'xanh': 'BLUE',
-            'navy': 'NAVY',
-            'xanh navy': 'NAVY',
-            'xanh lá': 'GREEN',
-            'xanh la': 'GREEN',
-            'vàng': 'YELLOW',
-            'vang': 'YELLOW',
-            'hồng': 'PINK',
-            'hong': 'PINK',
-            'cam': 'ORANGE',
-            'tím': 'PURPLE',
-            'tim': 'PURPLE',
-            'nâu': 'BROWN',
-            'nau': 'BROWN',
-            'be': 'BEIGE',
-            'màu be': 'BEIGE',
-        }
-        
-        if not self.collected_info['color']:
-            for keyword, color in color_map.items():
-                if keyword in user_lower:
-                    self.collected_info['color'] = color
-                    break
+        # === EXTRACT PRODUCT TYPE / SIZE / COLOR ===
+        # One pass over the message with the precompiled keyword matcher
+        slots = PRODUCT_MATCHER.extract(user_input)
+        for slot in ('product_type', 'size', 'color'):
+            if slot in slots and not self.collected_info[slot]:
+                self.collected_info[slot] = slots[slot]
         
         # === EXTRACT QUANTITY ===
-        quantity_pattern = r'(\d+)\s*(cái|chiếc|món|sản phẩm)?'
-        quantity_match = re.search(quantity_pattern, user_lower)
+        quantity_match = QUANTITY_PATTERN.search(user_lower)
         if quantity_match:
             try:
                 qty = int(quantity_match.group(1))
@@ -308,51 +262,37 @@ class FashionOrderAgent:
                 pass
         
         # === EXTRACT PHONE NUMBER ===
-        phone_pattern = r'0\d{9,10}|\+84\d{9,10}'
-        phone_match = re.search(phone_pattern, user_input)
+        phone_match = PHONE_PATTERN.search(user_input)
         if phone_match and not self.collected_info['customer_phone']:
             self.collected_info['customer_phone'] = phone_match.group(0)
         
         # === EXTRACT NAME ===
         # Nếu câu chứa "tên là" hoặc "tôi là" hoặc "mình là"
-        name_patterns = [
-            r'tên\s+(?:là\s+|:|)\s*([a-zA-ZÀ-ỹ\s]{2,50})',
-            r'(?:tôi|mình)\s+là\s+([a-zA-ZÀ-ỹ\s]{2,50})',
-            r'họ\s+tên\s+(?:là\s+|:|)\s*([a-zA-ZÀ-ỹ\s]{2,50})',
-        ]
-        
         if not self.collected_info['customer_name']:
-            for pattern in name_patterns:
-                match = re.search(pattern, user_input, re.IGNORECASE)
+            for pattern in NAME_PATTERNS:
+                match = pattern.search(user_input)
                 if match:
                     name = match.group(1).strip()
                     # Clean up name (remove trailing words)
-                    name = re.sub(r'\s+(ạ|nhé|nha|à|ơi)$', '', name, flags=re.IGNORECASE)
+                    name = TRAILING_PARTICLE_PATTERN.sub('', name)
                     if len(name) >= 2:
                         self.collected_info['customer_name'] = name
                         break
         
         # === EXTRACT EMAIL ===
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, user_input)
+        email_match = EMAIL_PATTERN.search(user_input)
         if email_match and not self.collected_info['customer_email']:
             self.collected_info['customer_email'] = email_match.group(0)
         
         # === EXTRACT ADDRESS ===
         # Nếu câu chứa "địa chỉ" hoặc patterns địa chỉ
-        address_patterns = [
-            r'địa\s+chỉ\s+(?:là\s+|:|)\s*(.+)',
-            r'giao\s+(?:hàng\s+)?(?:tới|đến|về)\s+(.+)',
-            r'(?:ở|tại)\s+(.{5,})',
-        ]
-        
         if not self.collected_info['customer_address']:
-            for pattern in address_patterns:
-                match = re.search(pattern, user_input, re.IGNORECASE)
+            for pattern in ADDRESS_PATTERNS:
+                match = pattern.search(user_input)
                 if match:
                     address = match.group(1).strip()
                     # Clean up address
-                    address = re.sub(r'\s+(ạ|nhé|nha|à|ơi)$', '', address, flags=re.IGNORECASE)
+                    address = TRAILING_PARTICLE_PATTERN.sub('', address)
                     if len(address) >= 5:
                         self.collected_info['customer_address'] = address
                         break
@@ -1,10 +1,12 @@
 from langchain.tools import tool
 from order_bot.models.order import Order, OrderItem
 from order_bot.models.product import Product
+from order_bot.services.sheets_export import enqueue_order_export
 from typing import Optional
 from django.db import transaction
 from decimal import Decimal
 import logging
+from common.utils.tool_tracing import trace_tools
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +40,9 @@ class OrdersService:
         Returns:
             Thông tin đơn hàng đã tạo hoặc thông báo lỗi
         """
+        if quantity < 1:
+            return "Số lượng phải lớn hơn 0."
+
         try:
             with transaction.atomic():
                 # Get product
@@ -74,38 +79,8 @@ class OrdersService:
                 product.stock -= quantity
                 product.save()
                 
-                # Write to Google Sheets (if enabled)
-                try:
-                    from order_bot.services.google_sheets_service import get_google_sheets_service
-                    
-                    sheets_service = get_google_sheets_service()
-                    if sheets_service:
-                        order_item = OrderItem.objects.filter(order=order).first()
-                        sheets_data = {
-                            'code': order.code,
-                            'created_at': order.created_at,
-                            'customer_name': order.customer_name,
-                            'customer_phone': order.customer_phone,
-                            'customer_email': order.customer_email or '',
-                            'customer_address': order.customer_address,
-                            'product_name': product.name,
-                            'product_size': product.get_size_display(),
-                            'product_color': product.get_color_display(),
-                            'quantity': quantity,
-                            'price': product.final_price,
-                            'shipping_fee': order.shipping_fee,
-                            'total_amount': order.total_amount,
-                            'status': order.get_status_display(),
-                            'notes': order.notes or ''
-                        }
-                        
-                        if sheets_service.write_order(sheets_data):
-                            logger.info(f"Order {order.code} written to Google Sheets")
-                        else:
-                            logger.warning(f"Failed to write order {order.code} to Google Sheets")
-                except Exception as e:
-                    logger.error(f"Error writing to Google Sheets: {e}")
-                    # Don't fail the order creation if Sheets write fails
+                # Xuất lên Google Sheets qua outbox, worker sẽ ghi theo lô
+                enqueue_order_export(order, product, quantity)
                 
                 result = f"Đơn hàng đã được tạo thành công!\n\n"
                 result += f"Mã đơn hàng: {order.code}\n"
@@ -231,8 +206,8 @@ class OrdersService:
     
     def create_tools(self):
         """Create list of tools for the agent"""
-        return [
+        return trace_tools([
             self.create_order,
             self.summary_order_info,
             self.get_order_detail,
-        ]
+        ])
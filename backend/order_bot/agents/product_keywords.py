@@ -0,0 +1,66 @@
+from common.utils.keyword_matcher import KeywordMatcher
+
+# Từ khóa loại sản phẩm -> Product.ProductType
+PRODUCT_TYPE_KEYWORDS = {
+    'áo thun': 'T_SHIRT',
+    'thun': 'T_SHIRT',
+    'áo sơ mi': 'SHIRT',
+    'sơ mi': 'SHIRT',
+    'áo khoác': 'JACKET',
+    'khoác': 'JACKET',
+    'hoodie': 'HOODIE',
+    'áo len': 'SWEATER',
+    'quần jean': 'JEANS',
+    'jean': 'JEANS',
+    'jeans': 'JEANS',
+    'quần tây': 'PANTS',
+    'quần short': 'SHORTS',
+    'short': 'SHORTS',
+    'shorts': 'SHORTS',
+    'váy': 'DRESS',
+    'đầm': 'DRESS',
+    'chân váy': 'SKIRT',
+    'giày': 'SHOES',
+}
+
+# Từ khóa kích cỡ -> Product.SizeType
+SIZE_KEYWORDS = {
+    'xs': 'XS',
+    's': 'S',
+    'm': 'M',
+    'l': 'L',
+    'xl': 'XL',
+    'xxl': 'XXL',
+    'xxxl': 'XXXL',
+    'free size': 'FREE_SIZE',
+    'free-size': 'FREE_SIZE',
+    'free_size': 'FREE_SIZE',
+    'freesize': 'FREE_SIZE',
+}
+
+# Từ khóa màu sắc -> Product.ColorType
+COLOR_KEYWORDS = {
+    'đen': 'BLACK',
+    'trắng': 'WHITE',
+    'xám': 'GRAY',
+    'đỏ': 'RED',
+    'xanh dương': 'BLUE',
+    'xanh': 'BLUE',
+    'navy': 'NAVY',
+    'xanh navy': 'NAVY',
+    'xanh lá': 'GREEN',
+    'vàng': 'YELLOW',
+    'hồng': 'PINK',
+    'cam': 'ORANGE',
+    'tím': 'PURPLE',
+    'nâu': 'BROWN',
+    'be': 'BEIGE',
+    'màu be': 'BEIGE',
+}
+
+# Biên dịch một lần khi import; không dấu ("ao thun", "den") vẫn khớp
+PRODUCT_MATCHER = KeywordMatcher({
+    'product_type': PRODUCT_TYPE_KEYWORDS,
+    'size': SIZE_KEYWORDS,
+    'color': COLOR_KEYWORDS,
+})
@@ -1,8 +1,7 @@
 from langchain.tools import tool
-from order_bot.models.product import Product
-from order_bot.models.category import Category
+from order_bot.services.product_catalog import get_product_catalog
 from typing import Optional, List
-from django.db.models import Q
+from common.utils.tool_tracing import trace_tools
 
 
 class ProductsService:
@@ -33,35 +32,16 @@ class ProductsService:
             Danh sách sản phẩm phù hợp với tiêu chí tìm kiếm
         """
         
-        # Start with all active products
-        queryset = Product.objects.filter(is_active=True, stock__gt=0)
-        
-        # Apply filters
-        if product_type:
-            queryset = queryset.filter(product_type=product_type)
-        
-        if size:
-            queryset = queryset.filter(size=size)
-        
-        if color:
-            queryset = queryset.filter(color=color)
-        
-        if category_name:
-            queryset = queryset.filter(category__name__icontains=category_name)
-        
-        if max_price:
-            queryset = queryset.filter(
-                Q(discount_price__lte=max_price) | 
-                (Q(discount_price__isnull=True) & Q(price__lte=max_price))
-            )
-        
-        if min_price:
-            queryset = queryset.filter(
-                Q(discount_price__gte=min_price) |
-                (Q(discount_price__isnull=True) & Q(price__gte=min_price))
-            )
-        
-        products = queryset[:10]  # Limit to 10 products
+        # Đọc từ catalog trong bộ nhớ, không truy vấn database
+        products = get_product_catalog().search(
+            product_type=product_type,
+            size=size,
+            color=color,
+            category_name=category_name,
+            max_price=max_price,
+            min_price=min_price,
+            limit=10,
+        )
         
         if not products:
             return "Không tìm thấy sản phẩm phù hợp với yêu cầu."
@@ -70,9 +50,9 @@ class ProductsService:
         for product in products:
             result += f"ID: {product.id}\n"
             result += f"Tên: {product.name}\n"
-            result += f"Loại: {product.get_product_type_display()}\n"
-            result += f"Size: {product.get_size_display()}\n"
-            result += f"Màu: {product.get_color_display()}\n"
+            result += f"Loại: {product.product_type_display}\n"
+            result += f"Size: {product.size_display}\n"
+            result += f"Màu: {product.color_display}\n"
             result += f"Giá: {product.final_price:,.0f} VNĐ\n"
             result += f"Còn {product.stock} sản phẩm\n"
             if product.material:
@@ -93,34 +73,32 @@ class ProductsService:
         Returns:
             Thông tin chi tiết của sản phẩm
         """
-        try:
-            product = Product.objects.get(id=product_id, is_active=True)
-            
-            result = f"Thông tin sản phẩm #{product.id}:\n\n"
-            result += f"Tên: {product.name}\n"
-            result += f"Danh mục: {product.category.name}\n"
-            result += f"Loại: {product.get_product_type_display()}\n"
-            result += f"Size: {product.get_size_display()}\n"
-            result += f"Màu: {product.get_color_display()}\n"
-            
-            if product.discount_price:
-                result += f"Giá gốc: {product.price:,.0f} VNĐ\n"
-                result += f"Giá khuyến mãi: {product.discount_price:,.0f} VNĐ\n"
-            else:
-                result += f"Giá: {product.price:,.0f} VNĐ\n"
-            
-            result += f"Tồn kho: {product.stock} sản phẩm\n"
-            
-            if product.material:
-                result += f"Chất liệu: {product.material}\n"
-            
-            if product.description:
-                result += f"\nMô tả: {product.description}\n"
-            
-            return result
-            
-        except Product.DoesNotExist:
+        product = get_product_catalog().get(product_id)
+        if product is None:
             return f"Không tìm thấy sản phẩm với ID {product_id}"
+        
+        result = f"Thông tin sản phẩm #{product.id}:\n\n"
+        result += f"Tên: {product.name}\n"
+        result += f"Danh mục: {product.category_name}\n"
+        result += f"Loại: {product.product_type_display}\n"
+        result += f"Size: {product.size_display}\n"
+        result += f"Màu: {product.color_display}\n"
+        
+        if product.discount_price:
+            result += f"Giá gốc: {product.price:,.0f} VNĐ\n"
+            result += f"Giá khuyến mãi: {product.discount_price:,.0f} VNĐ\n"
+        else:
+            result += f"Giá: {product.price:,.0f} VNĐ\n"
+        
+        result += f"Tồn kho: {product.stock} sản phẩm\n"
+        
+        if product.material:
+            result += f"Chất liệu: {product.material}\n"
+        
+        if product.description:
+            result += f"\nMô tả: {product.description}\n"
+        
+        return result
     
     @staticmethod
     @tool
@@ -135,19 +113,17 @@ class ProductsService:
         Returns:
             Trạng thái sẵn có của sản phẩm
         """
-        try:
-            product = Product.objects.get(id=product_id, is_active=True)
-            
-            if not product.is_in_stock:
-                return f"Sản phẩm {product.name} hiện đang hết hàng."
-            
-            if product.stock < quantity:
-                return f"Sản phẩm {product.name} chỉ còn {product.stock} sản phẩm, không đủ số lượng {quantity} mà bạn yêu cầu."
-            
-            return f"Sản phẩm {product.name} còn hàng và đủ số lượng {quantity} sản phẩm."
-            
-        except Product.DoesNotExist:
+        product = get_product_catalog().get(product_id)
+        if product is None:
             return f"Không tìm thấy sản phẩm với ID {product_id}"
+        
+        if not product.is_in_stock:
+            return f"Sản phẩm {product.name} hiện đang hết hàng."
+        
+        if product.stock < quantity:
+            return f"Sản phẩm {product.name} chỉ còn {product.stock} sản phẩm, không đủ số lượng {quantity} mà bạn yêu cầu."
+        
+        return f"Sản phẩm {product.name} còn hàng và đủ số lượng {quantity} sản phẩm."
     
     @staticmethod
     @tool
@@ -158,7 +134,7 @@ class ProductsService:
         Returns:
             Danh sách các danh mục
         """
-        categories = Category.objects.filter(is_active=True).order_by('order', 'name')
+        categories = get_product_catalog().get_categories()
         
         if not categories:
             return "Hiện chưa có danh mục sản phẩm nào."
@@ -174,9 +150,9 @@ class ProductsService:
     
     def create_tools(self):
         """Create list of tools for the agent"""
-        return [
+        return trace_tools([
             self.search_products,
             self.get_product_detail,
             self.check_product_availability,
             self.get_categories,
-        ]
+        ])
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OrderBotConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'order_bot'
+
+    def ready(self):
+        from . import signals  # noqa: F401
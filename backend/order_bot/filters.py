@@ -0,0 +1,18 @@
+import django_filters
+from .models import Product
+
+# Filters
+class ProductFilter(django_filters.FilterSet):
+	"""Product listing filters; price range is served by the final_price index"""
+	min_price = django_filters.NumberFilter(field_name='final_price', lookup_expr='gte')
+	max_price = django_filters.NumberFilter(field_name='final_price', lookup_expr='lte')
+	category = django_filters.NumberFilter(field_name='category_id')
+	in_stock = django_filters.BooleanFilter(method='filter_in_stock')
+
+	class Meta:
+		model = Product
+		fields = ['product_type', 'size', 'color', 'category', 'min_price', 'max_price', 'in_stock']
+
+	def filter_in_stock(self, queryset, name, value):
+		return queryset.filter(stock__gt=0) if value else queryset.filter(stock=0)
+
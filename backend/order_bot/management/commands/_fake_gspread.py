@@ -0,0 +1,156 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+A1_PATTERN = re.compile(r'^(?:.*!)?([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?$')
+
+
+def _column_index(letters: str) -> int:
+    """'A' -> 1, 'O' -> 15, 'AA' -> 27"""
+    index = 0
+    for char in letters:
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index
+
+
+def _column_letters(index: int) -> str:
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def _parse_a1(a1_range: str) -> Tuple[int, int, int, int]:
+    """'A2:O3' -> (2, 1, 3, 15); returns (first_row, first_col, last_row, last_col)"""
+    match = A1_PATTERN.match(a1_range)
+    if not match:
+        raise ValueError(f"Unsupported A1 range: {a1_range!r}")
+    first_col, first_row, last_col, last_row = match.groups()
+    first_row, last_row = int(first_row), int(last_row or first_row)
+    return first_row, _column_index(first_col), last_row, _column_index(last_col or first_col)
+
+
+@dataclass
+class FakeCell:
+    row: int
+    col: int
+    value: Any
+
+
+class FakeWorksheet:
+    """
+    In-memory stand-in for gspread.Worksheet.
+
+    Implements the subset used by GoogleSheetsService with the same call
+    signatures and response shapes, and records every call in `calls` so
+    round trips can be counted. Used for local runs and benchmarks without
+    Google credentials.
+    """
+
+    def __init__(self, title: str = 'Orders', headers: Optional[List[str]] = None):
+        self.title = title
+        self.values: List[List[Any]] = [list(headers)] if headers else []
+        self.formats: List[Tuple[str, Dict[str, Any]]] = []
+        self.frozen_rows = 0
+        self.calls: List[str] = []
+
+    def _set(self, row: int, col: int, value: Any):
+        while len(self.values) < row:
+            self.values.append([])
+        cells = self.values[row - 1]
+        while len(cells) < col:
+            cells.append('')
+        cells[col - 1] = value
+
+    def _write(self, a1_range: str, values: List[List[Any]]):
+        first_row, first_col, _, _ = _parse_a1(a1_range)
+        for row_offset, row in enumerate(values):
+            for col_offset, value in enumerate(row):
+                self._set(first_row + row_offset, first_col + col_offset, value)
+
+    def append_row(self, values: List[Any], value_input_option: str = 'RAW', **kwargs) -> Dict[str, Any]:
+        return self.append_rows([values], value_input_option=value_input_option, **kwargs)
+
+    def append_rows(self, values: List[List[Any]], value_input_option: str = 'RAW', **kwargs) -> Dict[str, Any]:
+        self.calls.append('append_rows')
+        first_row = len(self.values) + 1
+        for row in values:
+            self.values.append(list(row))
+        last_row = len(self.values)
+        width = max((len(row) for row in values), default=1)
+        updated_range = f"{self.title}!A{first_row}:{_column_letters(width)}{last_row}"
+        return {
+            'tableRange': f"{self.title}!A1:{_column_letters(width)}{max(first_row - 1, 1)}",
+            'updates': {
+                'updatedRange': updated_range,
+                'updatedRows': len(values),
+                'updatedColumns': width,
+                'updatedCells': len(values) * width,
+            },
+        }
+
+    def update(self, range_name: str, values: List[List[Any]], **kwargs) -> Dict[str, Any]:
+        self.calls.append('update')
+        self._write(range_name, values)
+        return {'updatedRange': f"{self.title}!{range_name}"}
+
+    def batch_update(self, data: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        self.calls.append('batch_update')
+        for item in data:
+            self._write(item['range'], item['values'])
+        return {'totalUpdatedCells': sum(len(item['values']) for item in data)}
+
+    def update_cell(self, row: int, col: int, value: Any) -> Dict[str, Any]:
+        self.calls.append('update_cell')
+        self._set(row, col, value)
+        return {}
+
+    def format(self, ranges: str, cell_format: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls.append('format')
+        self.formats.append((ranges, cell_format))
+        return {}
+
+    def batch_format(self, formats: List[Dict[str, Any]]) -> Dict[str, Any]:
+        self.calls.append('batch_format')
+        self.formats.extend((item['range'], item['format']) for item in formats)
+        return {}
+
+    def freeze(self, rows: Optional[int] = None, cols: Optional[int] = None):
+        self.calls.append('freeze')
+        self.frozen_rows = rows or 0
+
+    def find(self, query: str) -> Optional[FakeCell]:
+        self.calls.append('find')
+        for row_index, row in enumerate(self.values, start=1):
+            for col_index, value in enumerate(row, start=1):
+                if value == query:
+                    return FakeCell(row_index, col_index, value)
+        return None
+
+    def acell(self, label: str) -> FakeCell:
+        self.calls.append('acell')
+        row, col, _, _ = _parse_a1(label)
+        try:
+            value = self.values[row - 1][col - 1]
+        except IndexError:
+            value = None
+        return FakeCell(row, col, value)
+
+    def col_values(self, col: int) -> List[Any]:
+        self.calls.append('col_values')
+        return [row[col - 1] if len(row) >= col else '' for row in self.values]
+
+    def get_all_values(self) -> List[List[Any]]:
+        self.calls.append('get_all_values')
+        return [list(row) for row in self.values]
+
+    def get_all_records(self) -> List[Dict[str, Any]]:
+        self.calls.append('get_all_records')
+        if not self.values:
+            return []
+        headers = self.values[0]
+        return [
+            dict(zip(headers, row + [''] * (len(headers) - len(row))))
+            for row in self.values[1:]
+        ]
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from order_bot.management.commands._fake_gspread import FakeWorksheet
+from order_bot.services.google_sheets_service import GoogleSheetsService, SHEET_HEADERS
+from order_bot.services.sheets_export import SheetsExportWorker
+
+
+class Command(BaseCommand):
+    help = 'Export pending orders from the outbox to Google Sheets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Flush one batch and exit')
+        parser.add_argument('--interval', type=float, default=None, help='Seconds between flushes')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per append_rows call')
+        parser.add_argument(
+            '--fake',
+            action='store_true',
+            help='Write to an in-memory worksheet instead of Google (local runs; set SHEETS_EXPORT_ENABLED=true '
+                 'so orders are queued without a spreadsheet)',
+        )
+
+    def handle(self, *args, **options):
+        sheets_service = None
+        if options['fake']:
+            sheets_service = GoogleSheetsService(worksheet=FakeWorksheet(headers=SHEET_HEADERS))
+            if not settings.SHEETS_EXPORT_ENABLED:
+                self.stdout.write(self.style.WARNING(
+                    'SHEETS_EXPORT_ENABLED is off: new orders are not queued for export'
+                ))
+
+        worker = SheetsExportWorker(
+            sheets_service=sheets_service,
+            batch_size=options['batch_size'],
+            interval=options['interval'],
+        )
+
+        if options['once']:
+            exported = worker.flush()
+            self.stdout.write(self.style.SUCCESS(f'Exported {exported} orders'))
+            return
+
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped')
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:12
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order_bot", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="final_price",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.comparison.Coalesce(
+                    "discount_price", "price"
+                ),
+                output_field=models.DecimalField(decimal_places=2, max_digits=10),
+                verbose_name="Giá bán",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("stock__gt", 0)),
+                fields=["is_active", "product_type", "final_price"],
+                name="fashion_prod_type_price_idx",
+            ),
+        ),
+    ]
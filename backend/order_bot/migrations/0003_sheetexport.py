@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order_bot", "0002_product_final_price_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SheetExport",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Ngày tạo")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Ngày cập nhật")),
+                ("order_code", models.CharField(max_length=20, verbose_name="Mã đơn hàng")),
+                ("row", models.JSONField(default=list, verbose_name="Dữ liệu dòng")),
+                ("status", models.CharField(choices=[("PENDING", "Chờ xuất"), ("DONE", "Đã xuất"), ("FAILED", "Thất bại")], default="PENDING", max_length=20, verbose_name="Trạng thái")),
+                ("attempts", models.PositiveIntegerField(default=0, verbose_name="Số lần thử")),
+                ("next_attempt_at", models.DateTimeField(default=django.utils.timezone.now, verbose_name="Lần thử tiếp theo")),
+                ("last_error", models.TextField(blank=True, null=True, verbose_name="Lỗi gần nhất")),
+                ("row_number", models.PositiveIntegerField(blank=True, null=True, verbose_name="Dòng trên sheet")),
+                ("exported_at", models.DateTimeField(blank=True, null=True, verbose_name="Thời gian xuất")),
+                ("order", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="sheet_exports", to="order_bot.order", verbose_name="Đơn hàng")),
+            ],
+            options={
+                "verbose_name": "Sheet Export",
+                "verbose_name_plural": "Sheet Exports",
+                "db_table": "fashion_sheet_exports",
+                "ordering": ["id"],
+                "indexes": [models.Index(fields=["status", "next_attempt_at"], name="fashion_sheet_export_due_idx")],
+            },
+        ),
+    ]
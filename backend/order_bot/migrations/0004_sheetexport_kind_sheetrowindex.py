@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order_bot", "0003_sheetexport"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sheetexport",
+            name="kind",
+            field=models.CharField(
+                choices=[("APPEND", "Thêm đơn hàng"), ("STATUS", "Cập nhật trạng thái")],
+                default="APPEND",
+                max_length=20,
+                verbose_name="Loại",
+            ),
+        ),
+        migrations.CreateModel(
+            name="SheetRowIndex",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Ngày tạo")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Ngày cập nhật")),
+                ("order_code", models.CharField(max_length=20, unique=True, verbose_name="Mã đơn hàng")),
+                ("row_number", models.PositiveIntegerField(verbose_name="Dòng trên sheet")),
+            ],
+            options={
+                "verbose_name": "Sheet Row Index",
+                "verbose_name_plural": "Sheet Row Index",
+                "db_table": "fashion_sheet_row_index",
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from .category import Category
 from .product import Product
 from .order import Order, OrderItem
+from .sheet_export import SheetExport, SheetRowIndex
 
-__all__ = ['Category', 'Product', 'Order', 'OrderItem']
+__all__ = ['Category', 'Product', 'Order', 'OrderItem', 'SheetExport', 'SheetRowIndex']
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F, Sum
 from django.core.validators import MinValueValidator
 from common.models.base import DateTimeModel, SoftDeleteModel
 import random
@@ -146,6 +147,13 @@ class Order(DateTimeModel, SoftDeleteModel):
     def __str__(self):
         return f"Order #{self.code} - {self.customer_name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded status so status changes can be detected on save
+        instance._loaded_status = dict(zip(field_names, values)).get('status')
+        return instance
+
     def save(self, *args, **kwargs):
         # Generate unique order code if not exists
         if not self.code:
@@ -165,8 +173,12 @@ class Order(DateTimeModel, SoftDeleteModel):
     
     @property
     def calc_total_amount(self):
-        """Calculate total from order items"""
-        return sum(item.subtotal for item in self.items.all())
+        """Calculate total from order items (uses prefetched items if available)"""
+        if 'items' in getattr(self, '_prefetched_objects_cache', {}):
+            return sum(item.subtotal for item in self.items.all())
+        return self.items.aggregate(
+            total=Sum(F('price') * F('quantity'))
+        )['total'] or 0
 
 
 class OrderItem(DateTimeModel):
@@ -237,7 +249,8 @@ class OrderItem(DateTimeModel):
         
         super().save(*args, **kwargs)
         
-        # Update order subtotal
+        # Update order subtotal with one SQL SUM (bulk_create skips this,
+        # callers creating many items set the totals themselves)
         if self.order:
             self.order.subtotal = self.order.calc_total_amount
-            self.order.save()
+            self.order.save(update_fields=['subtotal', 'total_amount', 'updated_at'])
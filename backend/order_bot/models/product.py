@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.validators import MinValueValidator
+from django.db.models.functions import Coalesce
 from common.models.base import DateTimeModel, SoftDeleteModel
 
 
@@ -99,6 +100,13 @@ class Product(DateTimeModel, SoftDeleteModel):
         validators=[MinValueValidator(0)],
         verbose_name="Giá khuyến mãi"
     )
+    # Giá bán thực tế, do database tính (giá khuyến mãi nếu có)
+    final_price = models.GeneratedField(
+        expression=Coalesce('discount_price', 'price'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+        verbose_name="Giá bán"
+    )
     
     # Stock
     stock = models.PositiveIntegerField(
@@ -141,6 +149,11 @@ class Product(DateTimeModel, SoftDeleteModel):
         indexes = [
             models.Index(fields=['category', 'is_active']),
             models.Index(fields=['product_type', 'size', 'color']),
+            models.Index(
+                fields=['is_active', 'product_type', 'final_price'],
+                condition=models.Q(stock__gt=0),
+                name='fashion_prod_type_price_idx',
+            ),
         ]
 
     def __str__(self):
@@ -150,8 +163,3 @@ class Product(DateTimeModel, SoftDeleteModel):
     def is_in_stock(self):
         """Check if product is in stock"""
         return self.stock > 0
-    
-    @property
-    def final_price(self):
-        """Get final price (discount if available)"""
-        return self.discount_price if self.discount_price else self.price
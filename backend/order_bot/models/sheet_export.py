@@ -0,0 +1,117 @@
+from django.db import models
+from django.utils import timezone
+from common.models.base import DateTimeModel
+
+
+class SheetExport(DateTimeModel):
+    """
+    Outbox of order rows waiting to be exported to Google Sheets.
+
+    Rows are written in the same transaction as the order and flushed in
+    batches by the sheets export worker, so order creation never waits on
+    Google.
+    """
+    
+    class ExportKind(models.TextChoices):
+        APPEND = "APPEND", "Thêm đơn hàng"
+        STATUS = "STATUS", "Cập nhật trạng thái"
+    
+    class ExportStatus(models.TextChoices):
+        PENDING = "PENDING", "Chờ xuất"
+        DONE = "DONE", "Đã xuất"
+        FAILED = "FAILED", "Thất bại"
+    
+    order = models.ForeignKey(
+        'order_bot.Order',
+        related_name='sheet_exports',
+        on_delete=models.CASCADE,
+        verbose_name="Đơn hàng"
+    )
+    order_code = models.CharField(
+        max_length=20,
+        verbose_name="Mã đơn hàng"
+    )
+    
+    kind = models.CharField(
+        max_length=20,
+        choices=ExportKind.choices,
+        default=ExportKind.APPEND,
+        verbose_name="Loại"
+    )
+    
+    # APPEND: row values already formatted for the sheet; STATUS: [status label]
+    row = models.JSONField(
+        default=list,
+        verbose_name="Dữ liệu dòng"
+    )
+    
+    # Delivery state
+    status = models.CharField(
+        max_length=20,
+        choices=ExportStatus.choices,
+        default=ExportStatus.PENDING,
+        verbose_name="Trạng thái"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Số lần thử"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Lần thử tiếp theo"
+    )
+    last_error = models.TextField(
+        blank=True,
+        null=True,
+        verbose_name="Lỗi gần nhất"
+    )
+    
+    # Sheet row number returned by the append response
+    row_number = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name="Dòng trên sheet"
+    )
+    exported_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Thời gian xuất"
+    )
+
+    class Meta:
+        db_table = 'fashion_sheet_exports'
+        verbose_name = "Sheet Export"
+        verbose_name_plural = "Sheet Exports"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='fashion_sheet_export_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Export {self.order_code} {self.kind} ({self.status})"
+
+
+class SheetRowIndex(DateTimeModel):
+    """
+    Local order_code -> sheet row mapping.
+
+    Filled from append responses and rebuilt lazily from the code column
+    when a lookup misses, so status updates never search the sheet.
+    """
+    
+    order_code = models.CharField(
+        max_length=20,
+        unique=True,
+        verbose_name="Mã đơn hàng"
+    )
+    row_number = models.PositiveIntegerField(
+        verbose_name="Dòng trên sheet"
+    )
+
+    class Meta:
+        db_table = 'fashion_sheet_row_index'
+        verbose_name = "Sheet Row Index"
+        verbose_name_plural = "Sheet Row Index"
+
+    def __str__(self):
+        return f"{self.order_code} -> row {self.row_number}"
@@ -23,4 +23,9 @@ class OrderSerializer(serializers.ModelSerializer):
 	calc_total_amount = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
 	class Meta:
 		model = Order
-		fields = '__all__'
\ No newline at end of file
+		fields = '__all__'
+
+class OrderItemInputSerializer(serializers.Serializer):
+	"""An item of a new order (input of OrderService.create_order)"""
+	product = serializers.IntegerField(min_value=1)
+	quantity = serializers.IntegerField(min_value=1, default=1)
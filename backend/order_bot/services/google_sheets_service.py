@@ -1,18 +1,102 @@
-import gspread
-from google.oauth2.service_account import Credentials
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
 import logging
+import re
 from django.conf import settings
+from django.db.models import Count, Sum
+from ..models import Order, SheetRowIndex
+from common.utils.lazy_import import lazy_import
+
+# Chỉ cần khi thực sự ghi sheet (signals import module này lúc khởi động)
+gspread = lazy_import("gspread")
+service_account = lazy_import("google.oauth2.service_account")
 
 logger = logging.getLogger(__name__)
 
+# Cột A -> O của sheet đơn hàng
+SHEET_HEADERS = [
+    'Mã đơn hàng',
+    'Ngày đặt',
+    'Khách hàng',
+    'Số điện thoại',
+    'Email',
+    'Địa chỉ',
+    'Sản phẩm',
+    'Size',
+    'Màu',
+    'Số lượng',
+    'Đơn giá',
+    'Phí ship',
+    'Tổng tiền',
+    'Trạng thái',
+    'Ghi chú'
+]
+
+# Cột "Trạng thái" (N)
+STATUS_COLUMN = 'N'
+
+# e.g. "Orders!A12:O14" or "'Đơn hàng'!A12:O14"
+UPDATED_RANGE_PATTERN = re.compile(r'![A-Z]+(\d+)(?::[A-Z]+(\d+))?$')
+
+
+def build_order_row(order_data: Dict[str, Any]) -> List[str]:
+    """
+    Chuyển dữ liệu đơn hàng thành một dòng trên sheet (cột A -> O)
+    
+    Args:
+        order_data: Dictionary chứa thông tin đơn hàng
+        
+    Returns:
+        List giá trị của dòng, đã định dạng sẵn
+    """
+    return [
+        order_data.get('code', ''),
+        order_data.get('created_at', datetime.now()).strftime('%Y-%m-%d %H:%M:%S'),
+        order_data.get('customer_name', ''),
+        order_data.get('customer_phone', ''),
+        order_data.get('customer_email', ''),
+        order_data.get('customer_address', ''),
+        order_data.get('product_name', ''),
+        order_data.get('product_size', ''),
+        order_data.get('product_color', ''),
+        str(order_data.get('quantity', 0)),
+        f"{order_data.get('price', 0):,.0f}",
+        f"{order_data.get('shipping_fee', 0):,.0f}",
+        f"{order_data.get('total_amount', 0):,.0f}",
+        order_data.get('status', 'PENDING'),
+        order_data.get('notes', '')
+    ]
+
+
+def parse_updated_range(updated_range: str) -> Tuple[int, int]:
+    """
+    Lấy dòng đầu và dòng cuối từ updatedRange của append response
+    
+    Args:
+        updated_range: Ví dụ "Orders!A12:O14"
+        
+    Returns:
+        (first_row, last_row)
+    """
+    match = UPDATED_RANGE_PATTERN.search(updated_range or '')
+    if not match:
+        raise ValueError(f"Unexpected updatedRange: {updated_range!r}")
+    first_row = int(match.group(1))
+    last_row = int(match.group(2) or first_row)
+    return first_row, last_row
+
 
 class GoogleSheetsService:
     """Service để ghi đơn hàng vào Google Sheets"""
     
-    def __init__(self):
-        """Initialize Google Sheets service"""
+    def __init__(self, worksheet=None):
+        """
+        Initialize Google Sheets service
+        
+        Args:
+            worksheet: Worksheet có sẵn (ví dụ FakeWorksheet khi chạy local),
+                bỏ qua bước kết nối tới Google
+        """
         self.spreadsheet_id = getattr(
             settings,
             'GOOGLE_SHEETS_SPREADSHEET_ID',
@@ -28,6 +112,11 @@ class GoogleSheetsService:
         self.spreadsheet = None
         self.worksheet = None
         
+        if worksheet is not None:
+            self.client = worksheet
+            self.worksheet = worksheet
+            return
+        
         self._initialize()
     
     def _get_credentials_dict(self) -> Optional[Dict[str, Any]]:
@@ -80,7 +169,7 @@ class GoogleSheetsService:
                 return
             
             # Create credentials from dictionary
-            creds = Credentials.from_service_account_info(
+            creds = service_account.Credentials.from_service_account_info(
                 credentials_dict,
                 scopes=scope
             )
@@ -115,26 +204,8 @@ class GoogleSheetsService:
         if not self.worksheet:
             return
         
-        headers = [
-            'Mã đơn hàng',
-            'Ngày đặt',
-            'Khách hàng',
-            'Số điện thoại',
-            'Email',
-            'Địa chỉ',
-            'Sản phẩm',
-            'Size',
-            'Màu',
-            'Số lượng',
-            'Đơn giá',
-            'Phí ship',
-            'Tổng tiền',
-            'Trạng thái',
-            'Ghi chú'
-        ]
-        
         try:
-            self.worksheet.update('A1:O1', [headers])
+            self.worksheet.update('A1:O1', [SHEET_HEADERS])
             
             # Format header
             self.worksheet.format('A1:O1', {
@@ -181,31 +252,7 @@ class GoogleSheetsService:
             return False
         
         try:
-            # Prepare row data
-            row = [
-                order_data.get('code', ''),
-                order_data.get('created_at', datetime.now()).strftime('%Y-%m-%d %H:%M:%S'),
-                order_data.get('customer_name', ''),
-                order_data.get('customer_phone', ''),
-                order_data.get('customer_email', ''),
-                order_data.get('customer_address', ''),
-                order_data.get('product_name', ''),
-                order_data.get('product_size', ''),
-                order_data.get('product_color', ''),
-                str(order_data.get('quantity', 0)),
-                f"{order_data.get('price', 0):,.0f}",
-                f"{order_data.get('shipping_fee', 0):,.0f}",
-                f"{order_data.get('total_amount', 0):,.0f}",
-                order_data.get('status', 'PENDING'),
-                order_data.get('notes', '')
-            ]
-            
-            # Append row to worksheet
-            self.worksheet.append_row(row, value_input_option='USER_ENTERED')
-            
-            # Highlight new row
-            last_row = len(self.worksheet.get_all_values())
-            self._highlight_new_row(last_row)
+            self.append_rows([build_order_row(order_data)])
             
             logger.info(f"Order {order_data.get('code')} written to Google Sheets successfully")
             return True
@@ -214,10 +261,47 @@ class GoogleSheetsService:
             logger.error(f"Failed to write order to Google Sheets: {e}")
             return False
     
-    def _highlight_new_row(self, row_number: int):
-        """Highlight newly added row"""
+    def append_rows(self, rows: List[List[str]]) -> List[Optional[int]]:
+        """
+        Ghi nhiều dòng trong một lần gọi API và highlight chúng
+        
+        Số dòng được đọc từ append response nên không cần tải lại cả sheet.
+        Lỗi API được raise cho caller (worker sẽ retry); lỗi khi lưu index sau
+        khi đã ghi thành công chỉ được log (rebuild_row_index sẽ sửa lại), để
+        worker không ghi lặp các dòng.
+        
+        Args:
+            rows: Các dòng đã định dạng bằng build_order_row
+            
+        Returns:
+            Số dòng trên sheet của từng row, theo đúng thứ tự (None nếu
+            response không cho biết số dòng)
+        """
+        if not rows:
+            return []
+        
+        response = self.worksheet.append_rows(rows, value_input_option='USER_ENTERED')
+        try:
+            first_row, last_row = parse_updated_range(
+                response.get('updates', {}).get('updatedRange')
+            )
+        except ValueError as e:
+            # Các dòng đã được ghi: không raise để worker không ghi lại lần nữa
+            logger.error(f"Appended {len(rows)} rows but could not read their row numbers: {e}")
+            return [None] * len(rows)
+        self._highlight_rows(first_row, last_row)
+        
+        row_numbers = list(range(first_row, first_row + len(rows)))
         try:
-            self.worksheet.format(f'A{row_number}:O{row_number}', {
+            self._save_row_index({row[0]: row_number for row, row_number in zip(rows, row_numbers)})
+        except Exception as e:
+            logger.error(f"Failed to save sheet row index for rows {first_row}-{last_row}: {e}")
+        return row_numbers
+    
+    def _highlight_rows(self, first_row: int, last_row: int):
+        """Highlight newly added rows"""
+        try:
+            self.worksheet.format(f'A{first_row}:O{last_row}', {
                 'backgroundColor': {
                     'red': 0.9,
                     'green': 1.0,
@@ -229,7 +313,7 @@ class GoogleSheetsService:
     
     def write_order_batch(self, orders: list) -> int:
         """
-        Ghi nhiều đơn hàng cùng lúc
+        Ghi nhiều đơn hàng cùng lúc (một lần gọi append_rows)
         
         Args:
             orders: List of order dictionaries
@@ -237,15 +321,105 @@ class GoogleSheetsService:
         Returns:
             Number of successfully written orders
         """
-        if not self.is_enabled():
+        if not self.is_enabled() or not orders:
             return 0
         
-        success_count = 0
-        for order in orders:
-            if self.write_order(order):
-                success_count += 1
+        try:
+            return len(self.append_rows([build_order_row(order) for order in orders]))
+        except Exception as e:
+            logger.error(f"Failed to write order batch to Google Sheets: {e}")
+            return 0
+    
+    def _save_row_index(self, rows: Dict[str, int]):
+        """Lưu mapping order_code -> số dòng vào database"""
+        entries = [
+            SheetRowIndex(order_code=order_code, row_number=row_number)
+            for order_code, row_number in rows.items()
+            if order_code
+        ]
+        if not entries:
+            return
+        SheetRowIndex.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=['order_code'],
+            update_fields=['row_number', 'updated_at'],
+        )
+    
+    def rebuild_row_index(self) -> Dict[str, int]:
+        """
+        Dựng lại index từ cột mã đơn hàng (chỉ đọc cột A, không tải cả sheet)
+        
+        Returns:
+            Mapping order_code -> số dòng
+        """
+        codes = self.worksheet.col_values(1)
+        rows = {
+            code: row_number
+            for row_number, code in enumerate(codes, start=1)
+            if row_number > 1 and code
+        }
+        self._save_row_index(rows)
+        logger.info(f"Rebuilt sheet row index with {len(rows)} orders")
+        return rows
+    
+    def get_row_numbers(self, order_codes: List[str], rebuild_for: Optional[Set[str]] = None) -> Dict[str, int]:
+        """
+        Tra số dòng của các đơn hàng, dựng lại index một lần nếu thiếu
+        
+        Args:
+            order_codes: Danh sách mã đơn hàng
+            rebuild_for: Chỉ dựng lại index (đọc cả cột A) khi thiếu một trong
+                các mã này, tức đơn đã chắc chắn có trên sheet; None = mọi mã
+            
+        Returns:
+            Mapping order_code -> số dòng (bỏ qua mã không có trên sheet)
+        """
+        rows = dict(
+            SheetRowIndex.objects.filter(order_code__in=order_codes)
+            .values_list('order_code', 'row_number')
+        )
+        missing = set(order_codes) - rows.keys()
+        if missing and (rebuild_for is None or missing & rebuild_for):
+            rebuilt = self.rebuild_row_index()
+            rows.update({code: rebuilt[code] for code in missing if code in rebuilt})
+        return rows
+    
+    def update_order_statuses(self, statuses: Dict[str, str], rebuild_for: Optional[Set[str]] = None) -> List[str]:
+        """
+        Cập nhật trạng thái nhiều đơn hàng bằng một lần gọi batch_update
+        
+        Lỗi API được raise cho caller (worker sẽ retry).
+        
+        Args:
+            statuses: Mapping order_code -> trạng thái mới
+            rebuild_for: Xem get_row_numbers
+            
+        Returns:
+            Danh sách mã đơn hàng đã cập nhật
+        """
+        if not statuses:
+            return []
         
-        return success_count
+        rows = self.get_row_numbers(list(statuses), rebuild_for)
+        updated = [order_code for order_code in statuses if order_code in rows]
+        for order_code in statuses.keys() - rows.keys():
+            logger.warning(f"Order {order_code} not found in sheet")
+        
+        if updated:
+            self.worksheet.batch_update(
+                [
+                    {
+                        'range': f'{STATUS_COLUMN}{rows[order_code]}',
+                        'values': [[statuses[order_code]]],
+                    }
+                    for order_code in updated
+                ],
+                value_input_option='USER_ENTERED',
+            )
+            logger.info(f"Updated status for {len(updated)} orders")
+        
+        return updated
     
     def update_order_status(self, order_code: str, new_status: str) -> bool:
         """
@@ -262,17 +436,7 @@ class GoogleSheetsService:
             return False
         
         try:
-            # Find row with order_code
-            cell = self.worksheet.find(order_code)
-            if cell:
-                # Update status column (column N = 14)
-                self.worksheet.update_cell(cell.row, 14, new_status)
-                logger.info(f"Updated status for order {order_code} to {new_status}")
-                return True
-            else:
-                logger.warning(f"Order {order_code} not found in sheet")
-                return False
-                
+            return order_code in self.update_order_statuses({order_code: new_status})
         except Exception as e:
             logger.error(f"Failed to update order status: {e}")
             return False
@@ -313,32 +477,29 @@ class GoogleSheetsService:
     
     def get_statistics(self) -> Dict[str, Any]:
         """
-        Lấy thống kê từ sheet
+        Thống kê đơn hàng, tính bằng SQL aggregate trên bảng Order
         
         Returns:
             Dictionary with statistics
         """
-        if not self.is_enabled():
-            return {}
-        
         try:
-            orders = self.get_all_orders()
-            
-            total_orders = len(orders)
-            total_revenue = sum(
-                float(order.get('Tổng tiền', '0').replace(',', ''))
-                for order in orders
+            totals = Order.objects.aggregate(
+                total_orders=Count('id'),
+                total_revenue=Sum('total_amount'),
             )
             
-            # Count by status
-            status_counts = {}
-            for order in orders:
-                status = order.get('Trạng thái', 'UNKNOWN')
-                status_counts[status] = status_counts.get(status, 0) + 1
+            # Count by status (same labels as the sheet's status column)
+            labels = dict(Order.OrderStatus.choices)
+            status_counts = {
+                labels.get(status, status): count
+                for status, count in Order.objects.order_by()
+                .values_list('status')
+                .annotate(count=Count('id'))
+            }
             
             return {
-                'total_orders': total_orders,
-                'total_revenue': total_revenue,
+                'total_orders': totals['total_orders'],
+                'total_revenue': float(totals['total_revenue'] or 0),
                 'status_counts': status_counts
             }
             
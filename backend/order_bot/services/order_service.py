@@ -1,7 +1,11 @@
 import json
 import threading
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Case, F, Q, When
 from django.http import StreamingHttpResponse
 from ..models import Order, OrderItem, Product, Category
+from ..serializers import OrderItemInputSerializer
 from rest_framework import serializers
 from queue import Queue
 
@@ -17,25 +21,83 @@ class OrderService:
         self.callback_handler = StreamingOrderCallbackHandler(self.queue)
 
     def list_orders(self):
-        return Order.objects.all()
+        return Order.objects.prefetch_related('items__product__category')
 
     def get_order(self, pk):
-        return Order.objects.get(pk=pk)
+        return Order.objects.prefetch_related('items__product__category').get(pk=pk)
 
     def create_order(self, data):
-        items_data = data.pop('items', [])
-        order = Order.objects.create(**data)
-        total = 0
+        """
+        Create an order and its items in one transaction.
+
+        Products are resolved with one in_bulk query, items are inserted with
+        bulk_create and totals are computed in memory, so the cost no longer
+        grows with N item saves. Stock is decremented by a single conditional
+        UPDATE; if any product lacks stock nothing is written. Items are
+        validated first (positive integer product and quantity): a negative
+        quantity would pass the stock check and add stock.
+        """
+        item_serializer = OrderItemInputSerializer(data=data.pop('items', []), many=True)
+        if not item_serializer.is_valid():
+            raise serializers.ValidationError({'items': item_serializer.errors})
+        items_data = item_serializer.validated_data
+
+        quantities = {}
         for item in items_data:
-            product = Product.objects.get(pk=item['product'])
-            price = item.get('price', product.price)
-            quantity = item.get('quantity', 1)
-            OrderItem.objects.create(order=order, product=product, price=price, quantity=quantity)
-            total += price * quantity
-        order.total_amount = total
-        order.save()
+            quantities[item['product']] = quantities.get(item['product'], 0) + item['quantity']
+
+        with transaction.atomic():
+            products = Product.objects.in_bulk(list(quantities))
+            missing = [product_id for product_id in quantities if product_id not in products]
+            if missing:
+                raise serializers.ValidationError({'items': f"Products not found: {missing}"})
+
+            self._decrement_stock(quantities, products)
+
+            order = Order(**data)
+            items = []
+            for item in items_data:
+                product = products[item['product']]
+                items.append(OrderItem(
+                    product=product,
+                    product_name=product.name,
+                    product_size=product.get_size_display(),
+                    product_color=product.get_color_display(),
+                    price=product.final_price,
+                    quantity=item['quantity'],
+                ))
+            order.subtotal = sum((item.subtotal for item in items), Decimal('0'))
+            order.save()
+
+            for item in items:
+                item.order = order
+            OrderItem.objects.bulk_create(items)
+
         return order
 
+    def _decrement_stock(self, quantities, products):
+        """UPDATE ... SET stock = stock - qty WHERE id = ... AND stock >= qty, for all products at once"""
+        if not quantities:
+            return
+
+        in_stock = Q()
+        for product_id, quantity in quantities.items():
+            in_stock |= Q(pk=product_id, stock__gte=quantity)
+
+        updated = Product.objects.filter(in_stock).update(
+            stock=Case(
+                *[When(pk=product_id, then=F('stock') - quantity) for product_id, quantity in quantities.items()],
+                default=F('stock'),
+            )
+        )
+        if updated != len(quantities):
+            short = [
+                products[product_id].name
+                for product_id, quantity in quantities.items()
+                if products[product_id].stock < quantity
+            ] or [products[product_id].name for product_id in quantities]
+            raise serializers.ValidationError({'items': f"Not enough stock for: {', '.join(short)}"})
+
     def stream_order_status(self, order_id):
         order = self.get_order(order_id)
         def run():
@@ -0,0 +1,243 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+
+from ..models import Category, Product
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogProduct:
+    """
+    Bản chụp (read-only) của một sản phẩm đang hoạt động.
+
+    `stock` luôn được đọc trực tiếp từ database khi trả về (xem
+    ProductCatalog._with_live_stock), vì tồn kho đổi theo từng đơn hàng.
+    """
+
+    id: int
+    name: str
+    category_name: str
+    product_type: str
+    product_type_display: str
+    size: str
+    size_display: str
+    color: str
+    color_display: str
+    price: Decimal
+    discount_price: Optional[Decimal]
+    final_price: Decimal
+    stock: int
+    material: Optional[str]
+    description: Optional[str]
+
+    @property
+    def is_in_stock(self) -> bool:
+        return self.stock > 0
+
+
+@dataclass(frozen=True)
+class CatalogCategory:
+    name: str
+    description: Optional[str]
+
+
+class CatalogSnapshot:
+    """
+    Catalog sản phẩm trong bộ nhớ kèm các chỉ mục facet.
+
+    - products: id -> CatalogProduct (mọi sản phẩm đang hoạt động)
+    - facets: product_type / size / color -> tập id sản phẩm
+    - prices / price_ids: final_price đã sắp xếp để lọc khoảng giá bằng bisect
+    - rank: thứ tự hiển thị giống Product.Meta.ordering
+    """
+
+    def __init__(self, products: List[CatalogProduct], categories: List[CatalogCategory]):
+        self.products: Dict[int, CatalogProduct] = {}
+        self.categories = categories
+        self.rank: Dict[int, int] = {}
+        self.facets: Dict[str, Dict[str, Set[int]]] = {
+            'product_type': {},
+            'size': {},
+            'color': {},
+        }
+        self.searchable: Set[int] = set()
+
+        for position, product in enumerate(products):
+            self.products[product.id] = product
+            self.rank[product.id] = position
+            self.searchable.add(product.id)
+            for field, index in self.facets.items():
+                index.setdefault(getattr(product, field), set()).add(product.id)
+
+        by_price = sorted(
+            (self.products[product_id].final_price, product_id)
+            for product_id in self.searchable
+        )
+        self.prices: List[Decimal] = [price for price, _ in by_price]
+        self.price_ids: List[int] = [product_id for _, product_id in by_price]
+        self.loaded_at = time.monotonic()
+
+    def price_range(self, min_price=None, max_price=None) -> Set[int]:
+        """Trả về id sản phẩm có min_price <= final_price <= max_price"""
+        start = bisect_left(self.prices, Decimal(str(min_price))) if min_price else 0
+        end = bisect_right(self.prices, Decimal(str(max_price))) if max_price else len(self.prices)
+        return set(self.price_ids[start:end])
+
+
+class ProductCatalog:
+    """
+    Read-through cache cho catalog sản phẩm của order bot.
+
+    Snapshot được nạp lười ở lần đọc đầu tiên, bị xoá khi Product/Category
+    thay đổi (xem order_bot.signals) và tự hết hạn sau PRODUCT_CATALOG_TTL giây
+    để các worker process khác cũng nhận được thay đổi. Tồn kho không được
+    cache: đơn hàng trừ kho bằng queryset.update() (không có signal) ở bất kỳ
+    worker nào, nên stock được đọc lại bằng một query theo id mỗi lần trả về.
+    """
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'PRODUCT_CATALOG_TTL', 300)
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self, **kwargs):
+        """Xoá snapshot hiện tại; lần đọc kế tiếp sẽ nạp lại từ database"""
+        self._snapshot = None
+
+    def _is_fresh(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        return snapshot is not None and (
+            not self.ttl or time.monotonic() - snapshot.loaded_at < self.ttl
+        )
+
+    def get_snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if not self._is_fresh(snapshot):
+                snapshot = self._load()
+                self._snapshot = snapshot
+        return snapshot
+
+    def _load(self) -> CatalogSnapshot:
+        started = time.perf_counter()
+        products = [
+            CatalogProduct(
+                id=product.id,
+                name=product.name,
+                category_name=product.category.name,
+                product_type=product.product_type,
+                product_type_display=product.get_product_type_display(),
+                size=product.size,
+                size_display=product.get_size_display(),
+                color=product.color,
+                color_display=product.get_color_display(),
+                price=product.price,
+                discount_price=product.discount_price,
+                final_price=product.final_price,
+                stock=product.stock,
+                material=product.material,
+                description=product.description,
+            )
+            for product in Product.objects.filter(is_active=True).select_related('category')
+        ]
+        categories = [
+            CatalogCategory(name=category.name, description=category.description)
+            for category in Category.objects.filter(is_active=True).order_by('order', 'name')
+        ]
+        snapshot = CatalogSnapshot(products, categories)
+        logger.info(
+            f"Loaded product catalog: {len(products)} products, "
+            f"{len(categories)} categories in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return snapshot
+
+    @staticmethod
+    def _with_live_stock(products: List[CatalogProduct], in_stock: bool = False) -> List[CatalogProduct]:
+        """Gắn tồn kho hiện tại (một query); bỏ sản phẩm đã ngừng bán, hoặc hết hàng nếu in_stock"""
+        rows = Product.objects.filter(pk__in=[product.id for product in products], is_active=True)
+        if in_stock:
+            rows = rows.filter(stock__gt=0)
+        stock = dict(rows.values_list('pk', 'stock'))
+        return [replace(product, stock=stock[product.id]) for product in products if product.id in stock]
+
+    def get(self, product_id: int) -> Optional[CatalogProduct]:
+        product = self.get_snapshot().products.get(product_id)
+        if product is None:
+            return None
+        live = self._with_live_stock([product])
+        return live[0] if live else None
+
+    def get_categories(self) -> List[CatalogCategory]:
+        return self.get_snapshot().categories
+
+    def search(
+        self,
+        product_type: Optional[str] = None,
+        size: Optional[str] = None,
+        color: Optional[str] = None,
+        category_name: Optional[str] = None,
+        max_price: Optional[float] = None,
+        min_price: Optional[float] = None,
+        limit: int = 10,
+    ) -> List[CatalogProduct]:
+        """Tìm sản phẩm còn hàng theo facet, danh mục và khoảng giá"""
+        snapshot = self.get_snapshot()
+
+        candidate_sets: List[Set[int]] = []
+        for field, value in (('product_type', product_type), ('size', size), ('color', color)):
+            if value:
+                candidate_sets.append(snapshot.facets[field].get(value, set()))
+        if min_price or max_price:
+            candidate_sets.append(snapshot.price_range(min_price, max_price))
+
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            candidates = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+        else:
+            candidates = snapshot.searchable
+
+        if category_name:
+            needle = category_name.casefold()
+            candidates = {
+                product_id for product_id in candidates
+                if needle in snapshot.products[product_id].category_name.casefold()
+            }
+
+        ordered: List[Tuple[int, int]] = sorted(
+            (snapshot.rank[product_id], product_id) for product_id in candidates
+        )
+
+        # Lọc còn hàng theo tồn kho hiện tại, theo từng lô id đúng thứ tự hiển thị
+        results: List[CatalogProduct] = []
+        batch_size = max(limit * 2, 50)
+        for start in range(0, len(ordered), batch_size):
+            batch = [snapshot.products[product_id] for _, product_id in ordered[start:start + batch_size]]
+            results.extend(self._with_live_stock(batch, in_stock=True))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+
+# Global instance
+_product_catalog = None
+
+
+def get_product_catalog() -> ProductCatalog:
+    """Get singleton instance of ProductCatalog"""
+    global _product_catalog
+
+    if _product_catalog is None:
+        _product_catalog = ProductCatalog()
+
+    return _product_catalog
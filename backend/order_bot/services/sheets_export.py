@@ -0,0 +1,253 @@
+import logging
+import threading
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Order, Product, SheetExport
+from .google_sheets_service import GoogleSheetsService, build_order_row, get_google_sheets_service
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_order_export(order: Order, product: Product, quantity: int) -> Optional[SheetExport]:
+    """
+    Thêm đơn hàng vào outbox để worker xuất lên Google Sheets
+
+    Gọi bên trong transaction tạo đơn hàng: dòng outbox được commit cùng đơn
+    hàng, không có lời gọi mạng nào trên luồng của agent.
+
+    Returns:
+        SheetExport vừa tạo, hoặc None nếu SHEETS_EXPORT_ENABLED tắt
+    """
+    if not getattr(settings, 'SHEETS_EXPORT_ENABLED', False):
+        return None
+
+    row = build_order_row({
+        'code': order.code,
+        'created_at': order.created_at,
+        'customer_name': order.customer_name,
+        'customer_phone': order.customer_phone,
+        'customer_email': order.customer_email or '',
+        'customer_address': order.customer_address,
+        'product_name': product.name,
+        'product_size': product.get_size_display(),
+        'product_color': product.get_color_display(),
+        'quantity': quantity,
+        'price': product.final_price,
+        'shipping_fee': order.shipping_fee,
+        'total_amount': order.total_amount,
+        'status': order.get_status_display(),
+        'notes': order.notes or ''
+    })
+    return SheetExport.objects.create(order=order, order_code=order.code, row=row)
+
+
+def enqueue_status_update(order: Order) -> Optional[SheetExport]:
+    """
+    Thêm thay đổi trạng thái đơn hàng vào outbox
+
+    Worker gom các thay đổi và ghi bằng một lần batch_update mỗi lượt flush.
+    """
+    if not getattr(settings, 'SHEETS_EXPORT_ENABLED', False):
+        return None
+
+    return SheetExport.objects.create(
+        order=order,
+        order_code=order.code,
+        kind=SheetExport.ExportKind.STATUS,
+        row=[order.get_status_display()],
+    )
+
+
+class SheetsExportWorker:
+    """
+    Flush pending SheetExport rows to Google Sheets in batches.
+
+    Each flush claims due rows with SELECT ... FOR UPDATE SKIP LOCKED (so
+    several workers can run side by side) and leases them for claim_timeout
+    seconds in a short transaction; the Sheets API is called after that
+    commit, so no row lock is held across network calls. New orders are
+    written with one append_rows call (row numbers come from the append
+    response) and all status changes with one batch_update call. Failed
+    batches are retried with exponential backoff until max_attempts.
+    Delivery is at-least-once: a crash after the append, or a call that
+    outlives the lease, can duplicate a row.
+    """
+
+    def __init__(
+        self,
+        sheets_service: Optional[GoogleSheetsService] = None,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        claim_timeout: Optional[int] = None,
+    ):
+        self.sheets_service = sheets_service
+        self.batch_size = batch_size or getattr(settings, 'SHEETS_EXPORT_BATCH_SIZE', 100)
+        self.interval = interval or getattr(settings, 'SHEETS_EXPORT_INTERVAL', 5)
+        self.max_attempts = max_attempts or getattr(settings, 'SHEETS_EXPORT_MAX_ATTEMPTS', 8)
+        self.claim_timeout = claim_timeout or getattr(settings, 'SHEETS_EXPORT_CLAIM_TIMEOUT', 300)
+        self.backoff_base = getattr(settings, 'SHEETS_EXPORT_BACKOFF_BASE', 5)
+        self.backoff_max = getattr(settings, 'SHEETS_EXPORT_BACKOFF_MAX', 900)
+
+    def _get_service(self) -> Optional[GoogleSheetsService]:
+        return self.sheets_service or get_google_sheets_service()
+
+    def backoff_delay(self, attempts: int) -> timedelta:
+        """5s, 10s, 20s, ... capped at backoff_max"""
+        seconds = min(self.backoff_base * (2 ** max(attempts - 1, 0)), self.backoff_max)
+        return timedelta(seconds=seconds)
+
+    def claim(self) -> List[SheetExport]:
+        """Lease one batch of due rows to this worker; other workers skip them until the lease ends"""
+        with transaction.atomic():
+            exports: List[SheetExport] = list(
+                SheetExport.objects.select_for_update(skip_locked=True)
+                .filter(
+                    status=SheetExport.ExportStatus.PENDING,
+                    next_attempt_at__lte=timezone.now(),
+                )
+                .order_by('id')[:self.batch_size]
+            )
+            if exports:
+                SheetExport.objects.filter(pk__in=[export.pk for export in exports]).update(
+                    next_attempt_at=timezone.now() + timedelta(seconds=self.claim_timeout),
+                )
+        return exports
+
+    def flush(self) -> int:
+        """
+        Export one batch of due rows.
+
+        Returns:
+            Number of rows written to the sheet
+        """
+        service = self._get_service()
+        if service is None:
+            logger.debug("Google Sheets service is not enabled, skipping export flush")
+            return 0
+
+        exports = self.claim()
+        if not exports:
+            return 0
+
+        # Append trước để các cập nhật trạng thái trong cùng lô tìm được dòng
+        appends = [export for export in exports if export.kind == SheetExport.ExportKind.APPEND]
+        updates = [export for export in exports if export.kind == SheetExport.ExportKind.STATUS]
+        return self._flush_appends(service, appends) + self._flush_status_updates(service, updates)
+
+    def _flush_appends(self, service: GoogleSheetsService, exports: List[SheetExport]) -> int:
+        if not exports:
+            return 0
+
+        try:
+            row_numbers = service.append_rows([export.row for export in exports])
+        except Exception as e:
+            self._schedule_retry(exports, e)
+            return 0
+
+        for export, row_number in zip(exports, row_numbers):
+            export.row_number = row_number
+        self._mark_done(exports)
+        logger.info(f"Exported {len(exports)} orders to Google Sheets")
+        return len(exports)
+
+    def _flush_status_updates(self, service: GoogleSheetsService, exports: List[SheetExport]) -> int:
+        if not exports:
+            return 0
+
+        # The order's own row may not be on the sheet yet: wait for its append
+        # instead of missing the row index and rescanning the code column
+        appends = {
+            order_code: (status, next_attempt_at)
+            for order_code, status, next_attempt_at in SheetExport.objects.filter(
+                kind=SheetExport.ExportKind.APPEND,
+                order_code__in={export.order_code for export in exports},
+            ).values_list('order_code', 'status', 'next_attempt_at')
+        }
+        waiting = [
+            export for export in exports
+            if appends.get(export.order_code, (None,))[0] == SheetExport.ExportStatus.PENDING
+        ]
+        if waiting:
+            self._defer(waiting, appends)
+            exports = [export for export in exports if export not in waiting]
+            if not exports:
+                return 0
+
+        # Rows are ordered by id, so the latest status of each order wins
+        statuses = {export.order_code: export.row[0] for export in exports}
+        # A missing index entry only warrants a rebuild once the append is done
+        # (or the order was exported before the outbox, without an APPEND row)
+        appended = {
+            order_code for order_code in statuses
+            if appends.get(order_code, (SheetExport.ExportStatus.DONE,))[0] == SheetExport.ExportStatus.DONE
+        }
+        try:
+            updated = set(service.update_order_statuses(statuses, rebuild_for=appended))
+        except Exception as e:
+            self._schedule_retry(exports, e)
+            return 0
+
+        done = [export for export in exports if export.order_code in updated]
+        not_found = [export for export in exports if export.order_code not in updated]
+        self._mark_done(done)
+        if not_found:
+            self._schedule_retry(not_found, LookupError("Order row not found in sheet"))
+        return len(done)
+
+    def _mark_done(self, exports: List[SheetExport]):
+        now = timezone.now()
+        for export in exports:
+            export.status = SheetExport.ExportStatus.DONE
+            export.exported_at = now
+            export.attempts += 1
+            export.last_error = None
+        SheetExport.objects.bulk_update(
+            exports,
+            ['status', 'row_number', 'exported_at', 'attempts', 'last_error'],
+        )
+
+    def _defer(self, exports: List[SheetExport], appends):
+        """Move status updates behind their order's pending append (not counted as an attempt)"""
+        now = timezone.now()
+        for export in exports:
+            export.next_attempt_at = max(appends[export.order_code][1], now)
+        SheetExport.objects.bulk_update(exports, ['next_attempt_at'])
+        logger.debug(f"Deferred {len(exports)} status updates until their orders are appended")
+
+    def _schedule_retry(self, exports: List[SheetExport], error: Exception):
+        now = timezone.now()
+        for export in exports:
+            export.attempts += 1
+            export.last_error = str(error)
+            if export.attempts >= self.max_attempts:
+                export.status = SheetExport.ExportStatus.FAILED
+            else:
+                export.next_attempt_at = now + self.backoff_delay(export.attempts)
+        SheetExport.objects.bulk_update(
+            exports,
+            ['status', 'attempts', 'last_error', 'next_attempt_at'],
+        )
+        logger.warning(f"Failed to export {len(exports)} orders to Google Sheets, will retry: {error}")
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None):
+        """Flush every `interval` seconds; drain immediately while full batches keep coming"""
+        stop_event = stop_event or threading.Event()
+        logger.info(f"Sheets export worker started (interval={self.interval}s, batch_size={self.batch_size})")
+
+        while not stop_event.is_set():
+            try:
+                exported = self.flush()
+            except Exception as e:
+                logger.error(f"Sheets export flush failed: {e}")
+                exported = 0
+
+            if exported < self.batch_size:
+                stop_event.wait(self.interval)
+
+        logger.info("Sheets export worker stopped")
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Category, Order, Product
+from .services.product_catalog import get_product_catalog
+from .services.sheets_export import enqueue_status_update
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_product_catalog(sender, **kwargs):
+    """Drop the cached catalog once the change is committed"""
+    catalog = get_product_catalog()
+    catalog.invalidate()
+    # Also after commit, so a reload racing the transaction is not kept
+    transaction.on_commit(catalog.invalidate)
+
+
+@receiver(post_save, sender=Order)
+def export_order_status_change(sender, instance, created, **kwargs):
+    """Queue a Sheets status update when an existing order changes status"""
+    loaded_status = getattr(instance, '_loaded_status', None)
+    if created or loaded_status is None or loaded_status == instance.status:
+        return
+    enqueue_status_update(instance)
+    instance._loaded_status = instance.status
@@ -0,0 +1,18 @@
+from django.conf import settings
+
+from common.services.task_queue import task
+
+
+@task(
+    name="order_bot.flush_sheets_export",
+    max_attempts=1,
+    schedule={"trigger": "interval", "seconds": settings.SHEETS_EXPORT_INTERVAL},
+)
+def flush_sheets_export():
+    """Xuất các dòng outbox đến hạn lên Google Sheets (cùng việc với run_sheets_export_worker)"""
+    from order_bot.services.sheets_export import SheetsExportWorker
+
+    worker = SheetsExportWorker()
+    # Xả hết các lô đầy trong một lần chạy
+    while worker.flush() >= worker.batch_size:
+        pass
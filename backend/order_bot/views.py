@@ -1,14 +1,16 @@
 from rest_framework import generics, views, status
 from rest_framework.response import Response
 from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
 from .services.order_service import OrderService
 from .models.order import Order
 from .models.product import Product
 from .models.category import Category
 from .serializers import OrderSerializer, ProductSerializer, CategorySerializer
-from .agents.fashion_order_agent import FashionOrderAgent
-from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
-from langchain.callbacks.base import BaseCallbackHandler
+from .filters import ProductFilter
+from common.services.db_pool import release_db_connections
+from common.utils.middleware import get_req_uuid
+from common.utils.lazy_import import lazy_import
 import logging
 import time
 import json
@@ -18,15 +20,8 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class StreamingCallbackHandler(BaseCallbackHandler):
-    """Custom callback handler for streaming responses"""
-    
-    def __init__(self, queue):
-        self.queue = queue
-    
-    def on_llm_new_token(self, token: str, **kwargs) -> None:
-        """Run on new LLM token. Only available when streaming is enabled."""
-        self.queue.put(token)
+# Agent + langchain chỉ được load ở lần chat đầu tiên
+fashion_order_agent = lazy_import("order_bot.agents.fashion_order_agent")
 
 
 # Store agents by session (in-memory cache)
@@ -51,6 +46,8 @@ class OrderChatView(views.APIView):
 		if not request.session.session_key:
 			request.session.create()
 		session_key = request.session.session_key
+		# The stream runs after the middleware cleared the request thread-locals
+		req_uuid = get_req_uuid()
 		
 		# Generator function để stream response
 		def event_stream():
@@ -58,13 +55,13 @@ class OrderChatView(views.APIView):
 			
 			# Create queue for streaming
 			queue = Queue()
-			callback_handler = StreamingCallbackHandler(queue)
+			callback_handler = fashion_order_agent.StreamingCallbackHandler(queue)
 			
 			try:
 				# Get existing agent from cache or create new one
 				if session_key not in _agent_cache:
 					logger.info(f"Creating new agent for session: {session_key}")
-					_agent_cache[session_key] = FashionOrderAgent(callbacks=[callback_handler], queue=queue)
+					_agent_cache[session_key] = fashion_order_agent.FashionOrderAgent(callbacks=[callback_handler], queue=queue)
 				else:
 					logger.info(f"Reusing existing agent for session: {session_key}")
 					# Update callbacks for existing agent
@@ -72,6 +69,7 @@ class OrderChatView(views.APIView):
 					_agent_cache[session_key].llm.callbacks = [callback_handler]
 				
 				agent = _agent_cache[session_key]
+				agent.metrics_handler.request_uuid = str(req_uuid) if req_uuid else None
 				
 				# Restore history from frontend if provided and agent memory is empty
 				if chat_history and len(agent.agent.memory.chat_memory.messages) == 0:
@@ -93,6 +91,7 @@ class OrderChatView(views.APIView):
 				import threading
 				agent_response = {"output": "", "error": None}
 				
+				@release_db_connections
 				def run_agent():
 					try:
 						result = agent.run(user_message)
@@ -188,8 +187,10 @@ class OrderDetailView(generics.RetrieveAPIView):
 		return self.service.get_order(self.kwargs["pk"])
 
 class ProductListView(generics.ListAPIView):
-	queryset = Product.objects.all()
+	queryset = Product.objects.filter(is_active=True).select_related('category')
 	serializer_class = ProductSerializer
+	filter_backends = [DjangoFilterBackend]
+	filterset_class = ProductFilter
 
 class CategoryListView(generics.ListAPIView):
 	queryset = Category.objects.all()
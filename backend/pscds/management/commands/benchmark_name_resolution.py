@@ -0,0 +1,98 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from agents.services.name_resolver import PROJECT_CANDIDATES_SQL, USER_CANDIDATES_SQL, NameResolver
+from common.utils.keyword_matcher import fold_diacritics
+from pscds.models import Project, User
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    """Swap two neighbouring letters of one word"""
+    words = name.split()
+    index = rng.randrange(len(words))
+    word = words[index]
+    if len(word) > 3:
+        at = rng.randrange(1, len(word) - 2)
+        words[index] = word[:at] + word[at + 1] + word[at] + word[at + 2:]
+    return " ".join(words)
+
+
+def _variants(names, rng: random.Random):
+    """Lookups as people type them: exact, without diacritics, with a typo, last name only"""
+    for name in names:
+        yield name
+        yield fold_diacritics(name)
+        yield _typo(fold_diacritics(name), rng)
+        yield name.split()[-1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time NameResolver lookups of seeded user and project names (exact, unaccented, misspelt, "
+        "partial) cold and from its cache, and show the query plans (run seed_pscd_dataset first)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=200, help="Names sampled per kind")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def _time(self, label, lookup, queries):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            lookup(query)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+        self.stdout.write(
+            f"  {label:<16} n={len(timings):<5} p50={statistics.median(timings):7.3f} ms  p95={p95:7.3f} ms"
+        )
+
+    def _explain(self, sql, query):
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN " + sql, {"query": query, "limit": 5})
+            for (line,) in cursor.fetchall():
+                self.stdout.write(f"    {line}")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Name resolution needs PostgreSQL (pg_trgm, unaccent)")
+
+        rng = random.Random(options["seed"])
+        resolver = NameResolver()
+        kinds = [
+            ("users", resolver.users, USER_CANDIDATES_SQL, User.objects.values_list("full_name", flat=True)),
+            ("projects", resolver.projects, PROJECT_CANDIDATES_SQL, Project.objects.values_list("name", flat=True)),
+        ]
+        for kind, lookup, sql, names in kinds:
+            names = [name for name in names.order_by("?")[:options["samples"]] if name and name.strip()]
+            if not names:
+                self.stdout.write(f"{kind}: no rows")
+                continue
+            queries = list(_variants(names, rng))
+            self.stdout.write(f"{kind} ({len(names)} names, {len(queries)} lookups)")
+
+            resolver.clear()
+            lookup(queries[0])  # sets the similarity threshold on this connection
+            resolver.clear()
+            self._time("cold (database)", lookup, queries)
+            self._time("warm (cache)", lookup, queries)
+
+            misses = sum(
+                1 for name in names if all(candidate.name != name for candidate in lookup(fold_diacritics(name)))
+            )
+            self.stdout.write(f"  unaccented name not among candidates: {misses}/{len(names)}")
+            # An exact name must resolve even when longer names contain it ("Tosi Portal 1" / "Tosi Portal 12");
+            # only namesakes (two exact candidates) may stay ambiguous
+            unresolved = 0
+            for name in names:
+                candidates = lookup(name)
+                if resolver.best(candidates) is None and sum(candidate.exact for candidate in candidates) < 2:
+                    unresolved += 1
+            self.stdout.write(f"  exact name unresolved (namesakes excluded): {unresolved}/{len(names)}")
+            self.stdout.write("  plan:")
+            self._explain(sql, fold_diacritics(names[0]))
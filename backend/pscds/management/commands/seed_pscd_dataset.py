@@ -0,0 +1,469 @@
+import csv
+import io
+import random
+import time
+import unicodedata
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from pscds.models import (
+    Log,
+    Priority,
+    Project,
+    ProjectUser,
+    Request,
+    Task,
+    TaskUser,
+    TimeInterval,
+    User,
+)
+
+# Row counts per scale; every count can be overridden by its own option
+SCALES = {
+    "small": {
+        "users": 200, "projects": 20, "tasks": 2_000,
+        "intervals": 200_000, "logs": 200_000, "requests": 2_000,
+    },
+    "medium": {
+        "users": 1_000, "projects": 100, "tasks": 10_000,
+        "intervals": 2_000_000, "logs": 2_000_000, "requests": 10_000,
+    },
+    "production": {
+        "users": 5_000, "projects": 500, "tasks": 50_000,
+        "intervals": 20_000_000, "logs": 20_000_000, "requests": 50_000,
+    },
+}
+
+FAMILY_NAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ"]
+MIDDLE_NAMES = ["Văn", "Thị", "Minh", "Ngọc", "Thanh", "Hoài", "Đức", "Quốc", "Gia", "Bảo"]
+GIVEN_NAMES = [
+    "An", "Bình", "Châu", "Dũng", "Giang", "Hà", "Hải", "Hùng", "Khoa", "Lan", "Linh",
+    "Long", "Mai", "Nam", "Phúc", "Quân", "Sơn", "Tâm", "Thảo", "Trang", "Tuấn", "Vy",
+]
+ASCII_GIVEN_NAMES = {
+    name: unicodedata.normalize("NFKD", name.replace("Đ", "D")).encode("ascii", "ignore").decode()
+    for name in GIVEN_NAMES
+}
+
+PROJECT_PREFIXES = ["Tosi", "PSCD", "Atlas", "Lotus", "Mekong", "Saigon", "Orion", "Hanoi", "Delta", "Nova"]
+PROJECT_SUFFIXES = ["Portal", "CRM", "Mobile App", "ERP", "Chatbot", "Data Platform", "Website", "Payment"]
+TASK_VERBS = ["Implement", "Fix", "Review", "Design", "Test", "Refactor", "Deploy", "Document", "Optimize"]
+TASK_SUBJECTS = [
+    "login flow", "payment API", "dashboard", "report export", "notification service",
+    "user profile", "search page", "CI pipeline", "database schema", "chat widget",
+]
+JOBS = ["Coding", "Meeting", "Code review", "Testing", "Research", "Support"]
+LOG_EVENTS = ["check_in", "start_tracking", "stop_tracking", "idle", "resume", "check_out"]
+OPERATING_SYSTEMS = ["Windows 11", "macOS 14", "Ubuntu 22.04"]
+REQUEST_REASONS = [
+    "Nghỉ phép năm", "Nghỉ ốm", "Việc gia đình", "Đi khám bệnh",
+    "Làm việc từ xa", "Đi công tác", "Về quê", "Nghỉ bù",
+]
+
+# Working day in UTC for Vietnam (UTC+7): 08:00 local = 01:00 UTC
+WORKDAY_START_HOUR_UTC = 1
+WORKDAY_HOURS = 10
+
+
+class RowStream:
+    """
+    File-like object COPY reads from, fed by a row generator.
+
+    Rows are CSV-encoded a batch at a time, so tens of millions of rows are
+    streamed to PostgreSQL without ever being held in memory.
+    """
+
+    def __init__(self, rows, batch_size: int = 10_000):
+        self._rows = iter(rows)
+        self._batch_size = batch_size
+        self._buffer = ""
+        self.count = 0
+
+    def _fill(self) -> bool:
+        batch = list(islice(self._rows, self._batch_size))
+        if not batch:
+            return False
+        out = io.StringIO()
+        csv.writer(out, lineterminator="\n").writerows(batch)
+        self._buffer += out.getvalue()
+        self.count += len(batch)
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while (size < 0 or len(self._buffer) < size) and self._fill():
+            pass
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def _ts(value: datetime) -> str:
+    return value.isoformat()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic PSCD dataset (users, projects, tasks, time intervals, logs, "
+        "requests) with COPY, up to production scale, as a fixture for benchmarking the agent "
+        "tools and Text2SQL queries"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale", choices=sorted(SCALES), default="small",
+            help="Row counts preset; production writes about 40M rows",
+        )
+        for name in ("users", "projects", "tasks", "intervals", "logs", "requests"):
+            parser.add_argument(f"--{name}", type=int, help=f"Number of {name} (overrides --scale)")
+        parser.add_argument("--days", type=int, default=365, help="History span ending today")
+        parser.add_argument(
+            "--activity-skew", type=float, default=1.5,
+            help="Pareto shape of per-user activity: lower means a few users log most of the time",
+        )
+        parser.add_argument("--projects-per-user", type=int, default=3, help="Maximum projects per user")
+        parser.add_argument("--users-per-task", type=int, default=2, help="Maximum assignees per task")
+        parser.add_argument("--interval-minutes", type=int, default=10, help="Length of a tracked interval")
+        parser.add_argument("--manual-ratio", type=float, default=0.05, help="Share of manual intervals")
+        parser.add_argument("--random-seed", type=int, default=42)
+        parser.add_argument(
+            "--truncate", action="store_true",
+            help="Empty the PSCD tables first (restarts ids; removes the migration sample data)",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This command loads data with PostgreSQL COPY")
+
+        counts = {
+            name: options[name] if options[name] is not None else default
+            for name, default in SCALES[options["scale"]].items()
+        }
+        if min(counts["users"], counts["projects"], counts["tasks"]) < 1:
+            raise CommandError("--users, --projects and --tasks must be at least 1")
+
+        self.random = random.Random(options["random_seed"])
+        self.options = options
+        self.now = datetime.now(dt_timezone.utc).replace(microsecond=0)
+        self.first_day = (self.now - timedelta(days=options["days"])).replace(hour=0, minute=0, second=0)
+        started = time.perf_counter()
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Nothing is durable until the final commit anyway
+            cursor.execute("SET LOCAL synchronous_commit = off")
+            if options["truncate"]:
+                self._truncate(cursor)
+
+            priority_ids = self._priority_ids()
+            user_ids = self._copy_users(cursor, counts["users"])
+            project_ids = self._copy_projects(cursor, counts["projects"])
+            members = self._copy_project_users(cursor, user_ids, project_ids)
+            task_ids_by_user = self._copy_tasks(cursor, counts["tasks"], project_ids, members, priority_ids)
+
+            weights = self._activity_weights(user_ids)
+            self._copy_time_intervals(cursor, counts["intervals"], weights, task_ids_by_user)
+            self._copy_logs(cursor, counts["logs"], weights)
+            self._copy_requests(cursor, counts["requests"], user_ids)
+
+            for model in (User, Project, Task, ProjectUser, TaskUser, TimeInterval, Log, Request):
+                self._sync_sequence(cursor, model)
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"PSCD dataset generated in {time.perf_counter() - started:.1f}s")
+        )
+
+    def _copy(self, cursor, model, columns, rows):
+        """COPY generated rows into the model's table"""
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+        table = model._meta.db_table
+        stream = RowStream(rows)
+        sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        started = time.perf_counter()
+        if is_psycopg3:
+            # psycopg 3 (DB_POOL_ENABLED) has no copy_expert; feed its Copy object instead
+            with cursor.copy(sql) as copy:
+                while chunk := stream.read(1 << 20):
+                    copy.write(chunk)
+        else:
+            cursor.copy_expert(sql, stream, size=1 << 20)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"  {table:<24} {stream.count:>12,} rows {elapsed:>7.1f}s "
+            f"({stream.count / max(elapsed, 1e-9):,.0f} rows/s)"
+        )
+
+    def _truncate(self, cursor):
+        tables = ", ".join(
+            model._meta.db_table
+            for model in (Log, TimeInterval, Request, TaskUser, Task, ProjectUser, Project, User)
+        )
+        # CASCADE also empties notifications, which reference the users
+        cursor.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+
+    def _next_id(self, model) -> int:
+        last = model.objects.order_by("-id").values_list("id", flat=True).first()
+        return (last or 0) + 1
+
+    def _sync_sequence(self, cursor, model):
+        table = model._meta.db_table
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table}",
+            [table],
+        )
+
+    def _priority_ids(self):
+        priority_ids = list(Priority.objects.values_list("id", flat=True))
+        if not priority_ids:
+            for name, color in (("Low", "#28a745"), ("Medium", "#ffc107"), ("High", "#fd7e14")):
+                priority_ids.append(Priority.objects.create(name=name, color=color).id)
+        return priority_ids
+
+    def _activity_weights(self, user_ids):
+        """Pareto-distributed activity: a realistic long tail of heavy trackers"""
+        shape = self.options["activity_skew"]
+        # Capped so one outlier cannot take the whole dataset
+        return {user_id: min(self.random.paretovariate(shape), 50) for user_id in user_ids}
+
+    def _random_created_at(self) -> datetime:
+        span = (self.now - self.first_day).total_seconds()
+        return self.first_day + timedelta(seconds=self.random.random() * span)
+
+    def _copy_users(self, cursor, count):
+        first_id = self._next_id(User)
+        user_ids = list(range(first_id, first_id + count))
+        columns = [
+            "id", "full_name", "email", "company_id", "screenshots_active", "manual_time",
+            "computer_time_popup", "blur_screenshots", "web_and_app_monitoring", "screenshots_interval",
+            "active", "password", "timezone", "important", "change_password", "role_id", "user_language",
+            "invitation_sent", "client_installed", "permanent_screenshots", "phone", "created_at", "updated_at",
+        ]
+        rnd = self.random
+
+        def rows():
+            for user_id in user_ids:
+                given = rnd.choice(GIVEN_NAMES)
+                full_name = f"{rnd.choice(FAMILY_NAMES)} {rnd.choice(MIDDLE_NAMES)} {given}"
+                created_at = _ts(self._random_created_at())
+                yield (
+                    user_id, full_name, f"{ASCII_GIVEN_NAMES[given].lower()}.{user_id}@pscd.example", 1,
+                    1, 1, 0, 0, "t", 10,
+                    "t" if rnd.random() < 0.95 else "f", "!", "Asia/Ho_Chi_Minh", "f", "f",
+                    rnd.choice((1, 2, 2, 2, 3)), rnd.choice(("vi", "en")),
+                    "t", "t", "f", f"09{rnd.randrange(10**8):08d}", created_at, created_at,
+                )
+
+        self._copy(cursor, User, columns, rows())
+        return user_ids
+
+    def _copy_projects(self, cursor, count):
+        first_id = self._next_id(Project)
+        project_ids = list(range(first_id, first_id + count))
+        columns = [
+            "id", "company_id", "name", "description", "start_date", "end_date",
+            "status", "in_progress", "source", "created_at", "updated_at",
+        ]
+        rnd = self.random
+
+        def rows():
+            for project_id in project_ids:
+                name = f"{rnd.choice(PROJECT_PREFIXES)} {rnd.choice(PROJECT_SUFFIXES)} {project_id}"
+                start = self._random_created_at()
+                end = start + timedelta(days=rnd.randint(30, 540))
+                yield (
+                    project_id, 1, name, f"Dự án {name}", start.date().isoformat(), end.date().isoformat(),
+                    rnd.choice((0, 1, 1, 1, 2)), 1 if end > self.now else 0, "synthetic",
+                    _ts(start), _ts(start),
+                )
+
+        self._copy(cursor, Project, columns, rows())
+        return project_ids
+
+    def _copy_project_users(self, cursor, user_ids, project_ids):
+        """Every user joins 1..projects_per_user projects and every project gets a member"""
+        rnd = self.random
+        members = {project_id: [] for project_id in project_ids}
+        per_user = max(1, self.options["projects_per_user"])
+        for user_id in user_ids:
+            for project_id in rnd.sample(project_ids, min(rnd.randint(1, per_user), len(project_ids))):
+                members[project_id].append(user_id)
+        for project_id, project_members in members.items():
+            if not project_members:
+                project_members.append(rnd.choice(user_ids))
+
+        created_at = _ts(self.first_day)
+        rows = (
+            (project_id, user_id, rnd.choice((1, 2, 2, 3)), created_at, created_at, created_at)
+            for project_id, project_members in members.items()
+            for user_id in project_members
+        )
+        self._copy(
+            cursor, ProjectUser, ["project_id", "user_id", "role_id", "start_at", "created_at", "updated_at"], rows
+        )
+        return members
+
+    def _copy_tasks(self, cursor, count, project_ids, members, priority_ids):
+        """Tasks spread over projects (a few large ones), assigned to project members"""
+        rnd = self.random
+        first_id = self._next_id(Task)
+        project_weights = [rnd.paretovariate(1.2) for _ in project_ids]
+        task_projects = rnd.choices(project_ids, weights=project_weights, k=count)
+        task_ids_by_user = {}
+        assignments = []
+        per_task = max(1, self.options["users_per_task"])
+
+        def task_rows():
+            for offset, project_id in enumerate(task_projects):
+                task_id = first_id + offset
+                created = self._random_created_at()
+                project_members = members[project_id]
+                for user_id in rnd.sample(project_members, min(rnd.randint(1, per_task), len(project_members))):
+                    assignments.append((task_id, user_id))
+                    task_ids_by_user.setdefault(user_id, []).append(task_id)
+                yield (
+                    task_id, project_id, f"{rnd.choice(TASK_VERBS)} {rnd.choice(TASK_SUBJECTS)} #{task_id}",
+                    rnd.choice((0, 4, 8, 16, 24, 40)), 0, rnd.randint(1, 50), "f",
+                    rnd.choice((0, 1, 2, 3, 3, 3)), offset, _ts(created + timedelta(days=rnd.randint(1, 60))),
+                    rnd.choice(priority_ids), _ts(created), _ts(created),
+                )
+
+        self._copy(
+            cursor, Task,
+            [
+                "id", "project_id", "task_name", "work_time", "warning_time", "assigned_by", "important",
+                "status_id", "relative_position", "due_date", "priority_id", "created_at", "updated_at",
+            ],
+            task_rows(),
+        )
+
+        # Users of projects that got no task still need one to log time on
+        task_ids_by_project = {}
+        for offset, project_id in enumerate(task_projects):
+            task_ids_by_project.setdefault(project_id, []).append(first_id + offset)
+        for project_id, project_members in members.items():
+            for user_id in project_members:
+                if user_id not in task_ids_by_user and project_id in task_ids_by_project:
+                    task_id = rnd.choice(task_ids_by_project[project_id])
+                    assignments.append((task_id, user_id))
+                    task_ids_by_user[user_id] = [task_id]
+
+        created_at = _ts(self.first_day)
+        self._copy(
+            cursor, TaskUser, ["task_id", "user_id", "created_at", "updated_at"],
+            ((task_id, user_id, created_at, created_at) for task_id, user_id in assignments),
+        )
+        return task_ids_by_user
+
+    def _workdays(self):
+        day = self.first_day
+        days = []
+        while day < self.now:
+            if day.weekday() < 5:
+                days.append(day)
+            day += timedelta(days=1)
+        return days or [self.first_day]
+
+    def _split(self, total, weights, user_ids):
+        """Distribute `total` rows over users proportionally to their weight"""
+        weight_sum = sum(weights[user_id] for user_id in user_ids) or 1
+        return {user_id: int(total * weights[user_id] / weight_sum) for user_id in user_ids}
+
+    def _copy_time_intervals(self, cursor, total, weights, task_ids_by_user):
+        """Back-to-back tracked intervals during working hours on weekdays"""
+        rnd = self.random
+        workdays = self._workdays()
+        user_ids = [user_id for user_id in weights if user_id in task_ids_by_user]
+        per_user = self._split(total, weights, user_ids)
+        length = timedelta(minutes=self.options["interval_minutes"])
+        slots_per_day = max(1, WORKDAY_HOURS * 60 // self.options["interval_minutes"])
+        manual_ratio = self.options["manual_ratio"]
+
+        def rows():
+            for user_id in user_ids:
+                tasks = task_ids_by_user[user_id]
+                # A user cannot track more than every slot of every workday
+                remaining = min(per_user[user_id], slots_per_day * len(workdays))
+                # Heavy users track full days, light users a few short sessions
+                days_needed = max(1, -(-remaining // slots_per_day))
+                days = sorted(rnd.sample(workdays, min(days_needed, len(workdays))))
+                for index, day in enumerate(days):
+                    if remaining <= 0:
+                        break
+                    slots = -(-remaining // (len(days) - index))
+                    slots = min(slots, remaining)
+                    start = day + timedelta(hours=WORKDAY_START_HOUR_UTC, minutes=rnd.randint(0, 60))
+                    task_id = rnd.choice(tasks)
+                    for _ in range(slots):
+                        if rnd.random() < 0.15:
+                            task_id = rnd.choice(tasks)
+                        end = start + length
+                        end_at = _ts(end)
+                        activity = rnd.randint(20, 100)
+                        yield (
+                            task_id, user_id, _ts(start), end_at, "f",
+                            "t" if rnd.random() < manual_ratio else "f",
+                            activity, rnd.randint(0, activity), rnd.randint(0, activity),
+                            rnd.choice(JOBS), 1, end_at, end_at,
+                        )
+                        start = end
+                    remaining -= slots
+
+        self._copy(
+            cursor, TimeInterval,
+            [
+                "task_id", "user_id", "start_at", "end_at", "different_timezone", "is_manual",
+                "activity_fill", "mouse_fill", "keyboard_fill", "job", "status", "created_at", "updated_at",
+            ],
+            rows(),
+        )
+
+    def _copy_logs(self, cursor, total, weights):
+        """Tracker events at random times of random workdays, weighted like the intervals"""
+        rnd = self.random
+        workdays = self._workdays()
+        per_user = self._split(total, weights, list(weights))
+        workday_seconds = WORKDAY_HOURS * 3600
+
+        def rows():
+            for user_id, count in per_user.items():
+                os_name = rnd.choice(OPERATING_SYSTEMS)
+                for _ in range(count):
+                    moment = _ts(
+                        rnd.choice(workdays)
+                        + timedelta(hours=WORKDAY_START_HOUR_UTC, seconds=rnd.randrange(workday_seconds))
+                    )
+                    yield (
+                        user_id, moment, rnd.choice(LOG_EVENTS), "office", "Ho Chi Minh", os_name,
+                        f"10.{rnd.randint(7700, 7900)}", f"106.{rnd.randint(6500, 7200)}", moment, moment,
+                    )
+
+        self._copy(
+            cursor, Log,
+            ["user_id", "time", "event", "sit", "location", "os", "latitude", "longitude", "created_at", "updated_at"],
+            rows(),
+        )
+
+    def _copy_requests(self, cursor, total, user_ids):
+        """Leave / remote-work requests of 1 hour to 3 days"""
+        rnd = self.random
+        workdays = self._workdays()
+
+        def rows():
+            for _ in range(total):
+                start = rnd.choice(workdays) + timedelta(hours=WORKDAY_START_HOUR_UTC)
+                end = start + rnd.choice((timedelta(hours=1), timedelta(hours=4), timedelta(days=1), timedelta(days=3)))
+                created_at = _ts(start - timedelta(days=rnd.randint(0, 14)))
+                yield (
+                    rnd.choice(user_ids), _ts(start), _ts(end), rnd.choice(REQUEST_REASONS),
+                    rnd.choice((0, 1, 1, 1, 2)), created_at, created_at,
+                )
+
+        self._copy(
+            cursor, Request,
+            ["user_id", "datetime_start", "datetime_end", "reason", "status", "created_at", "updated_at"],
+            rows(),
+        )
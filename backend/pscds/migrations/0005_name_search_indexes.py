@@ -0,0 +1,45 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+import pscds.models
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pscds", "0004_auto_20250930_0842"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        # unaccent() is only STABLE (its dictionary can change), so indexes need an
+        # IMMUTABLE wrapper that names the dictionary explicitly
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION pscds_fold(text) RETURNS text
+                LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+                AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS pscds_fold(text);",
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(pscds.models.Fold("full_name"), name="gin_trgm_ops"),
+                name="pscds_user_name_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(django.db.models.functions.text.Lower("email"), name="pscds_user_email_lower_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(pscds.models.Fold("name"), name="gin_trgm_ops"),
+                name="pscds_project_name_trgm_idx",
+            ),
+        ),
+    ]
@@ -1,7 +1,16 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Lower
 # from django.contrib.gis.db import models as gis_models  # for PointField (GeoDjango)
 
 
+class Fold(models.Func):
+    """pscds_fold(text) = lower(unaccent(text)); the SQL function is created by migration 0005"""
+
+    function = "pscds_fold"
+    output_field = models.TextField()
+
+
 class User(models.Model):
     full_name = models.CharField(max_length=255)
     email = models.EmailField(max_length=100)
@@ -37,6 +46,11 @@ class User(models.Model):
 
     class Meta:
         db_table = "pscds_users"
+        indexes = [
+            # Name resolution (agents.services.name_resolver): fuzzy, accent-insensitive names, exact emails
+            GinIndex(OpClass(Fold("full_name"), name="gin_trgm_ops"), name="pscds_user_name_trgm_idx"),
+            models.Index(Lower("email"), name="pscds_user_email_lower_idx"),
+        ]
 
     def __str__(self):
         return self.full_name
@@ -59,6 +73,9 @@ class Project(models.Model):
 
     class Meta:
         db_table = "pscds_projects"
+        indexes = [
+            GinIndex(OpClass(Fold("name"), name="gin_trgm_ops"), name="pscds_project_name_trgm_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -2,6 +2,7 @@ from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.memory import ConversationBufferMemory
 from common.services.llm_service import get_llm_service, LLMProvider
+from common.services.llm_metrics import LLMMetricsCallbackHandler
 from queue import Queue
 from restaurant_booking.agents.tables import TablesService
 from datetime import datetime, timedelta
@@ -33,8 +34,11 @@ class RestaurantBookingAgent:
             temperature=0.3,              # 0 = chính xác, ít sáng tạo
             max_tokens=256,
             streaming=True,
+            stream_usage=True,
             callbacks=self.callbacks,
         )
+        # Đo latency/token/tool của mỗi lượt chạy agent
+        self.metrics_handler = LLMMetricsCallbackHandler("restaurant_booking_agent")
 
         # Initialize entity first
         self.entity = {}
@@ -227,4 +231,6 @@ class RestaurantBookingAgent:
         # # Update the agent with new entity information
         # self._update_agent_with_entity()
         
-        return self.agent.invoke({"input": processed_input})
+        return self.agent.invoke(
+            {"input": processed_input}, config={"callbacks": [self.metrics_handler]}
+        )
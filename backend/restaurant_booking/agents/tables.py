@@ -8,6 +8,7 @@ from restaurant_booking.models import Table, Booking
 from datetime import datetime
 from langchain_core.tools import StructuredTool
 from datetime import datetime
+from common.utils.tool_tracing import trace_tools
 
 
 class TablesService:
@@ -214,7 +215,7 @@ class TablesService:
         return None
 
     def create_tools(self) -> List[Any]:
-        return [
+        return trace_tools([
             StructuredTool.from_function(
                 func=self._search_tables,
                 name="search_tables",
@@ -281,4 +282,4 @@ class TablesService:
                 ),
                 args_schema=BookingEntity,
             ),
-        ]
+        ])
@@ -1,23 +1,36 @@
-import re
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+from common.utils.keyword_matcher import KeywordMatcher
+
+# Từ khóa ngày tương đối -> số ngày lệch so với hôm nay
+RELATIVE_DAYS = {
+    'hôm nay': 0, 'nay': 0,
+    'hôm qua': -1, 'qua': -1,
+    'ngày mai': 1, 'mai': 1,
+}
+
+# Từ khóa thứ trong tuần -> datetime.weekday()
+WEEKDAYS = {
+    'thứ 2': 0, 'thứ hai': 0, 'thứ 3': 1, 'thứ ba': 1,
+    'thứ 4': 2, 'thứ tư': 2, 'thứ 5': 3, 'thứ năm': 3,
+    'thứ 6': 4, 'thứ sáu': 4, 'thứ 7': 5, 'thứ bảy': 5,
+    'chủ nhật': 6
+}
+
+# Biên dịch một lần khi import, dùng chung cho mọi request
+TIME_MATCHER = KeywordMatcher({
+    'relative_day': RELATIVE_DAYS,
+    'weekday': WEEKDAYS,
+})
+
 
 class VietnameseTimeProcessor:
     """Xử lý các cụm từ thời gian tiếng Việt"""
     
     def __init__(self):
-        self.days = {
-            'hôm nay': ['hôm nay', 'nay'],
-            'hôm qua': ['hôm qua', 'qua'],
-            'ngày mai': ['ngày mai', 'mai']
-        }
-        
-        self.weekdays = {
-            'thứ 2': 0, 'thứ hai': 0, 'thứ 3': 1, 'thứ ba': 1,
-            'thứ 4': 2, 'thứ tư': 2, 'thứ 5': 3, 'thứ năm': 3,
-            'thứ 6': 4, 'thứ sáu': 4, 'thứ 7': 5, 'thứ bảy': 5,
-            'chủ nhật': 6
-        }
+        self.days = RELATIVE_DAYS
+        self.weekdays = WEEKDAYS
 
     def process_time_expression(self, text: str) -> Dict[str, Optional[str]]:
         """Xử lý biểu thức thời gian và trả về ngày cụ thể"""
@@ -29,46 +42,37 @@ class VietnameseTimeProcessor:
 
     def _extract_date(self, text: str) -> Optional[str]:
         """Trích xuất ngày từ văn bản"""
+        return self._date_from_slots(TIME_MATCHER.extract(text))
+
+    def _date_from_slots(self, slots: Dict[str, Any]) -> Optional[str]:
+        """Tính ngày từ các slot đã khớp (ưu tiên ngày tương đối trước thứ trong tuần)"""
         today = datetime.now()
         
         # Kiểm tra ngày tương đối
-        for day_type, keywords in self.days.items():
-            if any(keyword in text for keyword in keywords):
-                if day_type == 'hôm nay':
-                    return today.strftime('%Y-%m-%d')
-                elif day_type == 'hôm qua':
-                    return (today - timedelta(days=1)).strftime('%Y-%m-%d')
-                elif day_type == 'ngày mai':
-                    return (today + timedelta(days=1)).strftime('%Y-%m-%d')
+        if 'relative_day' in slots:
+            return (today + timedelta(days=slots['relative_day'])).strftime('%Y-%m-%d')
         
         # Kiểm tra thứ trong tuần
-        for weekday_text, weekday_num in self.weekdays.items():
-            if weekday_text in text:
-                days_ahead = weekday_num - today.weekday()
-                if days_ahead < 0:
-                    days_ahead += 7
-                return (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+        if 'weekday' in slots:
+            days_ahead = slots['weekday'] - today.weekday()
+            if days_ahead < 0:
+                days_ahead += 7
+            return (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
         
         return None
 
     def is_time_expression(self, text: str) -> bool:
         """Kiểm tra xem văn bản có chứa biểu thức thời gian không"""
-        text = text.lower().strip()
-        
-        # Kiểm tra từ khóa ngày
-        all_keywords = []
-        for keywords in self.days.values():
-            all_keywords.extend(keywords)
-        all_keywords.extend(self.weekdays.keys())
-        
-        return any(keyword in text for keyword in all_keywords)
+        return TIME_MATCHER.contains(text)
 
     def enhance_time_understanding(self, text: str) -> str:
         """Cải thiện khả năng hiểu thời gian"""
-        if not self.is_time_expression(text):
+        # Một lần quét duy nhất cho cả kiểm tra và trích xuất
+        slots = TIME_MATCHER.extract(text)
+        if not slots:
             return text
             
-        processed = self.process_time_expression(text)
+        processed = {'booking_date': self._date_from_slots(slots)}
         
         if processed['booking_date']:
             today = datetime.now().date()
@@ -1,6 +1,7 @@
 import threading
 import json
 from restaurant_booking.agents.restaurant_booking_agent import RestaurantBookingAgent
+from common.services.db_pool import release_db_connections
 from langchain_core.callbacks import BaseCallbackHandler
 from queue import Queue
 
@@ -40,6 +41,7 @@ class RestaurantBookingChatService:
             self._load_chat_history_into_agent_memory(self.agent, chat_history) 
 
         # Start the agent execution in a separate thread to allow streaming
+        @release_db_connections
         def run_agent():
             try:
                 result = self.agent_wrapper.run(user_input)
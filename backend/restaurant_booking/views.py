@@ -12,15 +12,18 @@ from rest_framework import status
 
 from .models import Table, Booking
 from accounts.models.user import User
-from restaurant_booking.services.chat import RestaurantBookingChatService
+from common.utils.lazy_import import lazy_import
 from restaurant_booking.serializers import RestaurantBookingChatRequestSerializer
 
+# The booking agent pulls in langchain: load it on the first chat
+restaurant_chat = lazy_import("restaurant_booking.services.chat")
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def restaurant_chat_stream(request):
     serializer = RestaurantBookingChatRequestSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    chat_service = RestaurantBookingChatService()
+    chat_service = restaurant_chat.RestaurantBookingChatService()
 
     response = StreamingHttpResponse(
         chat_service.chat(request, serializer.validated_data),
@@ -264,6 +264,44 @@ const TableExtraData = ({ extraData }) => {
   return null;
 };
 
+// Typed table from an agent tool: { kind: "table", title, columns, rows }
+const DataTableExtraData = ({ extraData }) => {
+  const { title, columns = [], rows = [] } = extraData;
+  if (!rows.length) {
+    return null;
+  }
+  return (
+    <DelayedRender
+      delay={1000}
+      spinnerClassName="w-1/2 bg-white rounded-lg shadow-sm dark:bg-gray-800 p-1"
+    >
+      {title && (
+        <h5 className="text-base font-semibold text-gray-900 mb-2">{title}</h5>
+      )}
+      <div className="overflow-x-auto">
+        <Table.Root variant="surface">
+          <Table.Header>
+            <Table.Row>
+              {columns.map((column, index) => (
+                <Table.ColumnHeaderCell key={index}>{column}</Table.ColumnHeaderCell>
+              ))}
+            </Table.Row>
+          </Table.Header>
+          <Table.Body>
+            {rows.map((row, rowIndex) => (
+              <Table.Row key={rowIndex}>
+                {row.map((cell, index) => (
+                  <Table.Cell key={index}>{cell ?? ""}</Table.Cell>
+                ))}
+              </Table.Row>
+            ))}
+          </Table.Body>
+        </Table.Root>
+      </div>
+    </DelayedRender>
+  );
+};
+
 const BotMessage = ({
   message,
   isError = false,
@@ -413,7 +451,12 @@ const BotMessage = ({
               <img src={imageMessage} alt="Image" className="w-full max-w-md h-auto rounded-lg" />
             </div>
           )}
-          {extraData && (
+          {extraData?.kind === "table" && (
+            <div className="mt-2 w-full max-w-4xl">
+              <DataTableExtraData extraData={extraData} />
+            </div>
+          )}
+          {extraData && extraData.kind !== "table" && (
             <div className="mt-2 flex flex-col lg:flex-row gap-2 w-full max-w-4xl">
               <div className="flex-1">
                 <TableExtraData extraData={extraData} />
@@ -5,6 +5,16 @@ import { chat } from "../../api/chat.js";
 import HumanMessage from "./HumanMessage";
 import BotMessage from "./BotMessage";
 
+// extra_data is JSON (typed tool tables contain apostrophes in names), or a
+// single-quoted Python repr from older messages
+const parseExtraData = (raw) => {
+  try {
+    return JSON.parse(raw);
+  } catch {
+    return JSON.parse(raw.replace(/'/g, '"'));
+  }
+};
+
 const Messages = ({ chatId }) => {
   const { currentUser } = useAuth();
   const [messages, setMessages] = useState([]); // Old messages from chat history
@@ -27,9 +37,7 @@ const Messages = ({ chatId }) => {
         const response = await chat.getChatDetail(chatId);
         const cleanMessages = response.data.messages.map((message) => {
           if (message.extra_data) {
-            const valid = message.extra_data.replace(/'/g, '"');
-            const data = JSON.parse(valid);
-            return { ...message, extra_data: data };
+            return { ...message, extra_data: parseExtraData(message.extra_data) };
           }
           return message;
         });
@@ -106,8 +114,7 @@ const Messages = ({ chatId }) => {
         onGenerateExtraData: (result) => {
           if (result && result.content) {
             try {
-              const valid = result.content.replace(/'/g, '"');
-              const data = JSON.parse(valid);
+              const data = parseExtraData(result.content);
               botMessage.extra_data = data;
               setNewMessages((prevNewMessages) =>
                 prevNewMessages.map((msg) =>